@@ -0,0 +1,403 @@
+##########################################################################################
+# async_regulations_gov_api.py
+#
+# An asyncio counterpart of RegulationsGovAPI (see regulations_gov_api.py).
+#
+# AsyncRegulationsGovAPI exposes the same method surface as the blocking client
+# (get_documents, get_document_by_id, get_comments, post_comment, ...), but every method
+# returns an awaitable, and the iter_* methods are async generators.
+#
+# ----------------------------------------
+# Key Features:
+# ----------------------------------------
+# 1. Built on a pooled httpx.AsyncClient (keep-alive, connection limits, timeouts).
+#
+# 2. A semaphore bounds the number of requests in flight, independently of the size of
+#    the connection pool.
+#
+# 3. Uses the same RateLimiter as the blocking client. Passing one limiter to both
+#    clients lets bulk async jobs and interactive chat share one API key's quota.
+#
+# 4. gather_*_by_ids helpers fetch many records concurrently, e.g. hydrating the
+#    details of every comment on a search results page at once. The get_*_by_ids batch
+#    methods are async generators of BatchResult here.
+#
+# 5. download_files is an async generator of DownloadResult; the downloads themselves
+#    run on AttachmentDownloader's worker threads.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# import asyncio
+# from async_regulations_gov_api import AsyncRegulationsGovAPI
+#
+# async def main():
+#     async with AsyncRegulationsGovAPI(api_key="YOUR_API_KEY", max_concurrency=8) as api:
+#         page = await api.get_comments(filter_searchTerm="water", page_size=250)
+#         ids = [c["id"] for c in page["data"]]
+#         details = await api.gather_comments_by_ids(ids)
+#
+# asyncio.run(main())
+#
+##########################################################################################
+
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable
+import httpx
+import requests
+from attachment_downloader import AttachmentDownloader
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache
+from regulations_gov_api import (BatchResult, RegulationsGovAPI, RegulationsGovAPIError, _WindowCursor,
+                                 _unique, _window_projection, orjson)
+
+
+class AsyncRegulationsGovAPI(RegulationsGovAPI):
+    """
+    An asyncio client for the Regulations.gov public API v4.
+
+    The endpoint methods are inherited from RegulationsGovAPI: they build the same query
+    parameters and hand them to _get/_post, which are coroutines here, so every endpoint
+    method returns an awaitable with the same JSON result as its blocking counterpart.
+    """
+
+    def __init__(self,
+                 api_key: str,
+                 max_concurrency: int = 8,
+                 max_connections: int = 16,
+                 max_keepalive_connections: int = 16,
+                 keepalive_expiry: float = 30.0,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0,
+                 client: httpx.AsyncClient = None,
+                 rate_limiter: RateLimiter = None,
+                 max_retries: int = 4,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 cache: ResponseCache = None,
+                 cache_ttls: dict = None,
+                 stale_while_revalidate: float = 0,
+                 request_hook: Callable[[dict], None] = None,
+                 json_loads: Callable = None):
+        """
+        Initialize the async API client with a provided API key.
+
+        :param api_key: Your Regulations.gov API key as a string.
+        :param max_concurrency: Maximum number of requests in flight at once.
+        :param max_connections: Maximum number of open connections in the pool.
+        :param max_keepalive_connections: Maximum number of idle connections kept alive.
+        :param keepalive_expiry: Seconds an idle connection is kept before being closed.
+        :param connect_timeout: Seconds to wait for a TCP/TLS connection to be established.
+        :param read_timeout: Seconds to wait for the server between bytes of the response.
+        :param client: Optional pre-configured httpx.AsyncClient to use instead of
+                       creating one.
+        :param rate_limiter: Optional RateLimiter, e.g. the one used by a blocking
+                             RegulationsGovAPI sharing the same API key.
+        :param max_retries: Maximum number of retries for 429/5xx responses.
+        :param backoff_base: Base delay in seconds for exponential backoff.
+        :param backoff_max: Upper bound in seconds for a single backoff delay.
+        :param cache: Optional ResponseCache for GET responses, which may be shared with
+                      a blocking client.
+        :param cache_ttls: Overrides for DEFAULT_CACHE_TTLS.
+        :param stale_while_revalidate: For detail endpoints, serve a cached record up to
+                                       this many seconds past its expiry immediately and
+                                       refresh it in a background task.
+        :param request_hook: Optional callable invoked after every HTTP attempt, as for
+                             RegulationsGovAPI.
+        :param json_loads: Function decoding response bodies; defaults to orjson.loads
+                           when orjson is installed, else json.loads.
+        """
+        self.api_key = api_key
+        self.headers = {
+            "X-Api-Key": self.api_key,
+            "Content-Type": "application/vnd.api+json"
+        }
+        self.cache = cache
+        self.cache_ttls = {**self.DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.stale_while_revalidate = stale_while_revalidate
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+        self._revalidation_tasks = set()
+        if client is None:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections,
+                                    max_keepalive_connections=max_keepalive_connections,
+                                    keepalive_expiry=keepalive_expiry),
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            )
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_hook = request_hook
+        self.json_loads = json_loads or (orjson.loads if orjson is not None else json.loads)
+        # requests.Session for download_files, created on first use
+        self._download_session = None
+
+    async def close(self):
+        """
+        Close the underlying HTTP client and release pooled connections.
+        """
+        for task in list(self._revalidation_tasks):
+            task.cancel()
+        await self.client.aclose()
+        if self._download_session is not None:
+            self._download_session.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _request(self, method: str, url: str, headers: dict = None, **kwargs) -> httpx.Response:
+        """
+        Send a request through the concurrency semaphore and the rate limiter, retrying
+        429/5xx responses with the same policy as the blocking client.
+
+        :param method: HTTP method ("GET" or "POST")
+        :param url: Absolute URL to request
+        :param headers: Extra headers for this request, merged over the client headers
+        :param kwargs: Extra arguments passed to httpx.AsyncClient.request
+        :return: The final httpx.Response (which may still be an error response)
+        :raises RegulationsGovAPIError: on connection errors or timeouts
+        """
+        headers = {**self.headers, **headers} if headers else self.headers
+        attempt = 0
+        while True:
+            await self.rate_limiter.acquire_async()
+            async with self.semaphore:
+                start = time.time()
+                try:
+                    response = await self.client.request(method, url, headers=headers, **kwargs)
+                except httpx.HTTPError as e:
+                    self._report_request(method, url, None, attempt, start, error=e)
+                    raise RegulationsGovAPIError(f"{method} {url} failed: {e}") from e
+            self._report_request(method, url, response.status_code, attempt, start)
+            self.rate_limiter.update_from_headers(response.headers)
+
+            status = response.status_code
+            retryable = status == 429 or (method == "GET" and status in self.RETRY_STATUSES)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            delay = self._backoff_delay(attempt, response)
+            if status == 429:
+                self.rate_limiter.pause(delay)
+            else:
+                await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _get(self, endpoint: str, params: dict = None, fields: list = None, raw: bool = False):
+        """
+        Internal coroutine for handling GET requests.
+
+        :param endpoint: API endpoint (e.g. "/documents")
+        :param params: Dictionary of query parameters
+        :param fields: Attribute names to keep in each record (see RegulationsGovAPI._get)
+        :param raw: Return the response body as undecoded bytes
+        :return: JSON response from the API (bytes if raw)
+        :raises RegulationsGovAPIError: if response status is not successful
+        """
+        key, ttl, entry = self._cache_lookup(endpoint, params)
+        if entry is not None:
+            if entry.is_fresh():
+                return self._decode(entry.body, fields, raw)
+            if self._can_serve_stale(endpoint, entry):
+                if self._begin_revalidation(key):
+                    task = asyncio.ensure_future(self._revalidate(endpoint, params, key, ttl, entry))
+                    self._revalidation_tasks.add(task)
+                    task.add_done_callback(self._revalidation_tasks.discard)
+                return self._decode(entry.body, fields, raw)
+        return self._decode(await self._fetch(endpoint, params, key, ttl, entry), fields, raw)
+
+    async def _fetch(self, endpoint: str, params: dict, key: str, ttl: float, entry):
+        """
+        Async version of RegulationsGovAPI._fetch.
+        """
+        url = f"{self.BASE_URL}{endpoint}"
+        response = await self._request("GET", url, headers=self._conditional_headers(entry), params=params)
+        if response.status_code == 304 and entry is not None:
+            self._cache_store(key, ttl, entry.body, response.headers, previous=entry)
+            return entry.body
+        if response.status_code >= 400:
+            raise RegulationsGovAPIError(f"GET {url} failed with status {response.status_code}: {response.text}",
+                                         status_code=response.status_code)
+        if key is not None:
+            self._cache_store(key, ttl, response.content, response.headers)
+        return response.content
+
+    async def _revalidate(self, endpoint: str, params: dict, key: str, ttl: float, entry):
+        """
+        Async version of RegulationsGovAPI._revalidate.
+        """
+        try:
+            await self._fetch(endpoint, params, key, ttl, entry)
+        except RegulationsGovAPIError:
+            pass
+        finally:
+            self._end_revalidation(key)
+
+    async def _post(self, endpoint: str, data: dict):
+        """
+        Internal coroutine for handling POST requests.
+
+        :param endpoint: API endpoint (e.g. "/comments")
+        :param data: JSON body as a dictionary
+        :return: JSON response from the API
+        :raises RegulationsGovAPIError: if response status is not successful
+        """
+        url = f"{self.BASE_URL}{endpoint}"
+        response = await self._request("POST", url, json={"data": data})
+        if response.status_code not in (200, 201):
+            raise RegulationsGovAPIError(f"POST {url} failed with status {response.status_code}: {response.text}",
+                                         status_code=response.status_code)
+        return response.json()
+
+    async def _iter_windowed(self, fetch_page, sort: str, filters: dict, page_size: int, fields: list = None):
+        """
+        Async generator version of RegulationsGovAPI._iter_windowed.
+        """
+        cursor = _WindowCursor(filters, self.MAX_PAGE_NUMBER, page_size)
+        projection = _window_projection(fields)
+        while True:
+            cursor.start_window()
+            for page_number in range(1, self.MAX_PAGE_NUMBER + 1):
+                response = await fetch_page(sort=sort, page_number=page_number, page_size=page_size,
+                                            **projection, **cursor.filters)
+                records = response.get("data", [])
+                for record in records:
+                    if cursor.is_new(record):
+                        yield record
+                if cursor.is_last_page(response, records, page_number):
+                    return
+            if not cursor.advance():
+                return
+
+    async def _fetch_many(self, fetch_one, ids, max_workers: int, ordered: bool, **kwargs):
+        """
+        Async generator version of RegulationsGovAPI._fetch_many.
+        
+        max_workers bounds the number of fetches scheduled at once; tasks still running
+        when the generator is abandoned are cancelled.
+        """
+        async def fetch(record_id):
+            try:
+                return BatchResult(record_id, data=await fetch_one(record_id, **kwargs))
+            except Exception as e:
+                return BatchResult(record_id, error=e)
+
+        max_pending = 2 * max_workers
+        pending = deque() if ordered else set()
+        try:
+            for record_id in _unique(ids):
+                task = asyncio.ensure_future(fetch(record_id))
+                if ordered:
+                    pending.append(task)
+                    if len(pending) >= max_pending:
+                        yield await pending.popleft()
+                else:
+                    pending.add(task)
+                    if len(pending) >= max_pending:
+                        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        for task in done:
+                            yield task.result()
+            while pending:
+                if ordered:
+                    yield await pending.popleft()
+                else:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    # ----------------------------
+    # GATHER HELPERS
+    # ----------------------------
+
+    async def _gather(self, fetch_one, ids, return_exceptions: bool, **kwargs):
+        """
+        Run fetch_one for every ID concurrently and return results in input order.
+
+        Concurrency is bounded by the client's semaphore and rate limiter, so any number
+        of IDs can be passed at once.
+        """
+        return await asyncio.gather(*(fetch_one(i, **kwargs) for i in ids),
+                                    return_exceptions=return_exceptions)
+
+    async def gather_documents_by_ids(self, document_ids, include_attachments: bool = False,
+                                      return_exceptions: bool = False):
+        """
+        Fetch the details of many documents concurrently.
+
+        :param document_ids: Iterable of documentIds.
+        :param include_attachments: If True, include attachments in each response.
+        :param return_exceptions: If True, failures are returned in place of their result
+                                  instead of raising the first error.
+        :return: List of JSON responses in the same order as document_ids.
+        """
+        return await self._gather(self.get_document_by_id, document_ids, return_exceptions,
+                                  include_attachments=include_attachments)
+
+    async def gather_comments_by_ids(self, comment_ids, include_attachments: bool = False,
+                                     return_exceptions: bool = False):
+        """
+        Fetch the details of many comments concurrently.
+
+        :param comment_ids: Iterable of commentIds.
+        :param include_attachments: If True, include attachments in each response.
+        :param return_exceptions: If True, failures are returned in place of their result
+                                  instead of raising the first error.
+        :return: List of JSON responses in the same order as comment_ids.
+        """
+        return await self._gather(self.get_comment_by_id, comment_ids, return_exceptions,
+                                  include_attachments=include_attachments)
+
+    async def gather_dockets_by_ids(self, docket_ids, return_exceptions: bool = False):
+        """
+        Fetch the details of many dockets concurrently.
+
+        :param docket_ids: Iterable of docketIds.
+        :param return_exceptions: If True, failures are returned in place of their result
+                                  instead of raising the first error.
+        :return: List of JSON responses in the same order as docket_ids.
+        """
+        return await self._gather(self.get_docket_by_id, docket_ids, return_exceptions)
+
+    async def download_files(self, files, dest_dir: str = "downloads", ordered: bool = False, **kwargs):
+        """
+        Async generator version of RegulationsGovAPI.download_files.
+
+        Downloads run on AttachmentDownloader's worker threads over a requests.Session
+        owned by this client (closed by close()), so the event loop is never blocked, not
+        even when the generator is closed early.
+
+        :param files: Iterable of fileFormats entries (dicts with fileUrl and size) or URLs.
+        :param dest_dir: Directory files are saved under.
+        :param ordered: If True, yield results in input order; otherwise as they complete.
+        :param kwargs: Extra AttachmentDownloader options.
+        :return: Async generator of DownloadResult.
+        """
+        if self._download_session is None:
+            self._download_session = requests.Session()
+        downloader = AttachmentDownloader(dest_dir=dest_dir, session=self._download_session, **kwargs)
+        results = downloader.download_many(files, ordered=ordered)
+        done = object()
+        try:
+            while True:
+                result = await asyncio.to_thread(next, results, done)
+                if result is done:
+                    return
+                yield result
+        finally:
+            # closing waits for downloads already running; keep that off the event loop
+            await asyncio.to_thread(results.close)
@@ -0,0 +1,270 @@
+##########################################################################################
+# attachment_downloader.py
+#
+# Streaming, resumable, parallel downloads of document and comment attachment files.
+#
+# Document details list their files under attributes.fileFormats (and attachments under
+# "included" when requested with include_attachments=True), each with a fileUrl and the
+# size in bytes. Bulk retrieval of these files is often hundreds of MB per docket.
+#
+# ----------------------------------------
+# Key Features:
+# ----------------------------------------
+# 1. Files are streamed to disk in fixed-size chunks, so memory use doesn't depend on
+#    the file size.
+#
+# 2. Data is written to "<file>.part" and renamed once complete. An interrupted
+#    download resumes from the partial file with an HTTP Range request, both across
+#    retries and across runs.
+#
+# 3. Completed files are verified against the size reported by the API (and an
+#    optional SHA-256), and files already present with the right size are skipped.
+#
+# 4. download_many runs downloads on a worker pool, with a per-host connection limit so
+#    a bulk job doesn't open more connections to one server than it tolerates. Only a
+#    bounded number of downloads is queued, and abandoning the results early cancels them.
+#
+# 5. Uses the pooled session of a RegulationsGovAPI client when given one. The API key
+#    header is never sent to the file servers.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# api = RegulationsGovAPI(api_key="YOUR_API_KEY")
+# doc = api.get_document_by_id("FDA-2009-N-0501-0012", include_attachments=True)
+# for result in api.download_files(AttachmentDownloader.files_of(doc), dest_dir="downloads"):
+#     print(result.status, result.path)
+#
+##########################################################################################
+
+import hashlib
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import NamedTuple
+from urllib.parse import urlparse
+import requests
+
+
+class DownloadError(Exception):
+    """Raised when a file can't be downloaded or fails verification."""
+    pass
+
+
+class DownloadResult(NamedTuple):
+    """
+    Outcome of one download.
+
+    status is one of "downloaded", "resumed", "skipped" or "failed"; error is set only
+    for failures and sha256 only when checksums were requested.
+    """
+    url: str
+    path: str
+    size: int = None
+    status: str = "downloaded"
+    error: Exception = None
+    sha256: str = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class AttachmentDownloader:
+    """
+    Downloads files to a destination directory, resuming and verifying as it goes.
+    """
+
+    def __init__(self,
+                 dest_dir: str = "downloads",
+                 session: requests.Session = None,
+                 max_workers: int = 4,
+                 per_host_limit: int = 2,
+                 chunk_size: int = 1024 * 1024,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 60.0,
+                 max_retries: int = 3,
+                 checksum: bool = False):
+        """
+        :param dest_dir: Directory files are saved under. Each file keeps its URL path
+                         (e.g. <dest_dir>/EPA-HQ-OAR-2021-0317-0001/content.pdf).
+        :param session: requests.Session to download with, e.g. RegulationsGovAPI.session.
+        :param max_workers: Number of concurrent downloads in download_many.
+        :param per_host_limit: Maximum concurrent downloads from one host.
+        :param chunk_size: Bytes read and written per chunk.
+        :param connect_timeout: Seconds to wait for a connection to be established.
+        :param read_timeout: Seconds to wait for the server between chunks.
+        :param max_retries: Number of times an interrupted download is resumed.
+        :param checksum: If True, compute the SHA-256 of every completed file.
+        """
+        self.dest_dir = dest_dir
+        self.session = session or requests.Session()
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.chunk_size = chunk_size
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.checksum = checksum
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+    @staticmethod
+    def files_of(response: dict, formats=None) -> list:
+        """
+        Collect the downloadable files of a document or comment detail response.
+
+        :param response: JSON from get_document_by_id / get_comment_by_id (attachments
+                         are included when fetched with include_attachments=True).
+        :param formats: Optional collection of formats to keep, e.g. {"pdf"}.
+        :return: List of fileFormats entries (dicts with fileUrl, format and size).
+        """
+        resources = [response.get("data") or {}] + list(response.get("included") or [])
+        files = []
+        for resource in resources:
+            for entry in (resource.get("attributes") or {}).get("fileFormats") or []:
+                if entry.get("fileUrl") and (formats is None or entry.get("format") in formats):
+                    files.append(entry)
+        return files
+
+    def path_for(self, url: str) -> str:
+        """
+        Local path a URL is saved to: its URL path under dest_dir.
+
+        :raises DownloadError: if the URL path would escape dest_dir.
+        """
+        relative = urlparse(url).path.lstrip("/") or "download"
+        root = os.path.abspath(self.dest_dir)
+        path = os.path.abspath(os.path.join(root, relative))
+        if os.path.commonpath([root, path]) != root:
+            raise DownloadError(f"Refusing to write {url} outside {self.dest_dir}")
+        return path
+
+    def _host_slot(self, url: str) -> threading.Semaphore:
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.Semaphore(self.per_host_limit)
+            return self._host_slots[host]
+
+    def download(self, url: str, path: str = None, expected_size: int = None,
+                 expected_sha256: str = None) -> DownloadResult:
+        """
+        Download one file, resuming a partial download if there is one.
+
+        :param url: File URL (e.g. a fileFormats fileUrl).
+        :param path: Destination path. Defaults to path_for(url).
+        :param expected_size: Size in bytes reported by the API, used for skip and
+                              verification.
+        :param expected_sha256: Optional SHA-256 hex digest to verify against.
+        :return: DownloadResult (never raises; failures have status "failed").
+        """
+        try:
+            path = path or self.path_for(url)
+            return self._download(url, path, expected_size, expected_sha256)
+        except Exception as e:
+            return DownloadResult(url, path, status="failed", error=e)
+
+    def _download(self, url: str, path: str, expected_size: int, expected_sha256: str) -> DownloadResult:
+        if os.path.exists(path) and (expected_size is None or os.path.getsize(path) == expected_size):
+            if expected_sha256 is None or _sha256(path) == expected_sha256:
+                return DownloadResult(url, path, os.path.getsize(path), "skipped",
+                                      sha256=expected_sha256)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        part = path + ".part"
+        resumed = os.path.exists(part) and os.path.getsize(part) > 0
+        attempt = 0
+        with self._host_slot(url):
+            while True:
+                try:
+                    self._stream_to(url, part, expected_size)
+                    break
+                except (requests.RequestException, DownloadError) as e:
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise DownloadError(f"Download of {url} failed after {attempt} attempts: {e}") from e
+                    resumed = True
+
+        size = os.path.getsize(part)
+        if expected_size is not None and size != expected_size:
+            os.remove(part)
+            raise DownloadError(f"{url}: expected {expected_size} bytes, got {size}")
+        digest = _sha256(part) if (self.checksum or expected_sha256) else None
+        if expected_sha256 is not None and digest != expected_sha256:
+            os.remove(part)
+            raise DownloadError(f"{url}: SHA-256 mismatch")
+        os.replace(part, path)
+        return DownloadResult(url, path, size, "resumed" if resumed else "downloaded", sha256=digest)
+
+    def _stream_to(self, url: str, part: str, expected_size: int):
+        """
+        Stream url into the partial file, asking only for the bytes not yet on disk.
+        """
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        if expected_size is not None and offset >= expected_size:
+            return
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if response.status_code == 416:
+                # Nothing left to fetch: the partial file already holds the whole body.
+                return
+            if response.status_code not in (200, 206):
+                raise DownloadError(f"GET {url} failed with status {response.status_code}")
+            # A 200 means the server ignored the Range header and is sending everything.
+            mode = "ab" if response.status_code == 206 else "wb"
+            with open(part, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    f.write(chunk)
+
+    def download_many(self, files, ordered: bool = False):
+        """
+        Download many files on the worker pool.
+
+        At most 2 * max_workers downloads are queued at a time. Closing the generator
+        early cancels the queued downloads, so it only waits for the ones already running.
+
+        :param files: Iterable of fileFormats entries (dicts with fileUrl and size) or
+                      plain URL strings. Repeated URLs are downloaded once.
+        :param ordered: If True, yield results in input order; otherwise as they complete.
+        :return: Generator of DownloadResult.
+        """
+        entries = {}
+        for f in files:
+            url, size = (f, None) if isinstance(f, str) else (f["fileUrl"], f.get("size"))
+            entries.setdefault(url, size)
+
+        max_pending = 2 * self.max_workers
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            pending = deque() if ordered else set()
+            try:
+                for url, size in entries.items():
+                    future = pool.submit(self.download, url, expected_size=size)
+                    if ordered:
+                        pending.append(future)
+                        if len(pending) >= max_pending:
+                            yield pending.popleft().result()
+                    else:
+                        pending.add(future)
+                        if len(pending) >= max_pending:
+                            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                            for future in done:
+                                yield future.result()
+                while pending:
+                    if ordered:
+                        yield pending.popleft().result()
+                    else:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+            finally:
+                # a no-op once every download is done; on early close, drops the queued ones
+                for future in pending:
+                    future.cancel()
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
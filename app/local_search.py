@@ -0,0 +1,249 @@
+##########################################################################################
+# local_search.py
+#
+# Serve document, comment and docket searches from the local mirror built by SyncEngine.
+#
+# Remote filter[searchTerm] queries cost a round trip and quota on every agent turn, stop
+# at 5,000 results and can't be used at all once the key is rate-limited. Once records
+# are mirrored locally (see sync_engine.py), LocalRegulationsGovAPI answers the same
+# searches from a SQLite FTS5 index in milliseconds.
+#
+# ----------------------------------------
+# Key Features:
+# ----------------------------------------
+# 1. An FTS5 table indexes the title and body text (comment text, abstracts, subject)
+#    of every mirrored record. Triggers on the records table keep it up to date as
+#    SyncEngine upserts, so no separate re-indexing step is needed.
+#
+# 2. Results are ranked with BM25, weighting title matches above body matches.
+#
+# 3. get_documents / get_comments / get_dockets accept the same keyword arguments as
+#    RegulationsGovAPI and return the same JSON:API shape ({"data": [...], "meta": ...}),
+#    so agent tools work unchanged. Supported filters: searchTerm, agencyId, docketId,
+#    documentType, postedDate and lastModifiedDate (exact, ge, le), plus sorting and
+#    paging, and the fields / raw options.
+#
+# 4. Falls back to the remote API when a query uses a filter the mirror can't answer
+#    or when nothing matches locally. Every other method (details, posting comments,
+#    ...) is delegated to the remote client.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# remote = RegulationsGovAPI(api_key="YOUR_API_KEY")
+# api = LocalRegulationsGovAPI("rga_mirror.sqlite3", remote=remote)
+# api.get_comments(filter_searchTerm="water quality", filter_agencyId="EPA", page_size=25)
+#
+##########################################################################################
+
+import json
+import sqlite3
+import threading
+from regulations_gov_api import RegulationsGovAPI, eastern_to_utc, project_response
+from sync_engine import init_mirror_schema
+
+
+# Text indexed as the record body: comment text for comments, abstracts and subject for
+# documents and dockets.
+_BODY_EXPR = " || ' ' || ".join(
+    f"coalesce(json_extract(new.data, '$.attributes.{field}'), '')"
+    for field in ("comment", "docAbstract", "dkAbstract", "subject"))
+
+FTS_SCHEMA = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS records_fts USING fts5(title, body, tokenize = 'porter unicode61');
+    CREATE TRIGGER IF NOT EXISTS records_fts_insert AFTER INSERT ON records BEGIN
+        INSERT INTO records_fts (rowid, title, body) VALUES (new.rowid, new.title, {_BODY_EXPR});
+    END;
+    CREATE TRIGGER IF NOT EXISTS records_fts_update AFTER UPDATE ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+        INSERT INTO records_fts (rowid, title, body) VALUES (new.rowid, new.title, {_BODY_EXPR});
+    END;
+    CREATE TRIGGER IF NOT EXISTS records_fts_delete AFTER DELETE ON records BEGIN
+        DELETE FROM records_fts WHERE rowid = old.rowid;
+    END;
+"""
+
+
+class LocalRegulationsGovAPI:
+    """
+    Search facade over the local mirror with RegulationsGovAPI-compatible list methods.
+    """
+
+    # filter_* argument -> (SQL condition, value converter). agencyId accepts a
+    # comma-separated list like the remote API.
+    FILTERS = {
+        "filter_agencyId": (None, None),
+        "filter_docketId": ("r.docket_id = ?", None),
+        "filter_documentType": ("r.document_type = ?", None),
+        "filter_postedDate": ("substr(r.posted_date, 1, 10) = ?", None),
+        "filter_lastModifiedDate": ("r.last_modified = ?", eastern_to_utc),
+        "filter_lastModifiedDate_ge": ("r.last_modified >= ?", eastern_to_utc),
+        "filter_lastModifiedDate_le": ("r.last_modified <= ?", eastern_to_utc),
+    }
+
+    # API sort field -> records column.
+    SORT_COLUMNS = {
+        "postedDate": "r.posted_date",
+        "lastModifiedDate": "r.last_modified",
+        "title": "r.title",
+        "documentId": "r.id",
+        # dockets don't store their own ID as docketId
+        "docketId": "COALESCE(r.docket_id, r.id)",
+    }
+
+    def __init__(self, db_path: str = "rga_mirror.sqlite3", remote: RegulationsGovAPI = None,
+                 fallback: bool = True):
+        """
+        :param db_path: Path of the SQLite mirror maintained by SyncEngine.
+        :param remote: Client used for fallbacks and for every non-search method.
+        :param fallback: If True, query the remote API when nothing matches locally.
+        """
+        self.remote = remote
+        self.fallback = fallback
+        # One connection is shared by every thread (e.g. ChatServer sessions and parallel
+        # tool calls); the lock serializes its use.
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            init_mirror_schema(self.conn)
+            self.conn.executescript(FTS_SCHEMA)
+            self._backfill()
+
+    def _backfill(self):
+        """
+        Index records mirrored before the full-text index existed. Caller holds _lock.
+        """
+        indexed = self.conn.execute("SELECT COUNT(*) FROM records_fts").fetchone()[0]
+        total = self.conn.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+        if indexed == total:
+            return
+        with self.conn:
+            self.conn.execute("DELETE FROM records_fts")
+            self.conn.execute(
+                "INSERT INTO records_fts (rowid, title, body) SELECT rowid, title, "
+                + _BODY_EXPR.replace("new.data", "data") + " FROM records")
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    def __getattr__(self, name):
+        # Everything that isn't a search (details, posting comments, ...) goes remote.
+        if name == "remote" or self.remote is None:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name!r} and no remote client")
+        return getattr(self.remote, name)
+
+    @staticmethod
+    def _match_expression(search_term: str) -> str:
+        """
+        Turn free text into an FTS5 query matching all terms, with every term quoted so
+        user input can't be parsed as FTS syntax. Returns "" if there are no terms.
+        """
+        return " ".join('"{}"'.format(term.replace('"', '""')) for term in search_term.split())
+
+    def _order_by(self, sort: str):
+        """
+        Translate an API sort expression into ORDER BY terms, or None if unsupported.
+        """
+        terms = []
+        for field in sort.split(","):
+            field = field.strip()
+            column = self.SORT_COLUMNS.get(field.lstrip("-"))
+            if column is None:
+                return None
+            terms.append(f"{column} DESC" if field.startswith("-") else column)
+        return ", ".join(terms)
+
+    def _search(self, endpoint: str, params: dict):
+        """
+        Run a list query against the mirror.
+
+        :return: JSON:API-shaped response, or None if the query uses a filter or sort
+                 the mirror can't answer.
+        """
+        params = {k: v for k, v in params.items() if v is not None}
+        # a blank search term is no search term (an empty MATCH is an FTS syntax error)
+        match = self._match_expression(str(params.pop("filter_searchTerm", "")).strip())
+        sort = params.pop("sort", None)
+        page_number = int(params.pop("page_number", 1))
+        page_size = int(params.pop("page_size", 25))
+
+        conditions = ["r.endpoint = ?"]
+        args = [endpoint]
+        for name, value in params.items():
+            if name not in self.FILTERS:
+                return None
+            if name == "filter_agencyId":
+                agencies = [a.strip() for a in str(value).split(",")]
+                conditions.append(f"r.agency_id IN ({', '.join('?' * len(agencies))})")
+                args.extend(agencies)
+                continue
+            condition, convert = self.FILTERS[name]
+            conditions.append(condition)
+            args.append(convert(value) if convert else value)
+
+        if match:
+            source = "records_fts JOIN records r ON r.rowid = records_fts.rowid"
+            conditions.insert(0, "records_fts MATCH ?")
+            args.insert(0, match)
+            order_by = "bm25(records_fts, 10.0, 1.0)"
+        else:
+            source = "records r"
+            order_by = "r.rowid"
+        if sort:
+            order_by = self._order_by(sort)
+            if order_by is None:
+                return None
+
+        where = " AND ".join(conditions)
+        with self._lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {source} WHERE {where}", args).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT r.data FROM {source} WHERE {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+                args + [page_size, (page_number - 1) * page_size]).fetchall()
+        return {
+            "data": [json.loads(row[0]) for row in rows],
+            "meta": {
+                "totalElements": total,
+                "pageNumber": page_number,
+                "pageSize": page_size,
+                "numberOfElements": len(rows),
+                "hasNextPage": page_number * page_size < total,
+                "source": "local",
+            },
+        }
+
+    def _local_or_remote(self, endpoint: str, remote_method: str, params: dict):
+        fields = params.pop("fields", None)
+        raw = params.pop("raw", False)
+        result = self._search(endpoint, params)
+        if self.remote is not None and (result is None or (self.fallback and not result["data"])):
+            return getattr(self.remote, remote_method)(fields=fields, raw=raw, **params)
+        if result is None:
+            raise ValueError(f"Query on {endpoint} needs the remote API: {params}")
+        if raw:
+            return json.dumps(result).encode("utf-8")
+        if fields is not None:
+            project_response(result, fields)
+        return result
+
+    def get_documents(self, **params):
+        """
+        Search mirrored documents. Accepts the same keyword arguments as
+        RegulationsGovAPI.get_documents.
+        """
+        return self._local_or_remote("documents", "get_documents", params)
+
+    def get_comments(self, **params):
+        """
+        Search mirrored comments. Accepts the same keyword arguments as
+        RegulationsGovAPI.get_comments.
+        """
+        return self._local_or_remote("comments", "get_comments", params)
+
+    def get_dockets(self, **params):
+        """
+        Search mirrored dockets. Accepts the same keyword arguments as
+        RegulationsGovAPI.get_dockets.
+        """
+        return self._local_or_remote("dockets", "get_dockets", params)
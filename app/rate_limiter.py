@@ -0,0 +1,156 @@
+##########################################################################################
+# rate_limiter.py
+#
+# A token-bucket rate limiter that keeps Regulations.gov API usage under the per-key
+# hourly quota.
+#
+# Regulations.gov (via api.data.gov) enforces an hourly quota per API key and reports the
+# current state on every response through the X-RateLimit-Limit and
+# X-RateLimit-Remaining headers. Once the quota is exhausted every request returns 429
+# until the window rolls over.
+#
+# ----------------------------------------
+# How it works:
+# ----------------------------------------
+# 1. The bucket refills continuously at limit / 3600 tokens per second, so requests are
+#    spread smoothly over the hour instead of being burned in a burst.
+#
+# 2. Every response feeds its X-RateLimit headers back into the limiter. The reported
+#    limit adjusts the refill rate and the reported remaining count caps the tokens we
+#    believe we have, so several processes sharing one key stay in agreement.
+#
+# 3. A 429 (or Retry-After) pauses the whole limiter, so every thread sharing the client
+#    backs off together instead of each hammering the API.
+#
+# 4. The limiter only computes how long a caller has to wait; acquire() sleeps for
+#    blocking callers and acquire_async() awaits for asyncio callers, so one limiter can
+#    be shared between the sync and async clients.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# limiter = RateLimiter(limit_per_hour=1000, burst=10)
+# api = RegulationsGovAPI(api_key="YOUR_API_KEY", rate_limiter=limiter)
+# ...
+# print(api.quota)
+#
+##########################################################################################
+
+import asyncio
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket driven by Regulations.gov X-RateLimit headers.
+    """
+
+    WINDOW_SECONDS = 3600
+
+    def __init__(self, limit_per_hour: int = 1000, burst: int = 10, reserve: int = 0):
+        """
+        :param limit_per_hour: Expected hourly quota for the key. Replaced by the
+                               X-RateLimit-Limit header once a response has been seen.
+        :param burst: Maximum number of requests that may be sent back to back.
+        :param reserve: Number of requests of the reported remaining quota to leave
+                        untouched (e.g. to keep headroom for interactive chat).
+        """
+        self.limit = limit_per_hour
+        self.remaining = None
+        self.burst = burst
+        self.reserve = reserve
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self) -> float:
+        """Refill rate in tokens per second."""
+        return max(self.limit, 1) / self.WINDOW_SECONDS
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+
+    def reserve_slot(self) -> float:
+        """
+        Take one token and return how many seconds the caller must wait before sending.
+
+        Tokens may go negative; each waiting caller is then scheduled one refill interval
+        after the previous one, which keeps concurrent callers evenly paced.
+
+        :return: Delay in seconds (0.0 if the request may be sent immediately).
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            delay = 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+            return max(delay, self._paused_until - now)
+
+    def acquire(self):
+        """Block the calling thread until a request may be sent."""
+        delay = self.reserve_slot()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self):
+        """Wait (without blocking the event loop) until a request may be sent."""
+        delay = self.reserve_slot()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update_from_headers(self, headers):
+        """
+        Synchronize the bucket with the quota reported by the server.
+
+        :param headers: Response headers (any case-insensitive mapping).
+        """
+        limit = _int_header(headers, "X-RateLimit-Limit")
+        remaining = _int_header(headers, "X-RateLimit-Remaining")
+        with self._lock:
+            self._refill(time.monotonic())
+            if limit is not None:
+                self.limit = limit
+            if remaining is not None:
+                self.remaining = remaining
+                self._tokens = min(self._tokens, float(remaining - self.reserve))
+
+    def pause(self, seconds: float):
+        """
+        Stop handing out slots for the given number of seconds (e.g. after a 429).
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def state(self) -> dict:
+        """
+        Return a snapshot of the current quota state.
+
+        :return: dict with limit, remaining (as last reported by the server, or None),
+                 tokens currently available, refill rate per second and the number of
+                 seconds the limiter is still paused for.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            return {
+                "limit": self.limit,
+                "remaining": self.remaining,
+                "tokens": self._tokens,
+                "rate_per_second": self.rate,
+                "paused_for": max(0.0, self._paused_until - now),
+            }
+
+
+def _int_header(headers, name: str):
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        return None
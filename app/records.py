@@ -0,0 +1,470 @@
+##########################################################################################
+# records.py
+#
+# Compact in-memory representations of Regulations.gov documents, comments and dockets.
+#
+# A record decoded from the API is a dict holding an "attributes" dict, a "links" dict,
+# timestamp strings and its own copies of repeated values such as the agency id, which
+# adds up to several KB per record. That is fine for a page of search results but makes
+# holding a whole 500k-comment docket in memory impractical.
+#
+# ----------------------------------------
+# Key Features:
+# ----------------------------------------
+# 1. DocumentRecord / CommentRecord / DocketRecord are slotted classes with one slot per
+#    common attribute (agency_id, title, posted_date, ...). Low-cardinality strings
+#    (agencyId, docketId, documentType, ...) are interned so every record shares one
+#    copy, and timestamps are parsed once into timezone-aware datetimes, shared between
+#    records with the same timestamp.
+#
+# 2. Conversion is lossless: Record.from_api(record).to_api() == record. Attributes
+#    without a slot, values of an unexpected type, non-default links and any other
+#    top-level keys are kept aside and restored.
+#
+# 3. RecordBatch stores many records of one type column by column: interned strings as
+#    dictionary codes, timestamps as int64 epoch seconds and booleans as int8, in
+#    stdlib arrays. to_numpy() and to_arrow() hand the columns to NumPy or pyarrow for
+#    analytics when those packages are installed (they are imported only when called).
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# from records import CommentRecord, RecordBatch, from_api
+#
+# comments = [from_api(r) for r in api.iter_comments(filter_docketId="EPA-HQ-OW-2022-0901")]
+# print(comments[0].agency_id, comments[0].posted_date.year)
+#
+# batch = RecordBatch.from_api(api.iter_comments(filter_docketId="EPA-HQ-OW-2022-0901"))
+# table = batch.to_arrow()          # pyarrow.Table
+# posted = batch.to_numpy()["posted_date"]  # numpy datetime64[s] array
+# batch[0].to_api()                 # the original JSON record
+#
+##########################################################################################
+
+import sys
+from array import array
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Iterable, List
+
+API_BASE_URL = "https://api.regulations.gov/v4"
+
+# Field kinds: how an attribute is stored.
+STR = "str"          # string, kept as is
+INTERN = "intern"    # repeated string, interned (dictionary-encoded in batches)
+DATE = "date"        # "YYYY-MM-DDTHH:MM:SSZ" timestamp, parsed into a UTC datetime
+BOOL = "bool"        # boolean
+
+# Stand-in for timestamps and booleans that are null or absent in int64 / int8 columns.
+# It is the value NumPy uses for NaT, so date columns convert to datetime64 as is.
+_NULL_DATE = -2 ** 63
+_NULL_BOOL = -1
+
+_INVALID = object()
+
+
+@lru_cache(maxsize=65536)
+def parse_timestamp(value: str):
+    """
+    Parse an API timestamp ("2024-01-31T05:00:00Z") into a UTC datetime.
+
+    :return: The datetime, or None if value is not in exactly that format (so it could
+             not be written back unchanged).
+    """
+    if len(value) != 20 or value[10] != "T" or value[19] != "Z":
+        return None
+    try:
+        return datetime.fromisoformat(value[:19]).replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def format_timestamp(value: datetime) -> str:
+    """Inverse of parse_timestamp."""
+    return value.isoformat()[:19] + "Z"
+
+
+@lru_cache(maxsize=65536)
+def _from_epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc)
+
+
+def _convert(kind: str, value):
+    """Stored form of an attribute value, or _INVALID if it doesn't fit the field kind."""
+    if value is None:
+        return None
+    if kind == DATE:
+        parsed = parse_timestamp(value) if isinstance(value, str) else None
+        return _INVALID if parsed is None else parsed
+    if kind == BOOL:
+        return value if isinstance(value, bool) else _INVALID
+    if not isinstance(value, str):
+        return _INVALID
+    return sys.intern(value) if kind == INTERN else value
+
+
+class Record:
+    """
+    Base class of the compact record types.
+
+    Subclasses declare FIELDS, a tuple of (attribute name, slot name, kind), and TYPE,
+    the JSON:API type. Slots of attributes missing from the API record hold None; use
+    get() to tell missing and null apart. Attributes kept aside are in _extra, other
+    top-level keys in _top (both None for typical records).
+    """
+
+    TYPE = None
+    FIELDS = ()
+    __slots__ = ("id", "_present", "_extra", "_top")
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._SLOT_BY_ATTRIBUTE = {attribute: (slot, 1 << bit)
+                                  for bit, (attribute, slot, _) in enumerate(cls.FIELDS)}
+        # bit set in _present when the record's links are the default self link
+        cls._LINKS_BIT = 1 << len(cls.FIELDS)
+
+    @classmethod
+    def from_api(cls, record: dict):
+        """
+        Build a compact record from a JSON:API record (an element of a response's
+        "data", or the "data" of a detail response).
+        """
+        self = cls.__new__(cls)
+        self.id = record.get("id")
+        attributes = record.get("attributes")
+        attributes = attributes if isinstance(attributes, dict) else {}
+        present = 0
+        other_attributes = None
+        for bit, (attribute, slot, kind) in enumerate(cls.FIELDS):
+            value = attributes.get(attribute, _INVALID)
+            if value is not _INVALID:
+                converted = _convert(kind, value)
+                if converted is not _INVALID:
+                    setattr(self, slot, converted)
+                    present |= 1 << bit
+                    continue
+                other_attributes = other_attributes or {}
+                other_attributes[attribute] = value
+            setattr(self, slot, None)
+        if len(attributes) > present.bit_count() + len(other_attributes or ()):
+            other_attributes = other_attributes or {}
+            other_attributes.update((k, v) for k, v in attributes.items() if k not in cls._SLOT_BY_ATTRIBUTE)
+
+        top = None
+        for key, value in record.items():
+            if key == "id" or (key == "type" and value == cls.TYPE):
+                continue
+            if key == "attributes" and isinstance(value, dict):
+                continue
+            if key == "links" and value == {"self": f"{API_BASE_URL}/{cls.TYPE}/{self.id}"}:
+                present |= cls._LINKS_BIT
+                continue
+            top = top or {}
+            top[key] = value
+        for key in ("type", "attributes"):
+            if key not in record:
+                top = top or {}
+                top[key] = _INVALID
+        self._present = present
+        self._extra = other_attributes or None
+        self._top = top
+        return self
+
+    def to_api(self) -> dict:
+        """The JSON:API record this record was built from."""
+        top = self._top or {}
+        record = {"id": self.id, "type": top.get("type", self.TYPE)}
+        attributes = {}
+        present = self._present
+        for bit, (attribute, slot, kind) in enumerate(self.FIELDS):
+            if present & (1 << bit):
+                value = getattr(self, slot)
+                attributes[attribute] = format_timestamp(value) if kind == DATE and value is not None else value
+        if self._extra:
+            attributes.update(self._extra)
+        record["attributes"] = top.get("attributes", attributes)
+        for key, value in top.items():
+            if key not in ("type", "attributes"):
+                record[key] = value
+        if present & self._LINKS_BIT:
+            record["links"] = {"self": f"{API_BASE_URL}/{self.TYPE}/{self.id}"}
+        return {k: v for k, v in record.items() if v is not _INVALID}
+
+    def get(self, attribute: str, default=None):
+        """
+        Value of an API attribute by its API name (e.g. "postedDate"), whether or not
+        it has a slot; default if the record doesn't have it.
+        """
+        slot, bit = self._SLOT_BY_ATTRIBUTE.get(attribute, (None, 0))
+        if self._present & bit:
+            return getattr(self, slot)
+        return (self._extra or {}).get(attribute, default)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_api() == other.to_api()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"{type(self).__name__}(id={self.id!r})"
+
+
+class DocumentRecord(Record):
+    TYPE = "documents"
+    FIELDS = (
+        ("agencyId", "agency_id", INTERN),
+        ("docketId", "docket_id", INTERN),
+        ("documentType", "document_type", INTERN),
+        ("subtype", "subtype", INTERN),
+        ("title", "title", STR),
+        ("objectId", "object_id", STR),
+        ("frDocNum", "fr_doc_num", STR),
+        ("postedDate", "posted_date", DATE),
+        ("lastModifiedDate", "last_modified_date", DATE),
+        ("commentStartDate", "comment_start_date", DATE),
+        ("commentEndDate", "comment_end_date", DATE),
+        ("openForComment", "open_for_comment", BOOL),
+        ("withdrawn", "withdrawn", BOOL),
+        ("highlightedContent", "highlighted_content", STR),
+    )
+    __slots__ = tuple(slot for _, slot, _ in FIELDS)
+
+
+class CommentRecord(Record):
+    TYPE = "comments"
+    FIELDS = (
+        ("agencyId", "agency_id", INTERN),
+        ("docketId", "docket_id", INTERN),
+        ("documentType", "document_type", INTERN),
+        ("commentOnDocumentId", "comment_on_document_id", INTERN),
+        ("title", "title", STR),
+        ("objectId", "object_id", STR),
+        ("postedDate", "posted_date", DATE),
+        ("lastModifiedDate", "last_modified_date", DATE),
+        ("receiveDate", "receive_date", DATE),
+        ("withdrawn", "withdrawn", BOOL),
+        ("highlightedContent", "highlighted_content", STR),
+        ("comment", "comment", STR),
+    )
+    __slots__ = tuple(slot for _, slot, _ in FIELDS)
+
+
+class DocketRecord(Record):
+    TYPE = "dockets"
+    FIELDS = (
+        ("agencyId", "agency_id", INTERN),
+        ("docketType", "docket_type", INTERN),
+        ("title", "title", STR),
+        ("objectId", "object_id", STR),
+        ("lastModifiedDate", "last_modified_date", DATE),
+        ("highlightedContent", "highlighted_content", STR),
+        ("dkAbstract", "dk_abstract", STR),
+    )
+    __slots__ = tuple(slot for _, slot, _ in FIELDS)
+
+
+RECORD_TYPES = {cls.TYPE: cls for cls in (DocumentRecord, CommentRecord, DocketRecord)}
+
+
+def from_api(record: dict) -> Record:
+    """
+    Build the compact record matching a JSON:API record's type.
+
+    :raises ValueError: if the type is not documents, comments or dockets.
+    """
+    cls = RECORD_TYPES.get(record.get("type"))
+    if cls is None:
+        raise ValueError(f"No record type for {record.get('type')!r}; expected one of {list(RECORD_TYPES)}")
+    return cls.from_api(record)
+
+
+class RecordBatch:
+    """
+    Many records of one type stored column by column.
+
+    Columns are named after the record slots, plus "id". Interned string columns are
+    dictionary-encoded (int32 codes into a list of distinct values, -1 for null),
+    timestamps are int64 epoch seconds and booleans int8 (null as -2**63 and -1).
+    Records are rebuilt on access, so indexing a batch returns a new Record each time.
+    """
+
+    def __init__(self, record_type: type):
+        """
+        :param record_type: DocumentRecord, CommentRecord or DocketRecord.
+        """
+        self.record_type = record_type
+        self.ids = []
+        self.columns = {}
+        self.categories = {}
+        self._codes = {}
+        for _, slot, kind in record_type.FIELDS:
+            if kind == INTERN:
+                self.columns[slot] = array("i")
+                self.categories[slot] = []
+                self._codes[slot] = {}
+            elif kind == DATE:
+                self.columns[slot] = array("q")
+            elif kind == BOOL:
+                self.columns[slot] = array("b")
+            else:
+                self.columns[slot] = []
+        self._present = array("Q")
+        # sparse: index -> (Record._extra, Record._top), for the records that have one
+        self._extras = {}
+
+    @classmethod
+    def from_api(cls, records: Iterable[dict], record_type: type = None):
+        """
+        Build a batch from JSON:API records, e.g. api.iter_comments(...).
+
+        :param records: Records, consumed one at a time.
+        :param record_type: Record class; defaults to the type of the first record.
+        """
+        batch = None if record_type is None else cls(record_type)
+        for record in records:
+            if batch is None:
+                record_type = RECORD_TYPES.get(record.get("type"))
+                if record_type is None:
+                    raise ValueError(f"No record type for {record.get('type')!r}")
+                batch = cls(record_type)
+            batch.append(record_type.from_api(record))
+        return batch if batch is not None else cls(record_type or DocumentRecord)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Record], record_type: type = None):
+        records = iter(records)
+        first = next(records, None)
+        batch = cls(record_type or (type(first) if first is not None else DocumentRecord))
+        if first is not None:
+            batch.append(first)
+            batch.extend(records)
+        return batch
+
+    def append(self, record: Record):
+        if type(record) is not self.record_type:
+            raise TypeError(f"Expected {self.record_type.__name__}, got {type(record).__name__}")
+        index = len(self.ids)
+        self.ids.append(record.id)
+        for _, slot, kind in self.record_type.FIELDS:
+            value = getattr(record, slot)
+            column = self.columns[slot]
+            if kind == INTERN:
+                if value is None:
+                    column.append(-1)
+                    continue
+                code = self._codes[slot].get(value)
+                if code is None:
+                    code = self._codes[slot][value] = len(self.categories[slot])
+                    self.categories[slot].append(value)
+                column.append(code)
+            elif kind == DATE:
+                column.append(_NULL_DATE if value is None else int(value.timestamp()))
+            elif kind == BOOL:
+                column.append(_NULL_BOOL if value is None else int(value))
+            else:
+                column.append(value)
+        self._present.append(record._present)
+        if record._extra or record._top:
+            self._extras[index] = (record._extra, record._top)
+
+    def extend(self, records: Iterable[Record]):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index: int) -> Record:
+        if index < 0:
+            index += len(self.ids)
+        record = self.record_type.__new__(self.record_type)
+        record.id = self.ids[index]
+        for _, slot, kind in self.record_type.FIELDS:
+            value = self.columns[slot][index]
+            if kind == INTERN:
+                value = None if value == -1 else self.categories[slot][value]
+            elif kind == DATE:
+                value = None if value == _NULL_DATE else _from_epoch(value)
+            elif kind == BOOL:
+                value = None if value == _NULL_BOOL else bool(value)
+            setattr(record, slot, value)
+        record._present = self._present[index]
+        record._extra, record._top = self._extras.get(index, (None, None))
+        return record
+
+    def __iter__(self):
+        for index in range(len(self.ids)):
+            yield self[index]
+
+    def to_api(self) -> List[dict]:
+        """The JSON:API records, in order."""
+        return [record.to_api() for record in self]
+
+    def column(self, name: str) -> list:
+        """Values of one column ("id" or a slot name) as Python objects."""
+        if name == "id":
+            return list(self.ids)
+        kind = next((k for _, slot, k in self.record_type.FIELDS if slot == name), None)
+        if kind is None:
+            raise KeyError(name)
+        values = self.columns[name]
+        if kind == INTERN:
+            categories = self.categories[name]
+            return [None if code == -1 else categories[code] for code in values]
+        if kind == DATE:
+            return [None if v == _NULL_DATE else _from_epoch(v) for v in values]
+        if kind == BOOL:
+            return [None if v == _NULL_BOOL else bool(v) for v in values]
+        return list(values)
+
+    def to_numpy(self) -> dict:
+        """
+        Columns as NumPy arrays (requires numpy): datetime64[s] with NaT for dates,
+        float 1.0 / 0.0 with NaN for null for booleans, object arrays for strings.
+        Interned columns are decoded; their codes are in columns[name].
+        """
+        import numpy as np
+
+        arrays = {"id": np.array(self.ids, dtype=object)}
+        for _, slot, kind in self.record_type.FIELDS:
+            values = self.columns[slot]
+            if kind == DATE:
+                arrays[slot] = np.frombuffer(values, dtype=np.int64).view("datetime64[s]")
+            elif kind == BOOL:
+                flags = np.frombuffer(values, dtype=np.int8).astype(np.float64)
+                flags[flags == _NULL_BOOL] = np.nan
+                arrays[slot] = flags
+            elif kind == INTERN:
+                codes = np.frombuffer(values, dtype=np.int32)
+                categories = np.array(self.categories[slot] + [None], dtype=object)
+                arrays[slot] = categories[codes]  # code -1 picks the trailing None
+            else:
+                arrays[slot] = np.array(values, dtype=object)
+        return arrays
+
+    def to_arrow(self):
+        """
+        Columns as a pyarrow.Table (requires pyarrow): dictionary-encoded strings,
+        timestamp[s, UTC] dates and booleans, with nulls where the record had none.
+        """
+        import pyarrow as pa
+
+        columns = {"id": pa.array(self.ids, type=pa.string())}
+        for _, slot, kind in self.record_type.FIELDS:
+            values = self.columns[slot]
+            if kind == INTERN:
+                codes = pa.array([None if code == -1 else code for code in values], type=pa.int32())
+                columns[slot] = pa.DictionaryArray.from_arrays(
+                    codes, pa.array(self.categories[slot], type=pa.string()))
+            elif kind == DATE:
+                columns[slot] = pa.array([None if v == _NULL_DATE else v for v in values],
+                                         type=pa.timestamp("s", tz="UTC"))
+            elif kind == BOOL:
+                columns[slot] = pa.array([None if v == _NULL_BOOL else bool(v) for v in values],
+                                         type=pa.bool_())
+            else:
+                columns[slot] = pa.array(values, type=pa.string())
+        return pa.table(columns)
@@ -24,19 +24,49 @@
 #    - Generate pre-signed file-upload URLs for attachments
 #
 # 2. Uses requests library to make HTTP calls.
+#    - A single pooled, keep-alive requests.Session is shared by every endpoint method,
+#      so repeated calls reuse TCP/TLS connections instead of re-handshaking.
+#    - Pool size, per-host connection limits and connect/read timeouts are configurable.
 #
-# 3. Allows passing of an API key for authorized requests via header.
+# 3. Paces requests with a token-bucket RateLimiter (see rate_limiter.py) that tracks the
+#    per-key hourly quota from X-RateLimit-* response headers, and retries 429/5xx
+#    responses with jittered exponential backoff that honors Retry-After.
 #
-# 4. Methods provide parameters matching the API spec for filtering, sorting, paging, etc.
+# 4. Allows passing of an API key for authorized requests via header.
 #
-# 5. Follows best practices:
+# 5. Methods provide parameters matching the API spec for filtering, sorting, paging, etc.
+#
+# 6. Follows best practices:
 #    - Clear docstrings for each method.
 #    - Checks for required parameters.
 #    - Returns JSON responses directly.
 #
-# 6. Includes graceful error handling for non-200 responses:
+# 7. Includes graceful error handling for non-200 responses:
 #    - Raises exceptions with meaningful messages if the API returns a non-success status code.
 #
+# 8. Provides iter_documents / iter_comments / iter_dockets generators that stream every
+#    matching record past the 5,000-record (20 pages x 250) paging ceiling, using the
+#    lastModifiedDate windowing workaround described in the API documentation.
+#
+# 9. Provides get_documents_by_ids / get_comments_by_ids / get_dockets_by_ids to hydrate
+#    the details of many records at once on a worker pool, reporting per-ID failures
+#    without aborting the batch.
+#
+# 10. Optionally caches GET responses in a pluggable ResponseCache (in-memory LRU or
+#     SQLite, see response_cache.py) with per-endpoint TTLs. Expired entries are
+#     revalidated with conditional GETs (If-None-Match / If-Modified-Since), and detail
+#     records can optionally be served stale while being refreshed in the background.
+#
+# 11. download_files streams attachment files to disk with resumable, parallel, verified
+#     downloads (see attachment_downloader.py).
+#
+# 12. An optional request_hook receives the method, URL, status and timing of every HTTP
+#     attempt (retries included), e.g. to record them as spans in a trace.
+#
+# 13. GET methods accept fields=[...] to keep only the named attributes of each record
+#     (so bulk pulls hold small dicts) and raw=True to return the undecoded body. Bodies
+#     are decoded with orjson when it is installed.
+#
 # ----------------------------------------
 # Usage Example:
 # ----------------------------------------
@@ -60,14 +90,187 @@
 #
 # print(response)
 #
+# # Stream every comment on a document, however many there are:
+# for comment in api.iter_comments(filter_commentOnId="09000064846eebaf"):
+#     print(comment["id"])
+#
 ##########################################################################################
 
+import json
+import random
+import re
+import time
+from collections import deque
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
 import requests
+from requests.adapters import HTTPAdapter
+from typing import Any, Callable, List, NamedTuple
 from urllib.parse import urlencode
+from attachment_downloader import AttachmentDownloader
+from rate_limiter import RateLimiter
+from response_cache import ResponseCache, make_cache_key
+
+try:
+    import orjson
+except ImportError:  # response bodies are decoded with the json module
+    orjson = None
+
+
+def project_record(record: dict, fields) -> dict:
+    """
+    Reduce a JSON:API record to its id, type and the given attributes.
+    
+    :param record: Record as found in a response's "data".
+    :param fields: Attribute names to keep.
+    """
+    attributes = record.get("attributes") or {}
+    return {
+        "id": record.get("id"),
+        "type": record.get("type"),
+        "attributes": {name: attributes[name] for name in fields if name in attributes},
+    }
+
+
+def project_response(response: dict, fields) -> dict:
+    """
+    Apply project_record to the record(s) of a decoded response, in place.
+    """
+    data = response.get("data")
+    if isinstance(data, list):
+        response["data"] = [project_record(r, fields) for r in data]
+    elif isinstance(data, dict):
+        response["data"] = project_record(data, fields)
+    return response
+
+
+def _unique(ids):
+    """
+    Yield the IDs of an iterable in order, skipping repeats, without reading the whole
+    iterable first.
+    """
+    seen = set()
+    for record_id in ids:
+        if record_id not in seen:
+            seen.add(record_id)
+            yield record_id
+
+
+def _window_projection(fields) -> dict:
+    """
+    Keyword arguments projecting list pages for _iter_windowed, which needs the
+    lastModifiedDate of every record.
+    """
+    if fields is None:
+        return {}
+    return {"fields": list(fields) if "lastModifiedDate" in fields else [*fields, "lastModifiedDate"]}
+
 
 class RegulationsGovAPIError(Exception):
     """Custom exception for Regulations.gov API errors."""
-    pass
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class BatchResult(NamedTuple):
+    """
+    Outcome of fetching one ID in a batch call such as get_comments_by_ids.
+    
+    Exactly one of data (the JSON response) and error (the exception raised while
+    fetching) is set.
+    """
+    id: str
+    data: Any = None
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+EASTERN = ZoneInfo("America/New_York")
+
+
+def utc_to_eastern(timestamp: str) -> str:
+    """
+    Convert an API lastModifiedDate (e.g. "2020-08-10T15:58:52Z") into the Eastern-time
+    format expected by the lastModifiedDate filters (e.g. "2020-08-10 11:58:52").
+    """
+    utc = datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+    return utc.astimezone(EASTERN).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def eastern_to_utc(timestamp: str) -> str:
+    """
+    Inverse of utc_to_eastern: convert a filter value such as "2020-08-10 11:58:52"
+    (Eastern time) into the API's UTC format (e.g. "2020-08-10T15:58:52Z").
+    """
+    eastern = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S").replace(tzinfo=EASTERN)
+    return eastern.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class _WindowCursor:
+    """
+    Boundary bookkeeping for paging through lastModifiedDate windows.
+    
+    Shared by the blocking and asyncio iterators so both apply the same windowing and
+    de-duplication rules.
+    """
+
+    def __init__(self, filters: dict, max_page_number: int, page_size: int):
+        self.filters = dict(filters)
+        self.max_page_number = max_page_number
+        self.page_size = page_size
+        self.boundary_ts = None
+        self.boundary_ids = set()
+        self.window_start = None
+        self.yielded = 0
+
+    def start_window(self):
+        self.window_start = self.boundary_ts
+        self.yielded = 0
+
+    def is_new(self, record: dict) -> bool:
+        """Return False for records already yielded at the current boundary timestamp."""
+        ts = record.get("attributes", {}).get("lastModifiedDate")
+        if ts == self.boundary_ts:
+            if record["id"] in self.boundary_ids:
+                return False
+            self.boundary_ids.add(record["id"])
+        else:
+            self.boundary_ts = ts
+            self.boundary_ids = {record["id"]}
+        self.yielded += 1
+        return True
+
+    def is_last_page(self, response: dict, records: list, page_number: int) -> bool:
+        """Return True once there are no more records to fetch at all."""
+        # A short page always ends the results. hasNextPage is only trusted before the
+        # last allowed page: on that page a full result set means there may be more
+        # records beyond the window.
+        if len(records) < self.page_size:
+            return True
+        return page_number < self.max_page_number and not response.get("meta", {}).get("hasNextPage", True)
+
+    def advance(self) -> bool:
+        """
+        Move the lastModifiedDate filter to the start of the next window.
+        
+        :return: False if there is nothing left to page through.
+        :raises RegulationsGovAPIError: if a whole window shares one lastModifiedDate
+        """
+        if self.boundary_ts is None:
+            return False
+        if self.boundary_ts == self.window_start and not self.yielded:
+            raise RegulationsGovAPIError(
+                f"Cannot page past {self.max_page_number * self.page_size} records sharing "
+                f"lastModifiedDate {self.boundary_ts}")
+        self.filters["filter_lastModifiedDate_ge"] = utc_to_eastern(self.boundary_ts)
+        return True
 
 
 class RegulationsGovAPI:
@@ -80,32 +283,343 @@ class RegulationsGovAPI:
 
     BASE_URL = "https://api.regulations.gov/v4"
 
-    def __init__(self, api_key: str):
+    # Paging limits enforced by the API: at most 20 pages of 250 records per query.
+    MAX_PAGE_NUMBER = 20
+    MAX_PAGE_SIZE = 250
+
+    # Statuses that are safe to retry. 429 means the request was rejected before being
+    # processed, so it is retried for every method; 5xx is only retried for GET requests
+    # to avoid posting the same comment twice.
+    RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+    # Default cache lifetimes in seconds, keyed by endpoint route. "{id}" routes are the
+    # detail endpoints; "withinCommentPeriod" applies to any search using that filter,
+    # since its results change as comment periods open and close. A missing route or a
+    # TTL of 0 disables caching for that route.
+    DEFAULT_CACHE_TTLS = {
+        "/documents/{id}": 24 * 3600,
+        "/comments/{id}": 24 * 3600,
+        "/dockets/{id}": 24 * 3600,
+        "/documents": 15 * 60,
+        "/comments": 15 * 60,
+        "/dockets": 15 * 60,
+        "/agency-categories": 7 * 24 * 3600,
+        "withinCommentPeriod": 60,
+    }
+
+    def __init__(self,
+                 api_key: str,
+                 pool_connections: int = 4,
+                 pool_maxsize: int = 16,
+                 pool_block: bool = True,
+                 connect_timeout: float = 5.0,
+                 read_timeout: float = 30.0,
+                 session: requests.Session = None,
+                 rate_limiter: RateLimiter = None,
+                 max_retries: int = 4,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 cache: ResponseCache = None,
+                 cache_ttls: dict = None,
+                 stale_while_revalidate: float = 0,
+                 request_hook: Callable[[dict], None] = None,
+                 json_loads: Callable = None):
         """
         Initialize the API client with a provided API key.
         
+        The client owns one pooled, keep-alive HTTP session that is shared by all endpoint
+        methods. The session only carries connection state (auth headers are sent per
+        request), so a single client instance can be used from multiple threads.
+        
         :param api_key: Your Regulations.gov API key as a string.
+        :param pool_connections: Number of per-host connection pools to keep.
+        :param pool_maxsize: Maximum number of open connections per host.
+        :param pool_block: If True, callers wait for a free connection once pool_maxsize
+                           connections to a host are in use instead of opening more.
+        :param connect_timeout: Seconds to wait for a TCP/TLS connection to be established.
+        :param read_timeout: Seconds to wait for the server between bytes of the response.
+        :param session: Optional pre-configured requests.Session to use instead of
+                        creating one (adapters are left untouched in that case).
+        :param rate_limiter: Optional RateLimiter to share between clients using the same
+                             API key. A default limiter is created if omitted.
+        :param max_retries: Maximum number of retries for 429/5xx responses.
+        :param backoff_base: Base delay in seconds for exponential backoff.
+        :param backoff_max: Upper bound in seconds for a single backoff delay.
+        :param cache: Optional ResponseCache (e.g. MemoryCache or SQLiteCache) for GET
+                      responses. Caching is disabled if omitted.
+        :param cache_ttls: Overrides for DEFAULT_CACHE_TTLS, e.g. {"/comments": 0}.
+        :param stale_while_revalidate: For detail endpoints, serve a cached record up to
+                                       this many seconds past its expiry immediately and
+                                       refresh it in the background. 0 disables this.
+        :param request_hook: Optional callable invoked after every HTTP attempt with a dict
+                             of method, url, status, attempt, start and end (epoch
+                             seconds) and, for failed connections, error. Used for
+                             tracing, e.g. swarm's Tracer.http_hook.
+        :param json_loads: Function decoding response bodies (bytes). Defaults to
+                           orjson.loads when orjson is installed, else json.loads.
         """
         self.api_key = api_key
         self.headers = {
             "X-Api-Key": self.api_key,
             "Content-Type": "application/vnd.api+json"
         }
+        self.cache = cache
+        self.cache_ttls = {**self.DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.stale_while_revalidate = stale_while_revalidate
+        self.timeout = (connect_timeout, read_timeout)
+
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_connections,
+                                  pool_maxsize=pool_maxsize,
+                                  pool_block=pool_block)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.request_hook = request_hook
+        self.json_loads = json_loads or (orjson.loads if orjson is not None else json.loads)
+
+        self._revalidator = None
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+
+    def close(self):
+        """
+        Close the underlying HTTP session and release pooled connections.
+        """
+        if self._revalidator is not None:
+            self._revalidator.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def quota(self) -> dict:
+        """
+        Current quota state as tracked by the rate limiter.
+        
+        :return: dict with limit, remaining, tokens, rate_per_second and paused_for.
+        """
+        return self.rate_limiter.state()
+
+    @staticmethod
+    def _route(endpoint: str) -> str:
+        """Map a concrete endpoint to its route, e.g. "/dockets/EPA-1" -> "/dockets/{id}"."""
+        return re.sub(r"^(/[^/]+)/[^/]+$", r"\1/{id}", endpoint)
+
+    def _cache_ttl(self, endpoint: str, params: dict = None) -> float:
+        """
+        Return how long the response of a GET request may be cached (0 = not at all).
+        """
+        if params and "filter[withinCommentPeriod]" in params:
+            return self.cache_ttls.get("withinCommentPeriod", 0)
+        return self.cache_ttls.get(self._route(endpoint), 0)
+
+    def _cache_lookup(self, endpoint: str, params: dict = None):
+        """
+        Look up a GET request in the cache.
+        
+        :return: (key, ttl, entry). key is None if the request is not cacheable; entry
+                 is the cached CacheEntry (possibly stale) or None.
+        """
+        if self.cache is None:
+            return None, 0, None
+        ttl = self._cache_ttl(endpoint, params)
+        if not ttl:
+            return None, 0, None
+        key = make_cache_key(endpoint, params)
+        return key, ttl, self.cache.get(key)
+
+    def _can_serve_stale(self, endpoint: str, entry) -> bool:
+        """
+        Whether an expired cache entry may be returned while it is refreshed.
+        """
+        return (self.stale_while_revalidate > 0
+                and self._route(endpoint).endswith("/{id}")
+                and time.time() < entry.expires_at + self.stale_while_revalidate)
+
+    @staticmethod
+    def _conditional_headers(entry) -> dict:
+        """
+        Build If-None-Match / If-Modified-Since headers from a cached entry's validators.
+        """
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
 
-    def _get(self, endpoint: str, params: dict = None):
+    def _cache_store(self, key: str, ttl: float, body: bytes, headers, previous=None):
+        """
+        Store a response body with the validators from its headers. On a 304 the new
+        headers may omit validators, so the previous entry's are kept.
+        """
+        etag = headers.get("ETag") or (previous.etag if previous else None)
+        last_modified = headers.get("Last-Modified") or (previous.last_modified if previous else None)
+        self.cache.set(key, body, ttl, etag=etag, last_modified=last_modified)
+
+    def _begin_revalidation(self, key: str) -> bool:
+        """
+        Mark key as being refreshed in the background. Returns False if it already is.
+        """
+        with self._revalidating_lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def _end_revalidation(self, key: str):
+        with self._revalidating_lock:
+            self._revalidating.discard(key)
+
+    def _backoff_delay(self, attempt: int, response: requests.Response) -> float:
+        """
+        Compute how long to wait before retrying a failed request.
+        
+        Uses the Retry-After header if the server sent one, otherwise exponential
+        backoff with full jitter.
+        """
+        retry_after = response.headers.get("Retry-After")
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _report_request(self, method: str, url: str, status: int, attempt: int, start: float,
+                        error: Exception = None):
+        """
+        Pass the timing of one HTTP attempt to request_hook, if one is set.
+        """
+        if self.request_hook is None:
+            return
+        info = {"method": method, "url": url, "status": status, "attempt": attempt,
+                "start": start, "end": time.time()}
+        if error is not None:
+            info["error"] = f"{type(error).__name__}: {error}"
+        self.request_hook(info)
+
+    def _request(self, method: str, url: str, headers: dict = None, **kwargs) -> requests.Response:
+        """
+        Send a request through the rate limiter, retrying 429/5xx responses.
+        
+        :param method: HTTP method ("GET" or "POST")
+        :param url: Absolute URL to request
+        :param headers: Extra headers for this request, merged over the client headers
+        :param kwargs: Extra arguments passed to requests.Session.request
+        :return: The final requests.Response (which may still be an error response)
+        :raises RegulationsGovAPIError: on connection errors or timeouts
+        """
+        headers = {**self.headers, **headers} if headers else self.headers
+        attempt = 0
+        while True:
+            self.rate_limiter.acquire()
+            start = time.time()
+            try:
+                response = self.session.request(method, url, headers=headers,
+                                                timeout=self.timeout, **kwargs)
+            except requests.RequestException as e:
+                self._report_request(method, url, None, attempt, start, error=e)
+                raise RegulationsGovAPIError(f"{method} {url} failed: {e}") from e
+            self._report_request(method, url, response.status_code, attempt, start)
+            self.rate_limiter.update_from_headers(response.headers)
+
+            status = response.status_code
+            retryable = status == 429 or (method == "GET" and status in self.RETRY_STATUSES)
+            if not retryable or attempt >= self.max_retries:
+                return response
+
+            delay = self._backoff_delay(attempt, response)
+            if status == 429:
+                # Pause every caller sharing this limiter, not just this thread.
+                self.rate_limiter.pause(delay)
+            else:
+                time.sleep(delay)
+            attempt += 1
+
+    def _decode(self, body: bytes, fields: List[str] = None, raw: bool = False):
+        """
+        Turn a response body into what _get returns.
+        
+        :param body: Response body
+        :param fields: Attribute names to keep in each record (None keeps everything)
+        :param raw: Return the body itself, undecoded
+        """
+        if raw:
+            return body
+        response = self.json_loads(body)
+        if fields is not None:
+            project_response(response, fields)
+        return response
+
+    def _get(self, endpoint: str, params: dict = None, fields: List[str] = None, raw: bool = False):
         """
         Internal method for handling GET requests.
         
         :param endpoint: API endpoint (e.g. "/documents")
         :param params: Dictionary of query parameters
-        :return: JSON response from the API
+        :param fields: Keep only these attributes of each record (plus id and type),
+                       dropping links and relationships, so large result sets hold
+                       small dicts. Cached bodies are stored whole.
+        :param raw: Return the response body as undecoded bytes, e.g. to store it as-is.
+        :return: JSON response from the API (bytes if raw)
+        :raises RegulationsGovAPIError: if response status is not successful
+        """
+        key, ttl, entry = self._cache_lookup(endpoint, params)
+        if entry is not None:
+            if entry.is_fresh():
+                return self._decode(entry.body, fields, raw)
+            if self._can_serve_stale(endpoint, entry):
+                if self._begin_revalidation(key):
+                    if self._revalidator is None:
+                        self._revalidator = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rga-revalidate")
+                    self._revalidator.submit(self._revalidate, endpoint, params, key, ttl, entry)
+                return self._decode(entry.body, fields, raw)
+        return self._decode(self._fetch(endpoint, params, key, ttl, entry), fields, raw)
+
+    def _fetch(self, endpoint: str, params: dict, key: str, ttl: float, entry):
+        """
+        Perform a GET request, conditional on the validators of a stale cache entry if
+        there is one, and store the result in the cache.
+        
+        :return: Response body (the cached body on 304 Not Modified)
         :raises RegulationsGovAPIError: if response status is not successful
         """
         url = f"{self.BASE_URL}{endpoint}"
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self._request("GET", url, headers=self._conditional_headers(entry), params=params)
+        if response.status_code == 304 and entry is not None:
+            self._cache_store(key, ttl, entry.body, response.headers, previous=entry)
+            return entry.body
         if not response.ok:
-            raise RegulationsGovAPIError(f"GET {url} failed with status {response.status_code}: {response.text}")
-        return response.json()
+            raise RegulationsGovAPIError(f"GET {url} failed with status {response.status_code}: {response.text}",
+                                         status_code=response.status_code)
+        if key is not None:
+            self._cache_store(key, ttl, response.content, response.headers)
+        return response.content
+
+    def _revalidate(self, endpoint: str, params: dict, key: str, ttl: float, entry):
+        """
+        Background refresh of a stale cache entry. Errors are ignored: the stale entry
+        stays in place and the next request tries again.
+        """
+        try:
+            self._fetch(endpoint, params, key, ttl, entry)
+        except RegulationsGovAPIError:
+            pass
+        finally:
+            self._end_revalidation(key)
 
     def _post(self, endpoint: str, data: dict):
         """
@@ -117,11 +631,96 @@ class RegulationsGovAPI:
         :raises RegulationsGovAPIError: if response status is not successful
         """
         url = f"{self.BASE_URL}{endpoint}"
-        response = requests.post(url, headers=self.headers, json={"data": data})
+        response = self._request("POST", url, json={"data": data})
         if response.status_code not in (200, 201):
-            raise RegulationsGovAPIError(f"POST {url} failed with status {response.status_code}: {response.text}")
+            raise RegulationsGovAPIError(f"POST {url} failed with status {response.status_code}: {response.text}",
+                                         status_code=response.status_code)
         return response.json()
 
+    def _iter_windowed(self, fetch_page, sort: str, filters: dict, page_size: int, fields: List[str] = None):
+        """
+        Internal generator that streams every record of a list endpoint.
+        
+        The API stops paging after MAX_PAGE_NUMBER pages, so results are sorted by
+        lastModifiedDate and, whenever a window of pages is exhausted, the query is
+        re-issued with filter[lastModifiedDate][ge] set to the lastModifiedDate of the
+        last record seen (converted to Eastern time). Because the filter is inclusive,
+        records sharing that boundary timestamp are returned again; their IDs are
+        remembered and skipped. Only the IDs at the current boundary timestamp are kept,
+        so memory stays constant regardless of the total number of records.
+        
+        :param fetch_page: Bound list method (e.g. self.get_comments)
+        :param sort: Sort expression starting with lastModifiedDate
+        :param filters: filter_* keyword arguments passed through to fetch_page
+        :param page_size: Number of records per page (5 to 250)
+        :param fields: Attribute names to keep in each record (see _get); lastModifiedDate
+                       is always kept since the windowing needs it
+        :return: Generator of record dicts as found in the response "data" list
+        :raises RegulationsGovAPIError: if more than one window of records shares a
+                                        single lastModifiedDate and cannot be paged past
+        """
+        cursor = _WindowCursor(filters, self.MAX_PAGE_NUMBER, page_size)
+        projection = _window_projection(fields)
+        while True:
+            cursor.start_window()
+            for page_number in range(1, self.MAX_PAGE_NUMBER + 1):
+                response = fetch_page(sort=sort, page_number=page_number, page_size=page_size,
+                                      **projection, **cursor.filters)
+                records = response.get("data", [])
+                for record in records:
+                    if cursor.is_new(record):
+                        yield record
+                if cursor.is_last_page(response, records, page_number):
+                    return
+            if not cursor.advance():
+                return
+
+    def _fetch_many(self, fetch_one, ids, max_workers: int, ordered: bool, **kwargs):
+        """
+        Internal generator that fetches many records on a worker pool.
+        
+        IDs are consumed lazily, so results start streaming before a generator of IDs is
+        exhausted, and repeated IDs are fetched once (only the IDs seen so far are kept).
+        At most 2 * max_workers requests are queued at a time, so pending results stay
+        bounded however many IDs are passed and abandoning the generator early does not
+        leave a large backlog of requests running.
+        
+        :param fetch_one: Bound detail method (e.g. self.get_comment_by_id)
+        :param ids: Iterable of IDs
+        :param max_workers: Number of worker threads
+        :param ordered: If True, yield in input order; otherwise in completion order
+        :param kwargs: Extra keyword arguments passed to fetch_one
+        :return: Generator of BatchResult
+        """
+        def fetch(record_id):
+            try:
+                return BatchResult(record_id, data=fetch_one(record_id, **kwargs))
+            except Exception as e:
+                return BatchResult(record_id, error=e)
+
+        max_pending = 2 * max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            if ordered:
+                pending = deque()
+                for record_id in _unique(ids):
+                    pending.append(pool.submit(fetch, record_id))
+                    if len(pending) >= max_pending:
+                        yield pending.popleft().result()
+                while pending:
+                    yield pending.popleft().result()
+            else:
+                pending = set()
+                for record_id in _unique(ids):
+                    pending.add(pool.submit(fetch, record_id))
+                    if len(pending) >= max_pending:
+                        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            yield future.result()
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+
     # ----------------------------
     # DOCUMENTS ENDPOINTS
     # ----------------------------
@@ -135,11 +734,15 @@ class RegulationsGovAPI:
                       filter_searchTerm: str = None,
                       filter_postedDate: str = None,
                       filter_lastModifiedDate: str = None,
+                      filter_lastModifiedDate_ge: str = None,
+                      filter_lastModifiedDate_le: str = None,
                       filter_subtype: str = None,
                       filter_withinCommentPeriod: bool = None,
                       sort: str = None,
                       page_number: int = None,
-                      page_size: int = None):
+                      page_size: int = None,
+                      fields: List[str] = None,
+                      raw: bool = False):
         """
         Retrieve a list of documents matching the provided filters.
         
@@ -151,11 +754,16 @@ class RegulationsGovAPI:
         :param filter_searchTerm: Full-text search term
         :param filter_postedDate: Date filter (format: yyyy-MM-dd, can use ge/le)
         :param filter_lastModifiedDate: DateTime filter (yyyy-MM-dd HH:mm:ss, can use ge/le)
+        :param filter_lastModifiedDate_ge: Lower bound for lastModifiedDate (Eastern time, yyyy-MM-dd HH:mm:ss)
+        :param filter_lastModifiedDate_le: Upper bound for lastModifiedDate (Eastern time, yyyy-MM-dd HH:mm:ss)
         :param filter_subtype: Filter by document subtype
         :param filter_withinCommentPeriod: If True, filter documents currently open for comment
         :param sort: Sort by a field. e.g. "postedDate", "-postedDate"
         :param page_number: Page number (1 to 20)
         :param page_size: Page size (5 to 250)
+        :param fields: Attribute names to keep in each record, e.g. ["title", "postedDate"]
+                       (None keeps the full records)
+        :param raw: If True, return the undecoded response body as bytes
         
         :return: JSON response with documents list and metadata.
         """
@@ -176,6 +784,10 @@ class RegulationsGovAPI:
             params['filter[postedDate]'] = filter_postedDate
         if filter_lastModifiedDate:
             params['filter[lastModifiedDate]'] = filter_lastModifiedDate
+        if filter_lastModifiedDate_ge:
+            params['filter[lastModifiedDate][ge]'] = filter_lastModifiedDate_ge
+        if filter_lastModifiedDate_le:
+            params['filter[lastModifiedDate][le]'] = filter_lastModifiedDate_le
         if filter_subtype:
             params['filter[subtype]'] = filter_subtype
         if filter_withinCommentPeriod is True:
@@ -187,21 +799,56 @@ class RegulationsGovAPI:
         if page_size:
             params['page[size]'] = page_size
 
-        return self._get("/documents", params)
+        return self._get("/documents", params, fields=fields, raw=raw)
 
-    def get_document_by_id(self, document_id: str, include_attachments: bool = False):
+    def iter_documents(self, page_size: int = 250, fields: List[str] = None, **filters):
+        """
+        Stream every document matching the provided filters, lazily, one record at a time.
+        
+        Unlike get_documents this is not limited to 5,000 results: it pages through
+        lastModifiedDate windows automatically (see _iter_windowed).
+        
+        :param page_size: Page size used for each request (5 to 250)
+        :param fields: Attribute names to keep in each record (None keeps everything)
+        :param filters: Any filter_* keyword argument accepted by get_documents
+        :return: Generator of document records
+        """
+        return self._iter_windowed(self.get_documents, "lastModifiedDate,documentId", filters, page_size, fields)
+
+    def get_document_by_id(self, document_id: str, include_attachments: bool = False,
+                                  fields: List[str] = None, raw: bool = False):
         """
         Retrieve detailed information for a specified document by ID.
         
         :param document_id: The documentId to fetch details for.
         :param include_attachments: If True, include attachments in the response.
+        :param fields: Attribute names to keep (None keeps the full record).
+        :param raw: If True, return the undecoded response body as bytes.
         
         :return: JSON response with document details.
         """
         params = {}
         if include_attachments:
             params['include'] = 'attachments'
-        return self._get(f"/documents/{document_id}", params)
+        return self._get(f"/documents/{document_id}", params, fields=fields, raw=raw)
+
+    def get_documents_by_ids(self, document_ids, include_attachments: bool = False,
+                             max_workers: int = 8, ordered: bool = True):
+        """
+        Retrieve the details of many documents concurrently.
+        
+        Repeated IDs are fetched once. A failure for one ID is reported in its
+        BatchResult and does not abort the rest of the batch.
+        
+        :param document_ids: Iterable of documentIds.
+        :param include_attachments: If True, include attachments in each response.
+        :param max_workers: Number of concurrent requests.
+        :param ordered: If True, yield results in input order; otherwise as they complete.
+        
+        :return: Generator of BatchResult(id, data, error).
+        """
+        return self._fetch_many(self.get_document_by_id, document_ids, max_workers, ordered,
+                                include_attachments=include_attachments)
 
     # ----------------------------
     # COMMENTS ENDPOINTS
@@ -212,10 +859,14 @@ class RegulationsGovAPI:
                      filter_searchTerm: str = None,
                      filter_postedDate: str = None,
                      filter_lastModifiedDate: str = None,
+                     filter_lastModifiedDate_ge: str = None,
+                     filter_lastModifiedDate_le: str = None,
                      filter_commentOnId: str = None,
                      sort: str = None,
                      page_number: int = None,
-                     page_size: int = None):
+                     page_size: int = None,
+                     fields: List[str] = None,
+                     raw: bool = False):
         """
         Retrieve a list of comments based on given filters.
         
@@ -223,10 +874,15 @@ class RegulationsGovAPI:
         :param filter_searchTerm: Full-text search term
         :param filter_postedDate: Date filter (yyyy-MM-dd, can use ge/le)
         :param filter_lastModifiedDate: DateTime filter (yyyy-MM-dd HH:mm:ss, can use ge/le)
+        :param filter_lastModifiedDate_ge: Lower bound for lastModifiedDate (Eastern time, yyyy-MM-dd HH:mm:ss)
+        :param filter_lastModifiedDate_le: Upper bound for lastModifiedDate (Eastern time, yyyy-MM-dd HH:mm:ss)
         :param filter_commentOnId: Filters results on supplied commentOnId (objectId of a document)
         :param sort: Sort field (e.g. postedDate, -postedDate)
         :param page_number: Page number (1 to 20)
         :param page_size: Page size (5 to 250)
+        :param fields: Attribute names to keep in each record, e.g. ["title", "postedDate"]
+                       (None keeps the full records)
+        :param raw: If True, return the undecoded response body as bytes
         
         :return: JSON response with comments list and metadata.
         """
@@ -239,6 +895,10 @@ class RegulationsGovAPI:
             params['filter[postedDate]'] = filter_postedDate
         if filter_lastModifiedDate:
             params['filter[lastModifiedDate]'] = filter_lastModifiedDate
+        if filter_lastModifiedDate_ge:
+            params['filter[lastModifiedDate][ge]'] = filter_lastModifiedDate_ge
+        if filter_lastModifiedDate_le:
+            params['filter[lastModifiedDate][le]'] = filter_lastModifiedDate_le
         if filter_commentOnId:
             params['filter[commentOnId]'] = filter_commentOnId
         if sort:
@@ -248,7 +908,21 @@ class RegulationsGovAPI:
         if page_size:
             params['page[size]'] = page_size
 
-        return self._get("/comments", params)
+        return self._get("/comments", params, fields=fields, raw=raw)
+
+    def iter_comments(self, page_size: int = 250, fields: List[str] = None, **filters):
+        """
+        Stream every comment matching the provided filters, lazily, one record at a time.
+        
+        Unlike get_comments this is not limited to 5,000 results: it pages through
+        lastModifiedDate windows automatically (see _iter_windowed).
+        
+        :param page_size: Page size used for each request (5 to 250)
+        :param fields: Attribute names to keep in each record (None keeps everything)
+        :param filters: Any filter_* keyword argument accepted by get_comments
+        :return: Generator of comment records
+        """
+        return self._iter_windowed(self.get_comments, "lastModifiedDate,documentId", filters, page_size, fields)
 
     def post_comment(self, attributes: dict):
         """
@@ -285,19 +959,40 @@ class RegulationsGovAPI:
         }
         return self._post("/comments", data)
 
-    def get_comment_by_id(self, comment_id: str, include_attachments: bool = False):
+    def get_comment_by_id(self, comment_id: str, include_attachments: bool = False,
+                                 fields: List[str] = None, raw: bool = False):
         """
         Retrieve detailed information for a specified comment by commentId.
         
         :param comment_id: The ID of the comment to retrieve.
         :param include_attachments: If True, include attachments.
+        :param fields: Attribute names to keep (None keeps the full record).
+        :param raw: If True, return the undecoded response body as bytes.
         
         :return: JSON response with the comment details.
         """
         params = {}
         if include_attachments:
             params['include'] = 'attachments'
-        return self._get(f"/comments/{comment_id}", params)
+        return self._get(f"/comments/{comment_id}", params, fields=fields, raw=raw)
+
+    def get_comments_by_ids(self, comment_ids, include_attachments: bool = False,
+                            max_workers: int = 8, ordered: bool = True):
+        """
+        Retrieve the details of many comments concurrently.
+        
+        Repeated IDs are fetched once. A failure for one ID is reported in its
+        BatchResult and does not abort the rest of the batch.
+        
+        :param comment_ids: Iterable of commentIds.
+        :param include_attachments: If True, include attachments in each response.
+        :param max_workers: Number of concurrent requests.
+        :param ordered: If True, yield results in input order; otherwise as they complete.
+        
+        :return: Generator of BatchResult(id, data, error).
+        """
+        return self._fetch_many(self.get_comment_by_id, comment_ids, max_workers, ordered,
+                                include_attachments=include_attachments)
 
     # ----------------------------
     # DOCKETS ENDPOINTS
@@ -307,20 +1002,29 @@ class RegulationsGovAPI:
                     filter_agencyId: str = None,
                     filter_searchTerm: str = None,
                     filter_lastModifiedDate: str = None,
+                    filter_lastModifiedDate_ge: str = None,
+                    filter_lastModifiedDate_le: str = None,
                     filter_docketType: str = None,
                     sort: str = None,
                     page_number: int = None,
-                    page_size: int = None):
+                    page_size: int = None,
+                    fields: List[str] = None,
+                    raw: bool = False):
         """
         Retrieve a list of dockets based on given filters.
         
         :param filter_agencyId: e.g. "EPA"
         :param filter_searchTerm: Full-text search term
         :param filter_lastModifiedDate: Date filter (yyyy-MM-dd HH:mm:ss, can use ge/le)
+        :param filter_lastModifiedDate_ge: Lower bound for lastModifiedDate (Eastern time, yyyy-MM-dd HH:mm:ss)
+        :param filter_lastModifiedDate_le: Upper bound for lastModifiedDate (Eastern time, yyyy-MM-dd HH:mm:ss)
         :param filter_docketType: One of [Rulemaking, Nonrulemaking]
         :param sort: e.g. "title", "-title"
         :param page_number: Page number (1 to 20)
         :param page_size: Page size (5 to 250)
+        :param fields: Attribute names to keep in each record, e.g. ["title", "postedDate"]
+                       (None keeps the full records)
+        :param raw: If True, return the undecoded response body as bytes
         
         :return: JSON response with dockets list and metadata.
         """
@@ -331,6 +1035,10 @@ class RegulationsGovAPI:
             params['filter[searchTerm]'] = filter_searchTerm
         if filter_lastModifiedDate:
             params['filter[lastModifiedDate]'] = filter_lastModifiedDate
+        if filter_lastModifiedDate_ge:
+            params['filter[lastModifiedDate][ge]'] = filter_lastModifiedDate_ge
+        if filter_lastModifiedDate_le:
+            params['filter[lastModifiedDate][le]'] = filter_lastModifiedDate_le
         if filter_docketType:
             params['filter[docketType]'] = filter_docketType
         if sort:
@@ -340,16 +1048,47 @@ class RegulationsGovAPI:
         if page_size:
             params['page[size]'] = page_size
 
-        return self._get("/dockets", params)
+        return self._get("/dockets", params, fields=fields, raw=raw)
 
-    def get_docket_by_id(self, docket_id: str):
+    def iter_dockets(self, page_size: int = 250, fields: List[str] = None, **filters):
+        """
+        Stream every docket matching the provided filters, lazily, one record at a time.
+        
+        Unlike get_dockets this is not limited to 5,000 results: it pages through
+        lastModifiedDate windows automatically (see _iter_windowed).
+        
+        :param page_size: Page size used for each request (5 to 250)
+        :param fields: Attribute names to keep in each record (None keeps everything)
+        :param filters: Any filter_* keyword argument accepted by get_dockets
+        :return: Generator of docket records
+        """
+        return self._iter_windowed(self.get_dockets, "lastModifiedDate,docketId", filters, page_size, fields)
+
+    def get_docket_by_id(self, docket_id: str, fields: List[str] = None, raw: bool = False):
         """
         Retrieve detailed information for a specified docket by docketId.
         
         :param docket_id: The docketId to fetch details for.
+        :param fields: Attribute names to keep (None keeps the full record).
+        :param raw: If True, return the undecoded response body as bytes.
         :return: JSON response with docket details.
         """
-        return self._get(f"/dockets/{docket_id}")
+        return self._get(f"/dockets/{docket_id}", fields=fields, raw=raw)
+
+    def get_dockets_by_ids(self, docket_ids, max_workers: int = 8, ordered: bool = True):
+        """
+        Retrieve the details of many dockets concurrently.
+        
+        Repeated IDs are fetched once. A failure for one ID is reported in its
+        BatchResult and does not abort the rest of the batch.
+        
+        :param docket_ids: Iterable of docketIds.
+        :param max_workers: Number of concurrent requests.
+        :param ordered: If True, yield results in input order; otherwise as they complete.
+        
+        :return: Generator of BatchResult(id, data, error).
+        """
+        return self._fetch_many(self.get_docket_by_id, docket_ids, max_workers, ordered)
 
     # ----------------------------
     # AGENCY CATEGORIES ENDPOINT
@@ -406,3 +1145,26 @@ class RegulationsGovAPI:
             }
         }
         return self._post("/file-upload-urls", data)
+
+    # ----------------------------
+    # ATTACHMENT DOWNLOADS
+    # ----------------------------
+
+    def download_files(self, files, dest_dir: str = "downloads", ordered: bool = False, **kwargs):
+        """
+        Download attachment files (e.g. the fileFormats of a document) to disk.
+        
+        Files are streamed in chunks over this client's pooled session, resumed with HTTP
+        Range requests after interruptions, verified against their reported size and
+        skipped if already present. See attachment_downloader.py.
+        
+        :param files: Iterable of fileFormats entries (dicts with fileUrl and size) or URLs.
+                      AttachmentDownloader.files_of(detail_response) collects them.
+        :param dest_dir: Directory files are saved under.
+        :param ordered: If True, yield results in input order; otherwise as they complete.
+        :param kwargs: Extra AttachmentDownloader options (max_workers, per_host_limit,
+                       chunk_size, max_retries, checksum, ...).
+        :return: Generator of DownloadResult.
+        """
+        downloader = AttachmentDownloader(dest_dir=dest_dir, session=self.session, **kwargs)
+        return downloader.download_many(files, ordered=ordered)
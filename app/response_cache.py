@@ -0,0 +1,307 @@
+##########################################################################################
+# response_cache.py
+#
+# Pluggable response caches for the GET endpoints of RegulationsGovAPI.
+#
+# Agents often ask for the same document or docket several times within a conversation
+# (and across users of a shared deployment). Caching GET responses avoids both the
+# network round trip and a hit against the hourly API quota.
+#
+# ----------------------------------------
+# Key Features:
+# ----------------------------------------
+# 1. Entries are keyed on endpoint + normalized query parameters (see make_cache_key),
+#    so the same query with parameters in a different order shares one entry.
+#
+# 2. Each entry stores the raw response body plus its expiry time and the ETag /
+#    Last-Modified validators the server sent, so expired entries can be revalidated
+#    with a conditional GET instead of being downloaded again. Bodies are decoded on
+#    every hit, so callers can freely mutate the dicts they get back.
+#
+# 3. Two backends with the same interface:
+#    - MemoryCache: in-process LRU bounded by entry count and total body size.
+#    - SQLiteCache: on-disk cache bounded by entry count that survives restarts.
+#
+# 4. Hit/miss/eviction statistics and explicit invalidation by endpoint prefix.
+#
+# The TTL of each entry is decided by the client (see RegulationsGovAPI.cache_ttls), so
+# detail records can be kept for a long time while withinCommentPeriod searches expire
+# quickly.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# api = RegulationsGovAPI(api_key="YOUR_API_KEY", cache=MemoryCache(max_entries=5000))
+# api.get_docket_by_id("EPA-HQ-OAR-2003-0129")   # network
+# api.get_docket_by_id("EPA-HQ-OAR-2003-0129")   # cache hit
+# print(api.cache.stats())
+# api.cache.invalidate("/dockets/EPA-HQ-OAR-2003-0129")
+#
+##########################################################################################
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+import time
+from collections import OrderedDict
+from urllib.parse import urlencode
+
+
+def make_cache_key(endpoint: str, params: dict = None) -> str:
+    """
+    Build a cache key from an endpoint and its query parameters.
+
+    Parameters are sorted and None values dropped, so equivalent queries map to the
+    same key regardless of how the params dict was built.
+    """
+    if not params:
+        return endpoint
+    items = sorted((k, str(v)) for k, v in params.items() if v is not None)
+    return f"{endpoint}?{urlencode(items)}" if items else endpoint
+
+
+class CacheEntry:
+    """
+    A cached response body and its freshness information.
+    """
+
+    __slots__ = ("body", "stored_at", "expires_at", "etag", "last_modified")
+
+    def __init__(self, body: bytes, stored_at: float, expires_at: float,
+                 etag: str = None, last_modified: str = None):
+        self.body = body
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    def is_fresh(self, now: float = None) -> bool:
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+class ResponseCache(ABC):
+    """
+    Abstract base class for response caches.
+
+    Subclasses implement _load, _store, _delete_prefix, _clear and __len__ (a subclass
+    missing one can't be instantiated); this class keeps the statistics.
+    """
+
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str):
+        """
+        Return the CacheEntry stored under key, or None.
+
+        Expired entries are still returned (and counted as misses) so callers can decide
+        what to do with stale data; use CacheEntry.is_fresh to check.
+        """
+        entry = self._load(key)
+        with self._stats_lock:
+            if entry is not None and entry.is_fresh():
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry
+
+    def set(self, key: str, body: bytes, ttl: float, etag: str = None, last_modified: str = None):
+        """
+        Store a response body under key for ttl seconds.
+
+        :param etag: ETag response header, used to revalidate the entry once stale.
+        :param last_modified: Last-Modified response header, used the same way.
+        """
+        now = time.time()
+        self._store(key, CacheEntry(body, now, now + ttl, etag, last_modified))
+
+    def invalidate(self, prefix: str = None):
+        """
+        Remove cached entries.
+
+        :param prefix: Remove only keys starting with this prefix (e.g. "/documents/ABC"
+                       or "/comments?"). If None, remove everything.
+        """
+        if prefix is None:
+            self._clear()
+        else:
+            self._delete_prefix(prefix)
+
+    def stats(self) -> dict:
+        """
+        :return: dict with hits, misses, evictions, entries and hit_rate.
+        """
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _count_evictions(self, n: int):
+        with self._stats_lock:
+            self.evictions += n
+
+    @abstractmethod
+    def _load(self, key: str):
+        """Return the CacheEntry stored under key, or None."""
+
+    @abstractmethod
+    def _store(self, key: str, entry: CacheEntry):
+        """Store entry under key, evicting as needed."""
+
+    @abstractmethod
+    def _delete_prefix(self, prefix: str):
+        """Remove the entries whose keys start with prefix."""
+
+    @abstractmethod
+    def _clear(self):
+        """Remove every entry."""
+
+    @abstractmethod
+    def __len__(self):
+        """Number of stored entries."""
+
+
+class MemoryCache(ResponseCache):
+    """
+    Thread-safe in-memory LRU cache bounded by entry count and total body bytes.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024):
+        """
+        :param max_entries: Maximum number of cached responses.
+        :param max_bytes: Maximum total size of cached response bodies.
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _load(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def _store(self, key: str, entry: CacheEntry):
+        if len(entry.body) > self.max_bytes:
+            return
+        evicted = 0
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, dropped = self._entries.popitem(last=False)
+                self._bytes -= len(dropped.body)
+                evicted += 1
+        if evicted:
+            self._count_evictions(evicted)
+
+    def _delete_prefix(self, prefix: str):
+        with self._lock:
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._bytes -= len(self._entries.pop(key).body)
+
+    def _clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(ResponseCache):
+    """
+    On-disk cache backed by a SQLite database, evicting least recently used entries.
+    """
+
+    def __init__(self, path: str = "rga_cache.sqlite3", max_entries: int = 100_000):
+        """
+        :param path: Path of the SQLite database file (":memory:" for a private cache).
+        :param max_entries: Maximum number of cached responses.
+        """
+        super().__init__()
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " body BLOB NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " expires_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT)")
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(responses)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE responses ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self._conn.commit()
+        self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _load(self, key: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, stored_at, expires_at, etag, last_modified FROM responses WHERE key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(*row)
+
+    def _store(self, key: str, entry: CacheEntry):
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is None:
+                self._count += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses"
+                " (key, body, stored_at, expires_at, accessed_at, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, entry.body, entry.stored_at, entry.expires_at, entry.stored_at,
+                 entry.etag, entry.last_modified))
+            excess = self._count - self.max_entries
+            if excess > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN"
+                    " (SELECT key FROM responses ORDER BY accessed_at LIMIT ?)", (excess,))
+                self._count -= excess
+            self._conn.commit()
+        if excess > 0:
+            self._count_evictions(excess)
+
+    def _delete_prefix(self, prefix: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE substr(key, 1, ?) = ?", (len(prefix), prefix))
+            self._count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            self._conn.commit()
+
+    def _clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._count = 0
+            self._conn.commit()
+
+    def __len__(self):
+        return self._count
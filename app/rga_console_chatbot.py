@@ -6,7 +6,8 @@
 #
 # The idea:
 # - We load the RGA_KEY (Regulations.gov API Key) from a .env file using python_dotenv.
-# - We instantiate our RegulationsGovAPI client with this key.
+# - We instantiate our RegulationsGovAPI client with this key (on the first tool call, so
+#   the script starts quickly).
 # - We create an Agent that has access to a set of functions that wrap around the
 #   RegulationsGovAPI client methods, allowing the Agent to search documents, dockets,
 #   comments, and even post comments via the console.
@@ -19,36 +20,111 @@
 #
 # Usage:
 #   1. Ensure you have a .env file with: RGA_KEY=YOUR_REGULATIONS_GOV_API_KEY
+#      (optionally also RGA_MIRROR_DB=path/to/mirror.sqlite3 to search a local mirror)
 #   2. pip install -r requirements.txt (should include requests, openai, python-dotenv, swarm)
 #   3. Run: python console_chatbot.py
+#      or, to serve many users over HTTP: python rga_console_chatbot.py --serve --port 8080
+#      Add --store sessions.sqlite3 to save conversations, and --session ID to resume one.
 #
 ##########################################################################################
 
 import os
 import json
-from dotenv import load_dotenv
-from regulations_gov_api import RegulationsGovAPI
+import functools
 import sys
+from typing import Literal
+from tool_output import ResultHandles, ToolOutput
 
 # Add the parent directory of 'app' and 'swarm' to the Python path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from swarm import Swarm, Agent
+from swarm import Swarm, Agent, SessionStore, ToolResultCache, Tracer, JSONLinesSink
 from swarm.repl import run_demo_loop
 
 ##########################################################################################
 # Load environment variables from .env
+#
+# Done when the script starts rather than at import, so that importing this module (e.g.
+# from a worker process that sets its own environment) stays cheap.
 ##########################################################################################
-load_dotenv()
-api_key = os.getenv("RGA_KEY")
-if not api_key:
-    print("Error: RGA_KEY not found in .env. Please set it before running.")
-    exit(1)
+
+def load_environment():
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if not os.getenv("RGA_KEY"):
+        print("Error: RGA_KEY not found in .env. Please set it before running.")
+        exit(1)
+
+##########################################################################################
+# Tracing
+#
+# If RGA_TRACE_FILE is set, every turn is traced (completion requests, time to first
+# token, token usage, tool calls, handoffs and the HTTP requests they make) and the
+# spans are appended to that file as JSON lines.
+##########################################################################################
+
+@functools.cache
+def get_tracer() -> Tracer:
+    trace_file = os.getenv("RGA_TRACE_FILE")
+    return Tracer([JSONLinesSink(trace_file)] if trace_file else [])
 
 ##########################################################################################
 # Instantiate the Regulations.gov API client
+#
+# Responses are cached in memory so repeated lookups of the same document or docket
+# within a conversation don't cost another round trip (or another hit on the quota).
+#
+# If RGA_MIRROR_DB points at a local mirror built with SyncEngine, searches are served
+# from its full-text index and only fall back to the remote API on a miss.
+#
+# The client (and the requests / sqlite machinery behind it) is built on the first tool
+# call, not at import.
 ##########################################################################################
-reg_api = RegulationsGovAPI(api_key=api_key)
+
+@functools.cache
+def get_reg_api():
+    from regulations_gov_api import RegulationsGovAPI
+    from response_cache import MemoryCache
+
+    tracer = get_tracer()
+    reg_api = RegulationsGovAPI(api_key=os.getenv("RGA_KEY"), cache=MemoryCache(),
+                                request_hook=tracer.http_hook if tracer.enabled else None)
+    mirror_db = os.getenv("RGA_MIRROR_DB")
+    if mirror_db:
+        from local_search import LocalRegulationsGovAPI
+
+        reg_api = LocalRegulationsGovAPI(mirror_db, remote=reg_api)
+    return reg_api
+
+##########################################################################################
+# Tool outputs
+#
+# Tool outputs are resent to the model on every later turn, so they are kept compact:
+# each tool shows only the fields below, as a pipe-separated table (or "field: value"
+# lines for a single record), with long values cut and at most max_rows rows. The full
+# records stay behind a handle; the model calls more_results(handle, ...) for further
+# rows or other fields. Each chat session (see --serve) has its own handle capacity, so a
+# busy session can't evict the handles another one is still using.
+##########################################################################################
+
+result_handles = ResultHandles(ttl=60 * 60, max_entries=512)
+
+
+def _scope(context_variables: dict):
+    """Handle scope of a tool call: its chat session, if it runs in one."""
+    return (context_variables or {}).get("session_id")
+
+
+TOOL_OUTPUTS = {
+    "search_documents": ToolOutput(["id", "title", "documentType", "postedDate"]),
+    "get_document_detail": ToolOutput(["id", "title", "docketId", "documentType", "postedDate",
+                                       "commentEndDate", "subject", "topics", "pageCount",
+                                       "fileFormats[].format", "comment"]),
+    "search_comments": ToolOutput(["id", "title", "postedDate"]),
+    "search_dockets": ToolOutput(["id", "title", "lastModifiedDate"]),
+    "get_docket_detail": ToolOutput(["id", "title", "docketType", "modifyDate", "rin", "dkAbstract"]),
+}
 
 ##########################################################################################
 # Define agent functions wrapping the regulations.gov API
@@ -56,7 +132,7 @@ reg_api = RegulationsGovAPI(api_key=api_key)
 # These functions will be callable by the agent. They should:
 # - Take parameters as needed (e.g. filter strings)
 # - Call the corresponding method in regulations_gov_api
-# - Return a user-friendly string that the Agent can show to the user
+# - Return a compact string that the Agent can read (see Tool outputs above)
 #
 # NOTE: The agent can call these functions by name. The docstrings help the agent understand
 # what the functions do. We also handle JSON results from the API and format them.
@@ -65,8 +141,10 @@ reg_api = RegulationsGovAPI(api_key=api_key)
 
 def search_documents(filter_searchTerm: str = None,
                      filter_agencyId: str = None,
-                     filter_documentType: str = None,
-                     page_size: int = 5) -> str:
+                     filter_documentType: Literal["Notice", "Rule", "Proposed Rule",
+                                                  "Supporting & Related Material", "Other"] = None,
+                     page_size: int = 25,
+                     context_variables: dict = None) -> str:
     """
     Search documents on regulations.gov.
     
@@ -74,31 +152,23 @@ def search_documents(filter_searchTerm: str = None,
         filter_searchTerm: Search term to look for in documents.
         filter_agencyId: Filter by agency acronym, e.g. 'EPA'.
         filter_documentType: Filter by document type (e.g. 'Proposed Rule').
-        page_size: How many results to return.
+        page_size: How many results to fetch per page (5-250).
     """
-    response = reg_api.get_documents(
-        filter_searchTerm=filter_searchTerm,
-        filter_agencyId=filter_agencyId,
-        filter_documentType=filter_documentType,
-        page_size=page_size
-    )
-
-    docs = response.get("data", [])
-    if not docs:
-        return "No documents found."
-    # Format a brief summary of documents
-    results = []
-    for d in docs:
-        title = d["attributes"]["title"]
-        doc_id = d["id"]
-        doc_type = d["attributes"]["documentType"]
-        posted_date = d["attributes"]["postedDate"]
-        results.append(f"- {title} (ID: {doc_id}, Type: {doc_type}, Posted: {posted_date})")
-
-    return "Documents:\n" + "\n".join(results)
-
-
-def get_document_detail(document_id: str, include_attachments: bool = False) -> str:
+    def fetch(page_number: int = None):
+        return get_reg_api().get_documents(
+            filter_searchTerm=filter_searchTerm,
+            filter_agencyId=filter_agencyId,
+            filter_documentType=filter_documentType,
+            page_number=page_number,
+            page_size=page_size
+        )
+
+    return result_handles.render(fetch(), TOOL_OUTPUTS["search_documents"], fetch_page=fetch,
+                                 empty="No documents found.", scope=_scope(context_variables))
+
+
+def get_document_detail(document_id: str, include_attachments: bool = False,
+                        context_variables: dict = None) -> str:
     """
     Get detailed information for a specified document by documentId.
     
@@ -106,113 +176,69 @@ def get_document_detail(document_id: str, include_attachments: bool = False) ->
         document_id: The Document ID to retrieve.
         include_attachments: If True, also fetch attachments.
     """
-    response = reg_api.get_document_by_id(document_id, include_attachments=include_attachments)
-    
-    # Check if the response contains the expected data
-    data = response.get("data", {})
-    if not data:
-        return f"Document with ID {document_id} not found."
-
-    attr = data.get("attributes", {})
-    title = attr.get("title", "No title")
-    docket_id = attr.get("docketId", "N/A")
-    doc_type = attr.get("documentType", "N/A")
-    posted_date = attr.get("postedDate", "N/A")
-    comment = attr.get("comment", "N/A")
-    subject = attr.get("subject", "N/A")
-    topics = ", ".join(attr.get("topics", []))
-    page_count = attr.get("pageCount", "N/A")
-    file_formats = attr.get("fileFormats", [])
-
-    # Format file formats information
-    files_info = "\n".join(
-        [f"Format: {f['format']}, URL: {f['fileUrl']}, Size: {f['size']} bytes" for f in file_formats]
-    )
-
-    info = [
-        f"Title: {title}",
-        f"Docket ID: {docket_id}",
-        f"Type: {doc_type}",
-        f"Posted Date: {posted_date}",
-        f"Comment Text: {comment}",
-        f"Subject: {subject}",
-        f"Topics: {topics}",
-        f"Page Count: {page_count}",
-        f"Files:\n{files_info}"
-    ]
-    return "\n".join(info)
+    response = get_reg_api().get_document_by_id(document_id, include_attachments=include_attachments)
+    return result_handles.render_record(response.get("data"), TOOL_OUTPUTS["get_document_detail"],
+                                        empty=f"Document with ID {document_id} not found.",
+                                        scope=_scope(context_variables))
 
 
-def search_comments(filter_searchTerm: str = None, page_size: int = 5) -> str:
+def search_comments(filter_searchTerm: str = None, page_size: int = 25,
+                    context_variables: dict = None) -> str:
     """
     Search comments on regulations.gov.
     
     Args:
         filter_searchTerm: Search term for comments.
-        page_size: Number of results.
+        page_size: How many results to fetch per page (5-250).
     """
-    response = reg_api.get_comments(filter_searchTerm=filter_searchTerm, page_size=page_size)
-    comments = response.get("data", [])
-    if not comments:
-        return "No comments found."
+    def fetch(page_number: int = None):
+        return get_reg_api().get_comments(filter_searchTerm=filter_searchTerm,
+                                          page_number=page_number, page_size=page_size)
 
-    results = []
-    for c in comments:
-        title = c["attributes"]["title"]
-        cid = c["id"]
-        posted = c["attributes"]["postedDate"]
-        results.append(f"- {title} (Comment ID: {cid}, Posted: {posted})")
+    return result_handles.render(fetch(), TOOL_OUTPUTS["search_comments"], fetch_page=fetch,
+                                 empty="No comments found.", scope=_scope(context_variables))
 
-    return "Comments:\n" + "\n".join(results)
 
-
-def search_dockets(filter_searchTerm: str = None, page_size: int = 5) -> str:
+def search_dockets(filter_searchTerm: str = None, page_size: int = 25,
+                   context_variables: dict = None) -> str:
     """
     Search dockets on regulations.gov.
     
     Args:
         filter_searchTerm: Search term for dockets.
-        page_size: How many results to return.
+        page_size: How many results to fetch per page (5-250).
     """
-    response = reg_api.get_dockets(filter_searchTerm=filter_searchTerm, page_size=page_size)
-    dockets = response.get("data", [])
-    if not dockets:
-        return "No dockets found."
-
-    results = []
-    for d in dockets:
-        title = d["attributes"]["title"]
-        did = d["id"]
-        modified = d["attributes"]["lastModifiedDate"]
-        results.append(f"- {title} (Docket ID: {did}, Last Modified: {modified})")
+    def fetch(page_number: int = None):
+        return get_reg_api().get_dockets(filter_searchTerm=filter_searchTerm,
+                                         page_number=page_number, page_size=page_size)
 
-    return "Dockets:\n" + "\n".join(results)
+    return result_handles.render(fetch(), TOOL_OUTPUTS["search_dockets"], fetch_page=fetch,
+                                 empty="No dockets found.", scope=_scope(context_variables))
 
 
-def get_docket_detail(docket_id: str) -> str:
+def get_docket_detail(docket_id: str, context_variables: dict = None) -> str:
     """
     Get detailed information for a specified docket by docketId.
     
     Args:
         docket_id: The Docket ID to retrieve.
     """
-    response = reg_api.get_docket_by_id(docket_id)
-    if "title" not in response.get("attributes", {}):
-        return f"Docket with ID {docket_id} not found."
-
-    attr = response["attributes"]
-    title = attr.get("title", "No title")
-    docket_type = attr.get("docketType", "N/A")
-    modify_date = attr.get("modifyDate", "N/A")
-    rin = attr.get("rin", "N/A")
-
-    info = [
-        f"Title: {title}",
-        f"Docket Type: {docket_type}",
-        f"Last Modified: {modify_date}",
-        f"RIN: {rin}"
-    ]
-    return "\n".join(info)
+    response = get_reg_api().get_docket_by_id(docket_id)
+    return result_handles.render_record(response.get("data"), TOOL_OUTPUTS["get_docket_detail"],
+                                        empty=f"Docket with ID {docket_id} not found.",
+                                        scope=_scope(context_variables))
+
+
+def more_results(handle: str, offset: int = 0, fields: str = None) -> str:
+    """
+    Show more of an earlier search or detail result: further rows, or other fields.
+    
+    Args:
+        handle: Result handle from an earlier output, e.g. 'r3'.
+        offset: Index of the first row to show, from the 'next rows' hint.
+        fields: Comma-separated fields to show instead of the defaults, e.g. 'docketId,comment'.
+    """
+    return result_handles.more(handle, offset=offset, fields=fields)
 
 
 def post_anonymous_comment(document_id: str, comment_text: str) -> str:
@@ -231,7 +257,7 @@ def post_anonymous_comment(document_id: str, comment_text: str) -> str:
     }
 
     try:
-        resp = reg_api.post_comment(attributes=attrs)
+        resp = get_reg_api().post_comment(attributes=attrs)
         # The response should have an id and attributes for the posted comment
         c_id = resp.get("id", "N/A")
         return f"Comment posted successfully! Comment ID: {c_id}"
@@ -259,7 +285,9 @@ agent = Agent(
         "- To find comments about a term, call search_comments.\n"
         "- To search for dockets, call search_dockets.\n"
         "- To get details of a docket, call get_docket_detail(docket_id='...').\n"
-        "- To post a comment anonymously, call post_anonymous_comment(document_id='...', comment_text='...').\n\n"
+        "- To post a comment anonymously, call post_anonymous_comment(document_id='...', comment_text='...').\n"
+        "- Results are compact tables; to see more rows or other fields, call more_results "
+        "with the handle from the hint at the end of a result.\n\n"
         "Always return a clear, user-friendly answer. If you're unsure what the user is asking, "
         "ask for clarification."
     ),
@@ -270,17 +298,61 @@ agent = Agent(
         search_comments,
         search_dockets,
         get_docket_detail,
+        more_results,
         post_anonymous_comment
     ]
 )
 
+##########################################################################################
+# Memoize read-only tools
+#
+# The model often repeats an identical search or detail lookup within a conversation.
+# Results of the read-only functions are reused for a while instead of calling the API
+# again. post_anonymous_comment is deliberately not declared, so it always runs.
+# A memoized result is only reused while its result handle is still live; otherwise the
+# model would be handed a handle that more_results can no longer resolve.
+##########################################################################################
+
+tool_cache = ToolResultCache(pure={
+    "search_documents": 15 * 60,
+    "search_comments": 15 * 60,
+    "search_dockets": 15 * 60,
+    "get_document_detail": 60 * 60,
+    "get_docket_detail": 60 * 60,
+}, is_valid=result_handles.is_live)
+
 ##########################################################################################
 # Run the interactive console loop using run_demo_loop provided by SWARM
 #
 # The user can type queries, and the agent will respond.
+#
+# With --serve, the agent is instead served to many users at once over HTTP (see
+# swarm/server). All sessions share one Swarm client, one tool cache and one pooled
+# Regulations.gov client, while each keeps its own history.
 ##########################################################################################
 
 if __name__ == "__main__":
-    # We run the demo loop. The user can now type queries in the console.
-    # The agent can call the functions as needed and respond accordingly.
-    run_demo_loop(agent, stream=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Regulations.gov chatbot.")
+    parser.add_argument("--serve", action="store_true", help="Serve many sessions over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on with --serve.")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on with --serve.")
+    parser.add_argument("--store", default=os.getenv("RGA_SESSION_DB"),
+                        help="SQLite file to save conversations in (default: $RGA_SESSION_DB).")
+    parser.add_argument("--session", help="Id of a saved conversation to resume (needs --store).")
+    args = parser.parse_args()
+
+    load_environment()
+    # the tools are thread-safe and independent of each other, so a round of tool calls
+    # can run concurrently
+    client = Swarm(tool_cache=tool_cache, tracer=get_tracer(), max_parallel_tool_calls=8)
+    store = SessionStore(args.store) if args.store else None
+    if args.serve:
+        from swarm.server import run_chat_server
+
+        run_chat_server(agent, client=client, host=args.host, port=args.port, store=store)
+    else:
+        # We run the demo loop. The user can now type queries in the console.
+        # The agent can call the functions as needed and respond accordingly.
+        run_demo_loop(agent, stream=True, client=client, store=store, session_id=args.session)
@@ -0,0 +1,244 @@
+##########################################################################################
+# sync_engine.py
+#
+# Incremental mirroring of Regulations.gov records into a local SQLite database.
+#
+# Mirroring a docket or an agency by re-pulling everything through get_comments /
+# get_documents every night costs hours and a large share of the API quota. SyncEngine
+# instead remembers, per (endpoint, filter set), the highest lastModifiedDate it has
+# stored (the "high-water mark") and on the next run only asks for records modified
+# since then via filter[lastModifiedDate][ge].
+#
+# ----------------------------------------
+# How it works:
+# ----------------------------------------
+# 1. Records are streamed with RegulationsGovAPI.iter_* (sorted by lastModifiedDate,
+#    so there is no 5,000-record ceiling) and upserted in batches.
+#
+# 2. After each batch is committed, the high-water mark is advanced to the
+#    lastModifiedDate of the last record in the batch, in the same transaction. A run
+#    that crashes mid-window therefore resumes from the last committed batch instead of
+#    starting over.
+#
+# 3. The lastModifiedDate filter is inclusive, so a resumed or delta run re-fetches the
+#    few records sharing the high-water timestamp; upserting makes that harmless.
+#
+# 4. Optionally, records are hydrated with their detail responses (e.g. to get comment
+#    bodies) using the get_*_by_ids batch methods before being stored.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# api = RegulationsGovAPI(api_key="YOUR_API_KEY")
+# engine = SyncEngine(api, "rga_mirror.sqlite3")
+#
+# # First run pulls everything, later runs only what changed since the previous run:
+# engine.sync("comments", filter_commentOnId="09000064846eebaf", details=True)
+# engine.sync("documents", filter_agencyId="EPA")
+#
+##########################################################################################
+
+import json
+import sqlite3
+import time
+from regulations_gov_api import RegulationsGovAPI, utc_to_eastern
+
+
+MIRROR_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS records (
+        endpoint TEXT NOT NULL,
+        id TEXT NOT NULL,
+        last_modified TEXT,
+        agency_id TEXT,
+        docket_id TEXT,
+        document_type TEXT,
+        posted_date TEXT,
+        title TEXT,
+        data TEXT NOT NULL,
+        synced_at REAL NOT NULL,
+        PRIMARY KEY (endpoint, id)
+    );
+    CREATE INDEX IF NOT EXISTS records_last_modified ON records (endpoint, last_modified);
+    CREATE TABLE IF NOT EXISTS sync_state (
+        endpoint TEXT NOT NULL,
+        filter_key TEXT NOT NULL,
+        high_water TEXT,
+        records_synced INTEGER NOT NULL DEFAULT 0,
+        started_at REAL,
+        completed_at REAL,
+        PRIMARY KEY (endpoint, filter_key)
+    );
+"""
+
+
+def init_mirror_schema(conn: sqlite3.Connection):
+    """
+    Create the mirror tables (records, sync_state) if they don't exist yet.
+    """
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(MIRROR_SCHEMA)
+    conn.commit()
+
+
+class SyncEngine:
+    """
+    Mirrors Regulations.gov list endpoints into a SQLite database, pulling only deltas.
+    """
+
+    # Endpoint name -> (list iterator, batch detail method) on RegulationsGovAPI.
+    ENDPOINTS = {
+        "documents": ("iter_documents", "get_documents_by_ids"),
+        "comments": ("iter_comments", "get_comments_by_ids"),
+        "dockets": ("iter_dockets", "get_dockets_by_ids"),
+    }
+
+    def __init__(self, api: RegulationsGovAPI, db_path: str = "rga_mirror.sqlite3", batch_size: int = 250):
+        """
+        :param api: The RegulationsGovAPI client used to pull records.
+        :param db_path: Path of the SQLite database that holds the mirror.
+        :param batch_size: Number of records upserted (and checkpointed) per transaction.
+        """
+        self.api = api
+        self.batch_size = batch_size
+        self.conn = sqlite3.connect(db_path)
+        init_mirror_schema(self.conn)
+
+    def close(self):
+        self.conn.close()
+
+    @staticmethod
+    def filter_key(filters: dict) -> str:
+        """Canonical representation of a filter set, used to key the sync state."""
+        return json.dumps({k: v for k, v in filters.items() if v is not None}, sort_keys=True)
+
+    def state(self, endpoint: str, **filters) -> dict:
+        """
+        Return the sync state for an (endpoint, filter set), or None if never synced.
+
+        :return: dict with high_water, records_synced, started_at and completed_at.
+                 completed_at is None while a run is in progress or after a crash.
+        """
+        row = self.conn.execute(
+            "SELECT high_water, records_synced, started_at, completed_at FROM sync_state"
+            " WHERE endpoint = ? AND filter_key = ?", (endpoint, self.filter_key(filters))).fetchone()
+        if row is None:
+            return None
+        return dict(zip(("high_water", "records_synced", "started_at", "completed_at"), row))
+
+    def sync(self, endpoint: str, details: bool = False, include_attachments: bool = False,
+             max_workers: int = 8, **filters) -> dict:
+        """
+        Pull every record of endpoint matching filters that changed since the last run.
+
+        :param endpoint: One of "documents", "comments", "dockets".
+        :param details: If True, store each record's detail response instead of the list
+                        summary (one extra request per record).
+        :param include_attachments: With details, also include attachments.
+        :param max_workers: Concurrency used to fetch details.
+        :param filters: filter_* keyword arguments for the corresponding iter_* method.
+                        filter_lastModifiedDate_ge is managed by the engine.
+        :return: dict with the number of records upserted and the new high_water mark.
+        """
+        if endpoint not in self.ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {endpoint!r}; expected one of {sorted(self.ENDPOINTS)}")
+        iter_name, batch_name = self.ENDPOINTS[endpoint]
+        key = self.filter_key(filters)
+
+        state = self.state(endpoint, **filters)
+        high_water = state["high_water"] if state else None
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO sync_state (endpoint, filter_key, started_at) VALUES (?, ?, ?)"
+                " ON CONFLICT (endpoint, filter_key) DO UPDATE SET started_at = excluded.started_at,"
+                " completed_at = NULL", (endpoint, key, time.time()))
+
+        query = dict(filters)
+        if high_water:
+            query["filter_lastModifiedDate_ge"] = utc_to_eastern(high_water)
+
+        upserted = 0
+        batch = []
+        for record in getattr(self.api, iter_name)(**query):
+            batch.append(record)
+            if len(batch) >= self.batch_size:
+                upserted += self._commit_batch(endpoint, key, batch, details, include_attachments,
+                                               max_workers, batch_name)
+                batch = []
+        if batch:
+            upserted += self._commit_batch(endpoint, key, batch, details, include_attachments,
+                                           max_workers, batch_name)
+
+        with self.conn:
+            self.conn.execute("UPDATE sync_state SET completed_at = ? WHERE endpoint = ? AND filter_key = ?",
+                              (time.time(), endpoint, key))
+        return {"upserted": upserted, "high_water": self.state(endpoint, **filters)["high_water"]}
+
+    def _commit_batch(self, endpoint: str, key: str, batch: list, details: bool, include_attachments: bool,
+                      max_workers: int, batch_name: str) -> int:
+        """
+        Upsert a batch of records and advance the high-water mark in one transaction.
+        """
+        records = batch
+        if details:
+            kwargs = {"include_attachments": include_attachments} if endpoint != "dockets" else {}
+            records = []
+            # Repeated IDs are fetched once, so results are matched to summaries by ID
+            # rather than by position.
+            results = {result.id: result for result in getattr(self.api, batch_name)(
+                [r["id"] for r in batch], max_workers=max_workers, **kwargs)}
+            for summary in batch:
+                result = results[summary["id"]]
+                # A failed detail aborts the run before the high-water mark moves past
+                # it, so the record is retried on the next run.
+                if not result.ok:
+                    raise result.error
+                records.append(result.data.get("data") or summary)
+
+        now = time.time()
+        rows = []
+        for record in records:
+            attr = record.get("attributes", {})
+            rows.append((endpoint, record["id"], attr.get("lastModifiedDate"), attr.get("agencyId"),
+                         attr.get("docketId"), attr.get("documentType"), attr.get("postedDate"),
+                         attr.get("title"), json.dumps(record), now))
+
+        # Records arrive sorted by lastModifiedDate, so the latest one of the batch is the
+        # furthest point that is safe to resume from. Records without the field don't
+        # move the mark (NULL would make SQLite's MAX wipe it).
+        high_water = max((r.get("attributes", {}).get("lastModifiedDate") for r in batch
+                          if r.get("attributes", {}).get("lastModifiedDate")), default=None)
+        with self.conn:
+            # An upsert (rather than INSERT OR REPLACE) keeps each record's rowid stable,
+            # which the local full-text index relies on.
+            self.conn.executemany(
+                "INSERT INTO records (endpoint, id, last_modified, agency_id, docket_id,"
+                " document_type, posted_date, title, data, synced_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+                " ON CONFLICT (endpoint, id) DO UPDATE SET last_modified = excluded.last_modified,"
+                " agency_id = excluded.agency_id, docket_id = excluded.docket_id,"
+                " document_type = excluded.document_type, posted_date = excluded.posted_date,"
+                " title = excluded.title, data = excluded.data, synced_at = excluded.synced_at",
+                rows)
+            if high_water is None:
+                self.conn.execute(
+                    "UPDATE sync_state SET records_synced = records_synced + ?"
+                    " WHERE endpoint = ? AND filter_key = ?",
+                    (len(rows), endpoint, key))
+            else:
+                self.conn.execute(
+                    "UPDATE sync_state"
+                    " SET high_water = MAX(COALESCE(high_water, ''), COALESCE(?, high_water, '')),"
+                    " records_synced = records_synced + ? WHERE endpoint = ? AND filter_key = ?",
+                    (high_water, len(rows), endpoint, key))
+        return len(rows)
+
+    def get_record(self, endpoint: str, record_id: str) -> dict:
+        """
+        Return a mirrored record (as stored from the API "data" element), or None.
+        """
+        row = self.conn.execute("SELECT data FROM records WHERE endpoint = ? AND id = ?",
+                                (endpoint, record_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def count(self, endpoint: str) -> int:
+        """Number of mirrored records for an endpoint."""
+        return self.conn.execute("SELECT COUNT(*) FROM records WHERE endpoint = ?", (endpoint,)).fetchone()[0]
@@ -20,9 +20,15 @@
 ##########################################################################################
 
 import os
+import asyncio
+import tempfile
 from dotenv import load_dotenv
 from regulations_gov_api import RegulationsGovAPI
+from async_regulations_gov_api import AsyncRegulationsGovAPI
+from attachment_downloader import AttachmentDownloader
+from local_search import LocalRegulationsGovAPI
 import json
+from itertools import islice
 
 def pretty_print(json_data):
     """
@@ -30,6 +36,13 @@ def pretty_print(json_data):
     """
     print(json.dumps(json_data, indent=4))
 
+async def download_with_async_client(api_key, files, dest_dir):
+    """
+    Download files through AsyncRegulationsGovAPI.download_files.
+    """
+    async with AsyncRegulationsGovAPI(api_key=api_key) as async_api:
+        return [result async for result in async_api.download_files(files, dest_dir=dest_dir)]
+
 def main():
     # Load environment variables from .env
     load_dotenv()
@@ -41,10 +54,25 @@ def main():
     # Instantiate our API client
     api = RegulationsGovAPI(api_key=api_key)
 
+    # ---------------------------------
+    # Test: A blank searchTerm on the local mirror is treated as no search term
+    # (runs offline against an empty mirror)
+    # ---------------------------------
+    print("Testing: LocalRegulationsGovAPI.get_documents with searchTerm='   '")
+    try:
+        with tempfile.TemporaryDirectory() as mirror_dir:
+            local = LocalRegulationsGovAPI(os.path.join(mirror_dir, "mirror.sqlite3"))
+            local_response = local.get_documents(filter_searchTerm="   ", sort="docketId")
+            local.close()
+        assert local_response["meta"]["totalElements"] == 0, local_response
+        print("OK: blank searchTerm returned an empty local page")
+    except Exception as e:
+        print(f"Error searching the local mirror with a blank searchTerm: {e}")
+
     # ---------------------------------
     # Test: Get documents (simple query)
     # ---------------------------------
-    print("Testing: GET /documents with a simple searchTerm='water'")
+    print("\nTesting: GET /documents with a simple searchTerm='water'")
     try:
         docs_response = api.get_documents(filter_searchTerm="water", page_size=5)
         pretty_print(docs_response)
@@ -62,6 +90,20 @@ def main():
     except Exception as e:
         print(f"Error fetching document by ID: {e}")
 
+    # ---------------------------------
+    # Test: Download the document's attachments with the async client
+    # ---------------------------------
+    print("\nTesting: AsyncRegulationsGovAPI.download_files")
+    try:
+        files = AttachmentDownloader.files_of(doc_detail)
+        with tempfile.TemporaryDirectory() as dest_dir:
+            results = asyncio.run(download_with_async_client(api_key, files, dest_dir))
+        for result in results:
+            print(f"{result.status}: {result.url} ({result.size} bytes){' ' + str(result.error) if result.error else ''}")
+        print(f"Downloaded {sum(r.ok for r in results)} of {len(files)} files")
+    except Exception as e:
+        print(f"Error downloading files with the async client: {e}")
+
     # ---------------------------------
     # Test: Get comments (simple query)
     # ---------------------------------
@@ -72,6 +114,17 @@ def main():
     except Exception as e:
         print(f"Error fetching comments: {e}")
 
+    # ---------------------------------
+    # Test: Stream comments past a single page with iter_comments
+    # Only the first 300 records are pulled so the test stays quick.
+    # ---------------------------------
+    print("\nTesting: iter_comments with searchTerm='water' (first 300 records)")
+    try:
+        comment_ids = [c["id"] for c in islice(api.iter_comments(filter_searchTerm="water"), 300)]
+        print(f"Streamed {len(comment_ids)} comments, {len(set(comment_ids))} unique")
+    except Exception as e:
+        print(f"Error streaming comments: {e}")
+
     # ---------------------------------
     # Test: Get a single docket by ID
     # Example docket from docs: "EPA-HQ-OAR-2003-0129"
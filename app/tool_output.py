@@ -0,0 +1,387 @@
+##########################################################################################
+# tool_output.py
+#
+# Compact, structured rendering of Regulations.gov records for agent tool outputs.
+#
+# Whatever a tool returns is sent back to the model on every later turn of the
+# conversation, so verbose outputs (every attribute, "N/A" placeholders, full file URL
+# lists) cost prompt tokens, money and time to first token long after they were useful.
+#
+# ----------------------------------------
+# Key Features:
+# ----------------------------------------
+# 1. ToolOutput projects each record onto a per-tool list of fields. Fields are
+#    attribute names ("title"), top-level keys ("id"), dotted paths ("links.self") or
+#    list projections ("fileFormats[].format"). Empty values are left out instead of
+#    being rendered as placeholders.
+#
+# 2. Lists of records are rendered as a pipe-separated table with one header line, or
+#    as JSON lines; single records as "field: value" lines.
+#
+# 3. Row counts and field lengths are capped (max_rows, max_field_chars).
+#
+# 4. ResultHandles keeps the full records behind each output under a short handle such
+#    as "r12". The output ends with a hint telling the model how to fetch more rows
+#    (following pages are fetched on demand) or more fields of the same records, via a
+#    more_results(handle, offset, fields) tool.
+#
+# 5. Results are kept per scope (e.g. a chat session) with their own capacity, so a busy
+#    session can't evict the live handles of another. is_live tells whether the handles
+#    in a memoized output still resolve.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# handles = ResultHandles()
+# output = ToolOutput(["id", "title", "documentType", "postedDate"], max_rows=10)
+#
+# response = api.get_documents(filter_searchTerm="water", page_size=25)
+# text = handles.render(response, output,
+#                       fetch_page=lambda n: api.get_documents(filter_searchTerm="water",
+#                                                              page_size=25, page_number=n),
+#                       scope=session_id)
+#
+# # later, from the more_results tool:
+# text = handles.more("r1", offset=10)
+# text = handles.more("r1", fields="title,docketId,frDocNum")
+#
+##########################################################################################
+
+import itertools
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, List
+
+_WHITESPACE = re.compile(r"\s+")
+# handles in the hints of a rendered output
+_HANDLE_HINT = re.compile(r'more_results\("([^"]+)"')
+# values treated as missing
+_EMPTY = (None, "", "N/A", [], {})
+
+
+def _lookup(value, key: str):
+    """Look key up in a record, falling back to its JSON:API attributes."""
+    if not isinstance(value, dict):
+        return None
+    if key in value:
+        return value[key]
+    attributes = value.get("attributes")
+    if isinstance(attributes, dict):
+        return attributes.get(key)
+    return None
+
+
+def resolve_field(record: dict, path: str):
+    """
+    Return the value of a field path in a record.
+
+    :param record: A JSON:API record (with "attributes") or a plain dict.
+    :param path: "title", "links.self" or "fileFormats[].format".
+    """
+    values = [record]
+    many = False
+    for part in path.split("."):
+        spread = part.endswith("[]")
+        key = part[:-2] if spread else part
+        next_values = []
+        for value in values:
+            found = _lookup(value, key)
+            if spread and isinstance(found, list):
+                next_values.extend(found)
+                many = True
+            elif found is not None:
+                next_values.append(found)
+        values = next_values
+    if many:
+        return values
+    return values[0] if values else None
+
+
+class ToolOutput:
+    """
+    How one tool renders records: which fields, in what form and how much of them.
+    """
+
+    FORMATS = ("table", "jsonl")
+
+    def __init__(self, fields: List[str], max_rows: int = 10, max_field_chars: int = 120,
+                 format: str = "table", expanded_field_chars: int = 2000):
+        """
+        :param fields: Field paths to show, in order (see resolve_field).
+        :param max_rows: Maximum number of records shown at once.
+        :param max_field_chars: Longer values are cut to this many characters.
+        :param format: "table" (pipe-separated with a header line) or "jsonl".
+        :param expanded_field_chars: Length cap for fields the model asked for
+                                     explicitly through ResultHandles.more.
+        """
+        if format not in self.FORMATS:
+            raise ValueError(f"format must be one of {self.FORMATS}, not {format!r}")
+        self.fields = list(fields)
+        self.max_rows = max_rows
+        self.max_field_chars = max_field_chars
+        self.format = format
+        self.expanded_field_chars = expanded_field_chars
+
+    @staticmethod
+    def _clean(value, max_chars: int):
+        """Flatten a value to a short single-line string, or None if it is empty."""
+        if value in _EMPTY:
+            return None
+        if isinstance(value, list):
+            items = [str(v) if not isinstance(v, (dict, list)) else json.dumps(v, separators=(",", ":"))
+                     for v in value if v not in _EMPTY]
+            value = ", ".join(dict.fromkeys(items))
+        elif isinstance(value, dict):
+            value = json.dumps(value, separators=(",", ":"))
+        elif isinstance(value, bool) or not isinstance(value, str):
+            return value
+        value = _WHITESPACE.sub(" ", value).strip()
+        if not value:
+            return None
+        if len(value) > max_chars:
+            value = value[:max_chars - 1].rstrip() + "…"
+        return value
+
+    def project(self, record: dict, fields: List[str] = None, max_chars: int = None) -> dict:
+        """
+        Return the non-empty fields of a record as a flat dict.
+
+        :param record: Record to project.
+        :param fields: Field paths to use instead of self.fields.
+        :param max_chars: Length cap to use instead of max_field_chars.
+        """
+        max_chars = max_chars or self.max_field_chars
+        projected = {}
+        for path in fields or self.fields:
+            value = self._clean(resolve_field(record, path), max_chars)
+            if value is not None:
+                projected[path] = value
+        return projected
+
+    def render_rows(self, records: List[dict], fields: List[str] = None, max_chars: int = None) -> str:
+        fields = fields or self.fields
+        rows = [self.project(r, fields, max_chars) for r in records]
+        if self.format == "jsonl":
+            return "\n".join(json.dumps(row, separators=(",", ":"), ensure_ascii=False) for row in rows)
+        lines = ["|".join(fields)]
+        for row in rows:
+            lines.append("|".join(str(row.get(f, "")).replace("|", "/") for f in fields))
+        return "\n".join(lines)
+
+    def render_record(self, record: dict, fields: List[str] = None, max_chars: int = None) -> str:
+        projected = self.project(record, fields, max_chars)
+        if self.format == "jsonl":
+            return json.dumps(projected, separators=(",", ":"), ensure_ascii=False)
+        return "\n".join(f"{k}: {v}" for k, v in projected.items())
+
+
+class _Result:
+    __slots__ = ("records", "output", "total", "fetch_page", "pages_fetched", "single", "scope", "lock",
+                 "stopped")
+
+    def __init__(self, records, output, total, fetch_page, single, scope):
+        self.records = records
+        self.output = output
+        self.total = total
+        self.fetch_page = fetch_page
+        self.pages_fetched = 1
+        self.single = single
+        self.scope = scope
+        # held while following pages are fetched into records
+        self.lock = threading.Lock()
+        # why paging stopped before total records were fetched, if it did
+        self.stopped = None
+
+
+class ResultHandles:
+    """
+    Keeps the full records behind compact tool outputs, so the model can ask for more
+    rows or fields later without the first output having to include them.
+
+    One instance can be shared by every session of a process. Handles are unique across
+    scopes, so an output memoized in one session still resolves in another. Results are
+    dropped ttl seconds after they were last used or, beyond max_entries results in the
+    scope that created them, least recently used first.
+    """
+
+    # every this many new results, expired results of all scopes are dropped
+    SWEEP_INTERVAL = 256
+    # the Regulations.gov API serves at most this many pages per query
+    MAX_PAGES = 20
+
+    def __init__(self, ttl: float = 3600.0, max_entries: int = 4096, prefix: str = "r"):
+        """
+        :param ttl: Seconds a result is kept after it was last used.
+        :param max_entries: Maximum number of results kept per scope.
+        :param prefix: Prefix of handles.
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.prefix = prefix
+        # handle -> (result, expiry); per scope, handles ordered by last use
+        self._results = {}
+        self._scopes = {}
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def _prune(self, scope, now: float):
+        """Drop a scope's expired and excess results. Caller holds _lock."""
+        handles = self._scopes[scope]
+        # ordered by last use, so expired results are at the front
+        while handles:
+            handle = next(iter(handles))
+            if self._results[handle][1] > now and len(handles) <= self.max_entries:
+                break
+            handles.popitem(last=False)
+            del self._results[handle]
+        if not handles:
+            del self._scopes[scope]
+
+    def _put(self, result: _Result) -> str:
+        number = next(self._counter)
+        handle = f"{self.prefix}{number}"
+        now = time.monotonic()
+        with self._lock:
+            self._results[handle] = (result, now + self.ttl)
+            self._scopes.setdefault(result.scope, OrderedDict())[handle] = None
+            for scope in (list(self._scopes) if number % self.SWEEP_INTERVAL == 0 else [result.scope]):
+                self._prune(scope, now)
+        return handle
+
+    def _get(self, handle: str) -> _Result:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._results.get(handle)
+            if entry is None or entry[1] <= now:
+                return None
+            self._results[handle] = (entry[0], now + self.ttl)
+            self._scopes[entry[0].scope].move_to_end(handle)
+            return entry[0]
+
+    def is_live(self, text: str) -> bool:
+        """
+        Whether every handle mentioned in a rendered output can still be used, e.g. to
+        decide if a memoized output may be reused.
+        """
+        now = time.monotonic()
+        with self._lock:
+            for handle in _HANDLE_HINT.findall(text):
+                entry = self._results.get(handle)
+                if entry is None or entry[1] <= now:
+                    return False
+        return True
+
+    def render(self, response: dict, output: ToolOutput, fetch_page: Callable[[int], dict] = None,
+               empty: str = "No results found.", scope: str = None) -> str:
+        """
+        Render a search response (a JSON:API list) compactly, keeping its records
+        under a new handle.
+
+        :param response: Response of a list endpoint, e.g. get_documents.
+        :param output: ToolOutput of the calling tool.
+        :param fetch_page: Optional callable returning the response for a page number,
+                           used when the model asks for rows past the fetched page.
+        :param empty: Text returned when there are no records.
+        :param scope: Scope the result counts against, e.g. the chat session id.
+        """
+        records = response.get("data") or []
+        if not records:
+            return empty
+        total = (response.get("meta") or {}).get("totalElements", len(records))
+        result = _Result(list(records), output, total, fetch_page, single=False, scope=scope)
+        handle = self._put(result)
+        return self._rows(handle, result, 0, None)
+
+    def render_record(self, record: dict, output: ToolOutput, empty: str = "Not found.",
+                      scope: str = None) -> str:
+        """
+        Render a single record (e.g. from get_document_by_id) compactly, keeping it
+        under a new handle so that fields left out can be requested.
+        """
+        if not record:
+            return empty
+        result = _Result([record], output, 1, None, single=True, scope=scope)
+        text = output.render_record(record)
+        other = self._other_fields(record, output.fields)
+        if not other:
+            return text
+        handle = self._put(result)
+        return f'{text}\n[other fields: {", ".join(other)}; more_results("{handle}", fields="...")]'
+
+    @staticmethod
+    def _other_fields(record: dict, shown: List[str], limit: int = 20) -> List[str]:
+        names = [k for k in record if k not in ("attributes", "links", "relationships", "type")]
+        names += list((record.get("attributes") or {}).keys())
+        shown = {path.split(".")[0].removesuffix("[]") for path in shown}
+        other = [n for n in dict.fromkeys(names) if n not in shown and resolve_field(record, n) not in _EMPTY]
+        return other[:limit]
+
+    def _ensure_rows(self, result: _Result, end: int):
+        """
+        Fetch following pages until result holds end records or there are no more.
+        Paging stops, with a note in result.stopped, at MAX_PAGES (for good) or when a
+        page fails (until the next call). Caller holds result.lock.
+        """
+        while len(result.records) < min(end, result.total) and result.fetch_page is not None:
+            if result.pages_fetched >= self.MAX_PAGES:
+                result.fetch_page = None
+                result.stopped = (f"the API returns at most {self.MAX_PAGES} pages per search; "
+                                  "narrow the search to see later results")
+                break
+            try:
+                response = result.fetch_page(result.pages_fetched + 1)
+            except Exception as e:
+                result.stopped = f"fetching page {result.pages_fetched + 1} failed: {e}"
+                break
+            result.stopped = None
+            records = response.get("data") or []
+            result.pages_fetched += 1
+            result.records.extend(records)
+            if not records or not (response.get("meta") or {}).get("hasNextPage", True):
+                result.fetch_page = None
+
+    def _rows(self, handle: str, result: _Result, offset: int, fields: List[str]) -> str:
+        output = result.output
+        end = offset + output.max_rows
+        with result.lock:
+            self._ensure_rows(result, end)
+            shown = result.records[offset:end]
+            stopped = result.stopped
+            available = result.total if result.fetch_page is not None else len(result.records)
+        if not shown:
+            if stopped:
+                return f"No more rows past {offset}: {stopped} (total {result.total})."
+            return f"No rows past {offset} (total {result.total})."
+        max_chars = output.expanded_field_chars if fields else None
+        text = output.render_rows(shown, fields, max_chars)
+        last = offset + len(shown)
+        hints = []
+        if last < available:
+            hints.append(f'next rows: more_results("{handle}", offset={last})')
+        hints.append(f'other fields: more_results("{handle}", fields="...")')
+        if stopped and (last < end or last >= available):
+            hints.append(f"no more rows: {stopped}")
+        return f"{text}\n[rows {offset + 1}-{last} of {result.total}; {'; '.join(hints)}]"
+
+    def more(self, handle: str, offset: int = 0, fields: str = None) -> str:
+        """
+        Render more of an earlier result: rows from offset on, or the given fields.
+
+        :param handle: Handle from an earlier output.
+        :param offset: Index of the first row to show.
+        :param fields: Comma-separated field paths to show instead of the tool's
+                       defaults; these are truncated less aggressively.
+        """
+        result = self._get(handle)
+        if result is None:
+            return f"Result {handle} is no longer available; run the original request again."
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        if field_list and "id" not in field_list:
+            field_list.insert(0, "id")
+        if result.single:
+            return result.output.render_record(result.records[0], field_list,
+                                               result.output.expanded_field_chars if field_list else None)
+        return self._rows(handle, result, max(0, offset), field_list)
@@ -0,0 +1,82 @@
+##########################################################################################
+# bench_history.py
+#
+# Per-turn overhead of Swarm.run as the conversation grows.
+#
+# run_demo_loop (like any chat front end) passes the whole conversation to Swarm.run on
+# every user turn. This benchmark builds histories of increasing length, with large tool
+# outputs like those of a long research session, and times one run() turn against an
+# offline fake client, so only Swarm's own overhead is measured. For comparison it also
+# times a deepcopy of the same history and context, which is what every run used to pay
+# on entry.
+#
+# ----------------------------------------
+# Usage:
+# ----------------------------------------
+# python benchmarks/bench_history.py [--sizes 10,100,1000,5000] [--tool-output-bytes 4096]
+#
+##########################################################################################
+
+import argparse
+import copy
+import os
+import statistics
+import sys
+import time
+
+# Add the repository root (parent of 'swarm') to the Python path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from swarm import Swarm, Agent
+from fake_openai import FakeOpenAI, assistant_turn
+
+
+def build_history(n: int, tool_output_bytes: int) -> list:
+    """A conversation of n messages cycling user / assistant tool call / tool result."""
+    history = []
+    payload = "x" * tool_output_bytes
+    while len(history) < n:
+        i = len(history)
+        history.append({"role": "user", "content": f"Question {i}"})
+        history.append({
+            "role": "assistant", "content": None, "sender": "Agent",
+            "tool_calls": [{"id": f"call_{i}", "type": "function",
+                            "function": {"name": "search", "arguments": '{"q": "water"}'}}],
+        })
+        history.append({"role": "tool", "tool_call_id": f"call_{i}", "tool_name": "search",
+                        "content": payload})
+    return history[:n]
+
+
+def median_seconds(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-turn overhead of Swarm.run vs history length.")
+    parser.add_argument("--sizes", default="10,100,1000,5000")
+    parser.add_argument("--tool-output-bytes", type=int, default=4096)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    swarm = Swarm(client=FakeOpenAI([assistant_turn(content="Done.")], repeat=True))
+    agent = Agent(name="Agent")
+    context_variables = {"user": "bench", "notes": ["n"] * 100}
+
+    print(f"{'messages':>10} {'run() per turn':>16} {'deepcopy (old)':>16}")
+    for n in (int(s) for s in args.sizes.split(",")):
+        history = build_history(n, args.tool_output_bytes) + [{"role": "user", "content": "Next?"}]
+        turn = median_seconds(
+            lambda: swarm.run(agent, history, context_variables=context_variables), args.repeats)
+        deepcopy = median_seconds(
+            lambda: (copy.deepcopy(history), copy.deepcopy(context_variables)), args.repeats)
+        print(f"{len(history):>10} {turn * 1e6:>13.0f} us {deepcopy * 1e6:>13.0f} us")
+
+
+if __name__ == "__main__":
+    main()
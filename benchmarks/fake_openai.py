@@ -0,0 +1,188 @@
+##########################################################################################
+# fake_openai.py
+#
+# Offline stand-in for the OpenAI / AzureOpenAI clients used by Swarm in benchmarks.
+#
+# FakeOpenAI replays a script of assistant turns through client.chat.completions.create,
+# returning real openai ChatCompletion / ChatCompletionChunk objects, so Swarm runs
+# exactly as it does against the service but without network access or credentials.
+# FakeAsyncOpenAI does the same for Swarm.arun.
+#
+# Responses report token usage (prompt tokens estimated from the message count, so the
+# fake stays equally cheap however long the history grows), in a
+# final chunk when streaming with stream_options={"include_usage": True}.
+#
+# Latency can be simulated with a delay before the first token and a token rate for
+# streamed responses.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# client = FakeOpenAI([assistant_turn(tool_calls=[("search_documents", {"filter_searchTerm": "water"})]),
+#                      assistant_turn(content="Here is what I found.")])
+# response = Swarm(client=client).run(agent, [{"role": "user", "content": "Hi"}])
+#
+##########################################################################################
+
+import asyncio
+import itertools
+import json
+import threading
+import time
+from openai.types.chat import ChatCompletion, ChatCompletionChunk
+
+_call_ids = itertools.count()
+
+# estimated prompt tokens per request message
+TOKENS_PER_MESSAGE = 50
+
+
+def assistant_turn(content: str = None, tool_calls=()) -> dict:
+    """
+    One scripted assistant message.
+
+    :param content: Text of the message.
+    :param tool_calls: Sequence of (function name, arguments dict) pairs to call.
+    """
+    return {"content": content, "tool_calls": list(tool_calls)}
+
+
+def make_usage(messages, completion_tokens: int) -> dict:
+    prompt_tokens = len(messages or ()) * TOKENS_PER_MESSAGE
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def make_completion(turn: dict, model: str = "gpt-4o", messages=None) -> ChatCompletion:
+    message = {"role": "assistant", "content": turn["content"]}
+    if turn["tool_calls"]:
+        message["tool_calls"] = [
+            {"id": f"call_{next(_call_ids)}", "type": "function",
+             "function": {"name": name, "arguments": json.dumps(args)}}
+            for name, args in turn["tool_calls"]
+        ]
+    return ChatCompletion.model_validate({
+        "id": "chatcmpl-fake", "object": "chat.completion", "created": 0, "model": model,
+        "choices": [{"index": 0, "finish_reason": "tool_calls" if turn["tool_calls"] else "stop",
+                     "message": message}],
+        "usage": make_usage(messages, len((turn["content"] or "").split()) + len(turn["tool_calls"])),
+    })
+
+
+def make_chunks(turn: dict, model: str = "gpt-4o", messages=None, include_usage: bool = False) -> list:
+    """
+    Split a scripted turn into stream chunks: one per word of content, then for every
+    tool call a chunk with its name followed by its arguments in a few pieces, and
+    optionally a final chunk without choices carrying the usage.
+    """
+    deltas = [{"role": "assistant", "content": ""}]
+    words = (turn["content"] or "").split(" ")
+    for i, word in enumerate(words if turn["content"] else []):
+        deltas.append({"content": word if i == len(words) - 1 else word + " "})
+    for index, (name, args) in enumerate(turn["tool_calls"]):
+        deltas.append({"tool_calls": [{"index": index, "id": f"call_{next(_call_ids)}", "type": "function",
+                                       "function": {"name": name, "arguments": ""}}]})
+        arguments = json.dumps(args)
+        for start in range(0, len(arguments), 8):
+            deltas.append({"tool_calls": [{"index": index, "function": {"arguments": arguments[start:start + 8]}}]})
+    chunks = [
+        ChatCompletionChunk.model_validate({
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        })
+        for delta in deltas
+    ]
+    if include_usage:
+        chunks.append(ChatCompletionChunk.model_validate({
+            "id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": 0, "model": model,
+            "choices": [], "usage": make_usage(messages, len(deltas) - 1),
+        }))
+    return chunks
+
+
+class _Completions:
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, model: str = "gpt-4o", stream: bool = False, messages=None, stream_options=None, **kwargs):
+        turn = self.client.next_turn()
+        if self.client.latency:
+            time.sleep(self.client.latency)
+        if stream:
+            return self._stream(make_chunks(turn, model, messages, bool((stream_options or {}).get("include_usage"))))
+        return make_completion(turn, model, messages)
+
+    def _stream(self, chunks):
+        delay = 1.0 / self.client.tokens_per_second if self.client.tokens_per_second else 0
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+
+class FakeOpenAI:
+    """
+    Client whose chat.completions.create replays scripted assistant turns in order.
+
+    :param script: List of assistant_turn dicts.
+    :param repeat: If True, start over at the end of the script instead of raising
+                   StopIteration.
+    :param latency: Seconds before a completion (or its first streamed chunk) arrives.
+    :param tokens_per_second: Rate of streamed chunks (None streams without delay).
+    """
+
+    def __init__(self, script, repeat: bool = False, latency: float = 0.0, tokens_per_second: float = None):
+        self._turns = itertools.cycle(script) if repeat else iter(script)
+        self._lock = threading.Lock()
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.calls = 0
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = self._completions_class()(self)
+
+    def _completions_class(self):
+        return _Completions
+
+    def next_turn(self) -> dict:
+        with self._lock:
+            self.calls += 1
+            return next(self._turns)
+
+
+class _AsyncStream:
+    def __init__(self, chunks, delay: float):
+        self._chunks = iter(chunks)
+        self._delay = delay
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._delay:
+            await asyncio.sleep(self._delay)
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+
+class _AsyncCompletions(_Completions):
+    async def create(self, model: str = "gpt-4o", stream: bool = False, messages=None, stream_options=None,
+                     **kwargs):
+        turn = self.client.next_turn()
+        if self.client.latency:
+            await asyncio.sleep(self.client.latency)
+        if stream:
+            delay = 1.0 / self.client.tokens_per_second if self.client.tokens_per_second else 0
+            chunks = make_chunks(turn, model, messages, bool((stream_options or {}).get("include_usage")))
+            return _AsyncStream(chunks, delay)
+        return make_completion(turn, model, messages)
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """
+    Async counterpart of FakeOpenAI, for Swarm(async_client=...).arun.
+    """
+
+    def _completions_class(self):
+        return _AsyncCompletions
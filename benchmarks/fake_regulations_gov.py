@@ -0,0 +1,236 @@
+##########################################################################################
+# fake_regulations_gov.py
+#
+# Local HTTP stand-in for the Regulations.gov v4 API, for offline benchmarks.
+#
+# FakeRegulationsGov serves generated documents, comments and dockets on 127.0.0.1 with
+# the behaviour the client has to cope with in production:
+#
+# - list endpoints with page[number] / page[size], a 20 page limit and meta.hasNextPage,
+# - filter[searchTerm], filter[agencyId], filter[docketId], filter[commentOnId] and
+#   filter[lastModifiedDate][ge|le] (Eastern time, like the real API),
+# - sorting by lastModifiedDate with an id tie-breaker,
+# - detail endpoints (/documents/{id}, /comments/{id}, /dockets/{id}),
+# - configurable per-request latency,
+# - X-RateLimit-Limit / X-RateLimit-Remaining headers and 429 responses with
+#   Retry-After, either every Nth request or once the hourly quota is spent.
+#
+# ----------------------------------------
+# Usage Example:
+# ----------------------------------------
+# with FakeRegulationsGov(records=5000, latency=0.02, throttle_every=50) as server:
+#     api = RegulationsGovAPI(api_key="DEMO_KEY")
+#     api.BASE_URL = server.url
+#     print(api.get_documents(filter_searchTerm="water"))
+#
+##########################################################################################
+
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from zoneinfo import ZoneInfo
+
+EASTERN = ZoneInfo("America/New_York")
+_EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_WORDS = ("water", "air", "quality", "emissions", "safety", "drug", "labeling", "fishery",
+          "energy", "vehicle", "pesticide", "wildlife", "aviation", "banking", "health")
+_AGENCIES = ("EPA", "FDA", "NOAA", "DOT", "FAA")
+
+
+def _timestamp(seconds: int) -> str:
+    return (_EPOCH + timedelta(seconds=seconds)).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _eastern_to_utc(value: str) -> str:
+    local = datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=EASTERN)
+    return local.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def generate_records(n: int, comment_bytes: int = 1000) -> dict:
+    """
+    Generate n documents, n comments and n // 10 dockets, deterministic for a given n.
+
+    Several records share each lastModifiedDate, as on the real API.
+    """
+    records = {"documents": [], "comments": [], "dockets": []}
+    for i in range(max(1, n // 10)):
+        agency = _AGENCIES[i % len(_AGENCIES)]
+        records["dockets"].append({
+            "id": f"{agency}-2024-{i:04d}", "type": "dockets",
+            "attributes": {"agencyId": agency, "title": f"Docket on {_WORDS[i % len(_WORDS)]} {i}",
+                           "docketType": "Rulemaking", "lastModifiedDate": _timestamp(i * 3),
+                           "dkAbstract": " ".join(_WORDS[(i + k) % len(_WORDS)] for k in range(40))},
+        })
+    for i in range(n):
+        docket = records["dockets"][i % len(records["dockets"])]
+        agency = docket["attributes"]["agencyId"]
+        words = " ".join(_WORDS[(i * 7 + k) % len(_WORDS)] for k in range(6))
+        records["documents"].append({
+            "id": f"{docket['id']}-{i:04d}", "type": "documents",
+            "attributes": {"agencyId": agency, "docketId": docket["id"], "title": f"Document {i}: {words}",
+                           "documentType": ("Notice", "Rule", "Proposed Rule", "Other")[i % 4],
+                           "postedDate": _timestamp(i * 60), "lastModifiedDate": _timestamp(i // 3),
+                           "objectId": f"09000064{i:08x}",
+                           "fileFormats": [{"fileUrl": f"/files/{i}.pdf", "format": "pdf", "size": 1024}]},
+        })
+        records["comments"].append({
+            "id": f"{docket['id']}-c{i:05d}", "type": "comments",
+            "attributes": {"agencyId": agency, "docketId": docket["id"], "title": f"Comment {i} on {words}",
+                           "documentType": "Public Submission", "postedDate": _timestamp(i * 60),
+                           "lastModifiedDate": _timestamp(i // 5),
+                           "commentOnId": f"09000064{(i % max(1, n // 4)):08x}",
+                           "comment": (words + " ") * max(1, comment_bytes // (len(words) + 1))},
+        })
+    return records
+
+
+class FakeRegulationsGov:
+    """
+    Threaded local server mimicking Regulations.gov paging, latency and throttling.
+    """
+
+    MAX_PAGE_NUMBER = 20
+
+    def __init__(self, records: int = 2000, latency: float = 0.0, throttle_every: int = None,
+                 retry_after: float = 1.0, quota_per_hour: int = 1_000_000, comment_bytes: int = 1000):
+        """
+        :param records: Number of documents and comments to serve (dockets: records / 10).
+        :param latency: Seconds every response is delayed by.
+        :param throttle_every: Answer every Nth request with 429 (None never does).
+        :param retry_after: Retry-After seconds sent with 429 responses.
+        :param quota_per_hour: Reported X-RateLimit-Limit; requests beyond it get 429.
+        :param comment_bytes: Approximate size of each comment body.
+        """
+        self.records = generate_records(records, comment_bytes)
+        self._by_id = {(endpoint, r["id"]): r for endpoint, rs in self.records.items() for r in rs}
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.quota_per_hour = quota_per_hour
+        self.requests = 0
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        handler = type("Handler", (_Handler,), {"fake": self})
+        ThreadingHTTPServer.request_queue_size = 1024
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _admit(self):
+        """Count a request; returns (status, remaining quota)."""
+        with self._lock:
+            self.requests += 1
+            remaining = max(0, self.quota_per_hour - self.requests)
+            throttle = (self.throttle_every and self.requests % self.throttle_every == 0) or \
+                self.requests > self.quota_per_hour
+            if throttle:
+                self.throttled += 1
+            return (429 if throttle else 200), remaining
+
+    def list_page(self, endpoint: str, query: dict) -> dict:
+        records = self.records[endpoint]
+        term = query.get("filter[searchTerm]")
+        if term:
+            terms = term.lower().split()
+            records = [r for r in records
+                       if all(t in (r["attributes"]["title"] + " " + r["attributes"].get("comment", "")).lower()
+                              for t in terms)]
+        for name in ("agencyId", "docketId", "commentOnId", "documentType"):
+            value = query.get(f"filter[{name}]")
+            if value:
+                allowed = set(value.split(","))
+                records = [r for r in records if r["attributes"].get(name) in allowed]
+        if "filter[lastModifiedDate][ge]" in query:
+            ge = _eastern_to_utc(query["filter[lastModifiedDate][ge]"])
+            records = [r for r in records if r["attributes"]["lastModifiedDate"] >= ge]
+        if "filter[lastModifiedDate][le]" in query:
+            le = _eastern_to_utc(query["filter[lastModifiedDate][le]"])
+            records = [r for r in records if r["attributes"]["lastModifiedDate"] <= le]
+        sort = query.get("sort", "")
+        if sort.lstrip("-").startswith("lastModifiedDate"):
+            records = sorted(records, key=lambda r: (r["attributes"]["lastModifiedDate"], r["id"]),
+                             reverse=sort.startswith("-"))
+
+        number = int(query.get("page[number]", 1))
+        size = int(query.get("page[size]", 25))
+        if number > self.MAX_PAGE_NUMBER:
+            return None
+        page = records[(number - 1) * size: number * size]
+        return {
+            "data": page,
+            "meta": {
+                "totalElements": len(records),
+                "pageNumber": number,
+                "pageSize": size,
+                "numberOfElements": len(page),
+                "hasNextPage": number * size < len(records) and number < self.MAX_PAGE_NUMBER,
+                "lastPage": not (number * size < len(records) and number < self.MAX_PAGE_NUMBER),
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    fake: FakeRegulationsGov = None
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/vnd.api+json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        fake = self.fake
+        if fake.latency:
+            time.sleep(fake.latency)
+        status, remaining = fake._admit()
+        headers = {"X-RateLimit-Limit": fake.quota_per_hour, "X-RateLimit-Remaining": remaining}
+        if status == 429:
+            headers["Retry-After"] = fake.retry_after
+            self._send(429, {"error": {"code": "OVER_RATE_LIMIT"}}, headers)
+            return
+
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p and p != "v4"]
+        if len(parts) == 1 and parts[0] in fake.records:
+            body = fake.list_page(parts[0], query)
+            if body is None:
+                self._send(400, {"errors": [{"detail": "page[number] must be at most 20"}]}, headers)
+                return
+            self._send(200, body, headers)
+        elif len(parts) == 2 and (parts[0], parts[1]) in fake._by_id:
+            self._send(200, {"data": fake._by_id[(parts[0], parts[1])]}, headers)
+        else:
+            self._send(404, {"errors": [{"status": "404", "title": "Not Found"}]}, headers)
@@ -0,0 +1,436 @@
+##########################################################################################
+# run_benchmarks.py
+#
+# Offline performance suite for Swarm and the Regulations.gov clients.
+#
+# Everything runs against local stand-ins: FakeOpenAI / FakeAsyncOpenAI replay scripted
+# completions (fake_openai.py) and FakeRegulationsGov serves the API on 127.0.0.1 with
+# paging, latency and 429s (fake_regulations_gov.py). No keys or network are needed, so
+# the suite can run in CI and on laptops to catch regressions in swarm/core.py or the
+# clients before they reach production.
+#
+# ----------------------------------------
+# Benchmarks:
+# ----------------------------------------
+# turn_overhead    Swarm.run per-turn overhead as the history grows.
+# streaming        run_and_stream overhead per streamed chunk.
+# tool_latency     Wall time of a round of tool calls hitting the fake API,
+#                  sequential vs parallel.
+# concurrency      Turns per second of many sessions sharing one Swarm and one API
+#                  client (threads with run, tasks with arun).
+# client_paging    iter_documents throughput with latency and periodic 429s.
+# memory           Memory retained per turn over a long session (tracemalloc).
+# session_store    SessionStore append cost per turn and resume time as a saved
+#                  conversation grows, and storage saved by deduplicating tool outputs.
+# tool_output      Size of a compact tool output (app/tool_output.py) against the raw
+#                  JSON of the same records.
+# bulk_decode      Decode time of a 250-record page with json / orjson, and memory held
+#                  by a bulk pull kept whole vs projected with fields=[...].
+# records          Memory per comment held as API dicts, compact records and a columnar
+#                  RecordBatch (app/records.py), and conversion throughput.
+# import_time      Cold-start cost of importing swarm and the console chatbot in a fresh
+#                  interpreter, and which heavy packages the import pulls in.
+#
+# ----------------------------------------
+# Usage:
+# ----------------------------------------
+# python benchmarks/run_benchmarks.py                  # everything
+# python benchmarks/run_benchmarks.py streaming memory # selected benchmarks
+# python benchmarks/run_benchmarks.py --quick --json results.json
+#
+##########################################################################################
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+# Add the repository root (parent of 'swarm') and 'app' to the Python path
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+sys.path.append(os.path.join(ROOT, 'app'))
+
+from swarm import Swarm, Agent, SessionStore
+from regulations_gov_api import RegulationsGovAPI, orjson
+from async_regulations_gov_api import AsyncRegulationsGovAPI
+from rate_limiter import RateLimiter
+from bench_history import build_history
+from fake_openai import FakeAsyncOpenAI, FakeOpenAI, assistant_turn
+from fake_regulations_gov import FakeRegulationsGov, generate_records
+from tool_output import ResultHandles, ToolOutput
+from records import CommentRecord, RecordBatch
+
+
+def timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def median_seconds(fn, repeats: int) -> float:
+    return statistics.median(timed(fn) for _ in range(repeats))
+
+
+def make_api(server: FakeRegulationsGov, cls=RegulationsGovAPI, **kwargs):
+    """A client pointed at the fake server, with a limiter that doesn't pace requests."""
+    api = cls(api_key="DEMO_KEY", rate_limiter=RateLimiter(limit_per_hour=10**9, burst=10**6),
+              backoff_max=5.0, **kwargs)
+    api.BASE_URL = server.url
+    return api
+
+
+def research_tools(api):
+    """Agent functions like the chatbot's, bound to api."""
+
+    def search_documents(filter_searchTerm: str = None, page_size: int = 25) -> str:
+        """Search documents."""
+        docs = api.get_documents(filter_searchTerm=filter_searchTerm, page_size=page_size)["data"]
+        return "\n".join(f"- {d['attributes']['title']} ({d['id']})" for d in docs) or "No documents found."
+
+    def get_docket_detail(docket_id: str) -> str:
+        """Get a docket."""
+        return json.dumps(api.get_docket_by_id(docket_id)["data"]["attributes"])
+
+    return [search_documents, get_docket_detail]
+
+
+def research_script(server: FakeRegulationsGov, calls_per_round: int = 4):
+    """One tool round of searches and docket lookups, then a final answer."""
+    dockets = [d["id"] for d in server.records["dockets"]]
+    tool_calls = [
+        ("search_documents", {"filter_searchTerm": word}) if i % 2 == 0
+        else ("get_docket_detail", {"docket_id": dockets[i % len(dockets)]})
+        for i, word in enumerate(["water", "air", "safety", "energy", "health", "drug"][:calls_per_round])
+    ]
+    return [assistant_turn(tool_calls=tool_calls), assistant_turn(content="Here is what I found.")]
+
+
+##########################################################################################
+# Benchmarks. Each returns a dict of results.
+##########################################################################################
+
+def bench_turn_overhead(quick: bool) -> dict:
+    sizes = (10, 1000) if quick else (10, 100, 1000, 5000)
+    swarm = Swarm(client=FakeOpenAI([assistant_turn(content="Done.")], repeat=True))
+    agent = Agent(name="Agent")
+    results = {}
+    for n in sizes:
+        history = build_history(n, 4096) + [{"role": "user", "content": "Next?"}]
+        seconds = median_seconds(lambda: swarm.run(agent, history), 5 if quick else 20)
+        results[f"us_per_turn_at_{len(history)}_messages"] = round(seconds * 1e6, 1)
+    return results
+
+
+def bench_streaming(quick: bool) -> dict:
+    words = 2000 if quick else 20000
+    content = " ".join(["token"] * words)
+    swarm = Swarm(client=FakeOpenAI([assistant_turn(content=content)], repeat=True))
+    seconds = median_seconds(
+        lambda: list(swarm.run(Agent(), [{"role": "user", "content": "Hi"}], stream=True)), 3)
+    return {"chunks": words + 1, "us_per_chunk": round(seconds / (words + 1) * 1e6, 2)}
+
+
+def bench_tool_latency(quick: bool) -> dict:
+    results = {}
+    with FakeRegulationsGov(records=500 if quick else 2000, latency=0.05) as server:
+        api = make_api(server)
+        script = research_script(server, calls_per_round=4)
+        for workers in (1, 8):
+            swarm = Swarm(client=FakeOpenAI(script, repeat=True), max_parallel_tool_calls=workers)
+            agent = Agent(functions=research_tools(api))
+            seconds = median_seconds(
+                lambda: swarm.run(agent, [{"role": "user", "content": "Research"}]), 3)
+            results[f"ms_per_4_call_round_workers_{workers}"] = round(seconds * 1e3, 1)
+        api.close()
+    return results
+
+
+def bench_concurrency(quick: bool) -> dict:
+    sessions = 8 if quick else 32
+    turns = 2 if quick else 5
+    results = {}
+    with FakeRegulationsGov(records=500 if quick else 2000, latency=0.02) as server:
+        script = research_script(server, calls_per_round=2)
+
+        api = make_api(server, pool_maxsize=sessions)
+        swarm = Swarm(client=FakeOpenAI(script, repeat=True, latency=0.05), max_parallel_tool_calls=8)
+        agent = Agent(functions=research_tools(api))
+
+        def session():
+            messages = []
+            for i in range(turns):
+                messages.append({"role": "user", "content": f"Question {i}"})
+                messages.extend(swarm.run(agent, messages).messages)
+
+        threads = [threading.Thread(target=session) for _ in range(sessions)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        results["threaded_turns_per_second"] = round(sessions * turns / (time.perf_counter() - start), 1)
+        api.close()
+
+        async def run_async() -> float:
+            async_api = make_api(server, cls=AsyncRegulationsGovAPI, max_concurrency=sessions)
+
+            async def search_documents(filter_searchTerm: str = None, page_size: int = 25) -> str:
+                """Search documents."""
+                docs = (await async_api.get_documents(filter_searchTerm=filter_searchTerm,
+                                                      page_size=page_size))["data"]
+                return "\n".join(f"- {d['attributes']['title']} ({d['id']})" for d in docs)
+
+            async def get_docket_detail(docket_id: str) -> str:
+                """Get a docket."""
+                return json.dumps((await async_api.get_docket_by_id(docket_id))["data"]["attributes"])
+
+            async_swarm = Swarm(client=FakeOpenAI([]), max_parallel_tool_calls=8,
+                                async_client=FakeAsyncOpenAI(script, repeat=True, latency=0.05))
+            async_agent = Agent(functions=[search_documents, get_docket_detail])
+
+            async def session():
+                messages = []
+                for i in range(turns):
+                    messages.append({"role": "user", "content": f"Question {i}"})
+                    messages.extend((await async_swarm.arun(async_agent, messages)).messages)
+
+            start = time.perf_counter()
+            await asyncio.gather(*(session() for _ in range(sessions)))
+            elapsed = time.perf_counter() - start
+            await async_api.close()
+            return elapsed
+
+        results["async_turns_per_second"] = round(sessions * turns / asyncio.run(run_async()), 1)
+        results["sessions"] = sessions
+    return results
+
+
+def bench_client_paging(quick: bool) -> dict:
+    records = 3000 if quick else 12000
+    with FakeRegulationsGov(records=records, latency=0.005, throttle_every=5, retry_after=0.05) as server:
+        api = make_api(server)
+        count = 0
+        start = time.perf_counter()
+        for _ in api.iter_documents(page_size=250):
+            count += 1
+        elapsed = time.perf_counter() - start
+        api.close()
+        return {
+            "records": count,
+            "records_per_second": round(count / elapsed),
+            "requests": server.requests,
+            "throttled": server.throttled,
+        }
+
+
+def bench_memory(quick: bool) -> dict:
+    turns = 50 if quick else 200
+    with FakeRegulationsGov(records=500, latency=0.0) as server:
+        api = make_api(server)
+        swarm = Swarm(client=FakeOpenAI(research_script(server, calls_per_round=2), repeat=True))
+        agent = Agent(functions=research_tools(api))
+        messages = []
+
+        def turn(i):
+            messages.append({"role": "user", "content": f"Question {i}"})
+            messages.extend(swarm.run(agent, messages).messages)
+
+        turn(0)  # warm up connections and caches
+        tracemalloc.start()
+        baseline, _ = tracemalloc.get_traced_memory()
+        for i in range(1, turns + 1):
+            turn(i)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        history_bytes = sum(len(json.dumps(m)) for m in messages)
+        api.close()
+    return {
+        "turns": turns,
+        "kb_retained_per_turn": round((current - baseline) / turns / 1024, 1),
+        "history_kb_per_turn": round(history_bytes / (turns + 1) / 1024, 1),
+        "peak_mb": round(peak / 1024 / 1024, 1),
+    }
+
+
+def bench_session_store(quick: bool) -> dict:
+    sizes = (100, 1000) if quick else (100, 1000, 10000)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        store = SessionStore(os.path.join(directory, "sessions.sqlite3"))
+        for n in sizes:
+            session_id = f"session-{n}"
+            history = build_history(n, 4096)
+            # messages arrive four per turn: user, tool call, tool result, answer
+            start = time.perf_counter()
+            for i in range(0, n, 4):
+                store.append(session_id, history[i:i + 4], "Agent")
+            results[f"us_per_append_at_{n}_messages"] = round((time.perf_counter() - start) / (n / 4) * 1e6, 1)
+            results[f"ms_resume_info_{n}"] = round(median_seconds(lambda: store.info(session_id), 5) * 1e3, 3)
+            results[f"ms_load_last_20_{n}"] = round(
+                median_seconds(lambda: store.load(session_id, last=20), 5) * 1e3, 3)
+            results[f"ms_load_all_{n}"] = round(median_seconds(lambda: store.load(session_id), 3) * 1e3, 1)
+        stats = store.stats()
+        large_chars = sum(len(m["content"]) for n in sizes for m in build_history(n, 4096)
+                          if len(m["content"] or "") >= store.blob_min_chars)
+        results["large_content_stored_pct"] = round(100 * stats["blob_chars"] / large_chars, 2)
+        store.close()
+    return results
+
+
+def bench_tool_output(quick: bool) -> dict:
+    records = generate_records(100 if quick else 1000)
+    handles = ResultHandles()
+    cases = {
+        "documents": (records["documents"], ToolOutput(["id", "title", "documentType", "postedDate"])),
+        "comments": (records["comments"], ToolOutput(["id", "title", "postedDate"])),
+    }
+    results = {}
+    for name, (data, output) in cases.items():
+        page = data[:25]
+        raw = json.dumps(page)
+        compact = handles.render({"data": page, "meta": {"totalElements": len(data)}}, output)
+        results[f"{name}_raw_chars"] = len(raw)
+        results[f"{name}_compact_chars"] = len(compact)
+        results[f"{name}_render_us"] = round(median_seconds(
+            lambda: handles.render({"data": page, "meta": {"totalElements": len(data)}}, output), 20) * 1e6, 1)
+    return results
+
+
+def bench_bulk_decode(quick: bool) -> dict:
+    pages = 8 if quick else 40
+    records = generate_records(250)["documents"]
+    body = json.dumps({"data": records, "meta": {"totalElements": 250 * pages}}).encode()
+    fields = ["title", "documentType", "postedDate", "agencyId"]
+    decoders = {"json": json.loads}
+    if orjson is not None:
+        decoders["orjson"] = orjson.loads
+    results = {"page_kb": round(len(body) / 1024, 1)}
+    for name, loads in decoders.items():
+        api = RegulationsGovAPI(api_key="bench", json_loads=loads)
+        results[f"{name}_page_ms"] = round(median_seconds(lambda: api._decode(body), 20) * 1e3, 2)
+        results[f"{name}_projected_page_ms"] = round(median_seconds(lambda: api._decode(body, fields), 20) * 1e3, 2)
+        api.close()
+
+    api = RegulationsGovAPI(api_key="bench")
+
+    def retained_kb(projection) -> float:
+        tracemalloc.start()
+        kept = [api._decode(body, projection)["data"] for _ in range(pages)]
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return round(current / 1024, 1)
+
+    results["records"] = 250 * pages
+    results["full_retained_kb"] = retained_kb(None)
+    results["projected_retained_kb"] = retained_kb(fields)
+    api.close()
+    return results
+
+
+def bench_records(quick: bool) -> dict:
+    count = 10000 if quick else 100000
+    comments = generate_records(count, comment_bytes=0)["comments"]
+    for record in comments:
+        record["links"] = {"self": f"https://api.regulations.gov/v4/comments/{record['id']}"}
+    body = json.dumps(comments)
+    del comments
+
+    def bytes_per_record(build) -> float:
+        tracemalloc.start()
+        kept = build()
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del kept
+        return round(current / count)
+
+    results = {
+        "records": count,
+        "dict_bytes_per_record": bytes_per_record(lambda: json.loads(body)),
+        "record_bytes_per_record": bytes_per_record(lambda: [CommentRecord.from_api(r) for r in json.loads(body)]),
+        "batch_bytes_per_record": bytes_per_record(lambda: RecordBatch.from_api(json.loads(body))),
+    }
+    decoded = json.loads(body)
+    start = time.perf_counter()
+    records = [CommentRecord.from_api(r) for r in decoded]
+    results["from_api_per_second"] = round(count / (time.perf_counter() - start))
+    start = time.perf_counter()
+    for record in records:
+        record.to_api()
+    results["to_api_per_second"] = round(count / (time.perf_counter() - start))
+    return results
+
+
+def bench_import_time(quick: bool) -> dict:
+    repeats = 5 if quick else 15
+    heavy = ("openai", "requests", "httpx", "tiktoken")
+    cases = {
+        "swarm": "import swarm",
+        "swarm_construct": "import swarm; swarm.Swarm()",
+        "chatbot": "import rga_console_chatbot",
+    }
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([ROOT, os.path.join(ROOT, "app")])}
+
+    def interpreter_seconds(code: str) -> float:
+        return median_seconds(lambda: subprocess.run([sys.executable, "-c", code], env=env, check=True),
+                              repeats)
+
+    baseline = interpreter_seconds("pass")
+    results = {}
+    for name, code in cases.items():
+        results[f"ms_{name}"] = round((interpreter_seconds(code) - baseline) * 1e3, 1)
+        probe = f"{code}; import sys; print(','.join(m for m in {heavy!r} if m in sys.modules))"
+        loaded = subprocess.run([sys.executable, "-c", probe], env=env, check=True,
+                                capture_output=True, text=True).stdout.strip()
+        results[f"{name}_loads"] = loaded or "-"
+    return results
+
+
+BENCHMARKS = {
+    "turn_overhead": bench_turn_overhead,
+    "streaming": bench_streaming,
+    "tool_latency": bench_tool_latency,
+    "concurrency": bench_concurrency,
+    "client_paging": bench_client_paging,
+    "memory": bench_memory,
+    "session_store": bench_session_store,
+    "tool_output": bench_tool_output,
+    "bulk_decode": bench_bulk_decode,
+    "records": bench_records,
+    "import_time": bench_import_time,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline Swarm / Regulations.gov client benchmarks.")
+    parser.add_argument("benchmarks", nargs="*",
+                        help=f"Benchmarks to run (default: all): {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--quick", action="store_true", help="Smaller workloads, for CI.")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results to PATH as JSON.")
+    args = parser.parse_args()
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in args.benchmarks or BENCHMARKS:
+        results[name] = BENCHMARKS[name](args.quick)
+        print(name)
+        for key, value in results[name].items():
+            print(f"  {key:<40} {value}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,19 @@
+from .compaction import HistoryCompactor
 from .core import Swarm
+from .session_store import SessionStore
+from .tool_cache import ToolResultCache
+from .tracing import JSONLinesSink, LoggingSink, OpenTelemetrySink, Tracer
 from .types import Agent, Response
 
-__all__ = ["Swarm", "Agent", "Response"]
+__all__ = [
+    "Swarm",
+    "Agent",
+    "Response",
+    "HistoryCompactor",
+    "ToolResultCache",
+    "SessionStore",
+    "Tracer",
+    "LoggingSink",
+    "JSONLinesSink",
+    "OpenTelemetrySink",
+]
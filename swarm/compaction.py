@@ -0,0 +1,214 @@
+# Standard library imports
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, List
+
+# Local imports
+from .util import debug_print
+
+# Rough characters-per-token ratio of GPT tokenizers on English text and JSON.
+CHARS_PER_TOKEN = 4
+# Fixed per-message cost of the chat format (role, separators).
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+class TokenCounter:
+    """
+    Counts tokens locally, with tiktoken when it is installed and a character based
+    estimate otherwise. Counts of large strings are memoized, since the same tool
+    outputs are counted again on every turn.
+    """
+
+    def __init__(self, encoding: str = "o200k_base", cache_size: int = 4096, min_cached_chars: int = 256):
+        self.encoding_name = encoding
+        self.cache_size = cache_size
+        self.min_cached_chars = min_cached_chars
+        self._encoding = None
+        self._loaded = False
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def encoding(self):
+        # loaded on first use: importing tiktoken and building an encoding take a while
+        if not self._loaded:
+            try:
+                import tiktoken
+
+                self._encoding = tiktoken.get_encoding(self.encoding_name)
+            except Exception:
+                # tiktoken not installed, unknown encoding or no network to fetch its
+                # ranks: token counts fall back to a character estimate
+                self._encoding = None
+            self._loaded = True
+        return self._encoding
+
+    @property
+    def exact(self) -> bool:
+        return self.encoding is not None
+
+    def count_text(self, text: str) -> int:
+        if not text:
+            return 0
+        encoding = self.encoding
+        if encoding is None:
+            return -(-len(text) // CHARS_PER_TOKEN)
+        if len(text) < self.min_cached_chars:
+            return len(encoding.encode(text, disallowed_special=()))
+        with self._lock:
+            if text in self._cache:
+                self._cache.move_to_end(text)
+                return self._cache[text]
+        n = len(encoding.encode(text, disallowed_special=()))
+        with self._lock:
+            self._cache[text] = n
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return n
+
+    def count_message(self, message: dict) -> int:
+        tokens = MESSAGE_OVERHEAD_TOKENS + self.count_text(_content_text(message.get("content")))
+        for tool_call in message.get("tool_calls") or []:
+            function = tool_call.get("function") or {}
+            tokens += self.count_text(function.get("name") or "")
+            tokens += self.count_text(function.get("arguments") or "")
+        return tokens
+
+    def count_messages(self, messages: List[dict]) -> int:
+        return sum(self.count_message(m) for m in messages)
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Return the first max_tokens tokens of text."""
+        encoding = self.encoding
+        if encoding is None:
+            return text[: max_tokens * CHARS_PER_TOKEN]
+        return encoding.decode(encoding.encode(text, disallowed_special=())[:max_tokens])
+
+
+def _content_text(content) -> str:
+    if content is None:
+        return ""
+    if isinstance(content, str):
+        return content
+    # content parts (e.g. [{"type": "text", "text": ...}])
+    return json.dumps(content)
+
+
+class HistoryCompactor:
+    """
+    Keeps the history sent to the model within a token budget.
+
+    Compaction works on a copy of the history and happens in two stages, oldest
+    messages first, stopping as soon as the prompt fits:
+
+    1. Tool results outside the most recent keep_recent_turns turns (a turn starts at
+       a user message) are shortened to tool_result_tokens tokens, or replaced by
+       summarizer(content, tool_name) when a summarizer is given.
+    2. If that isn't enough, whole old turns are dropped. A turn always contains the
+       assistant messages that issued tool calls together with their tool results, so
+       every tool message still follows the tool_calls it answers.
+
+    The caller's messages are never modified; compacted messages are new dicts.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = None,
+        keep_recent_turns: int = 2,
+        tool_result_tokens: int = 200,
+        summarizer: Callable[[str, str], str] = None,
+        counter: TokenCounter = None,
+    ):
+        """
+        Args:
+            max_tokens: Default prompt budget, used for agents without context_budget.
+                None leaves their history untouched.
+            keep_recent_turns: Number of most recent turns whose tool results are kept
+                verbatim.
+            tool_result_tokens: Length stale tool results are truncated to.
+            summarizer: Optional callable (content, tool_name) -> str used instead of
+                truncation for stale tool results.
+            counter: TokenCounter to use. Defaults to a new one.
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = keep_recent_turns
+        self.tool_result_tokens = tool_result_tokens
+        self.summarizer = summarizer
+        self.counter = counter or TokenCounter()
+
+    @staticmethod
+    def _turn_starts(history: List[dict]) -> List[int]:
+        starts = [i for i, m in enumerate(history) if m.get("role") == "user"]
+        if not starts or starts[0] != 0:
+            starts.insert(0, 0)
+        return starts
+
+    def _compact_tool_result(self, message: dict) -> dict:
+        content = _content_text(message.get("content"))
+        if self.summarizer is not None:
+            compacted = self.summarizer(content, message.get("tool_name", ""))
+        else:
+            total = self.counter.count_text(content)
+            compacted = (
+                self.counter.truncate(content, self.tool_result_tokens)
+                + f"\n[... {total - self.tool_result_tokens} more tokens of this earlier tool result omitted]"
+            )
+        return {**message, "content": compacted}
+
+    def compact(self, history: List[dict], budget: int = None, reserved_tokens: int = 0,
+                debug: bool = False) -> List[dict]:
+        """
+        Return history, compacted if needed so that it plus reserved_tokens fits budget.
+
+        Args:
+            history: Conversation messages (without the system message).
+            budget: Token budget of the whole prompt. Defaults to max_tokens.
+            reserved_tokens: Tokens already used by the system message and tool schemas.
+            debug: Print what was compacted.
+        """
+        budget = budget if budget is not None else self.max_tokens
+        if budget is None:
+            return history
+        limit = budget - reserved_tokens
+        sizes = [self.counter.count_message(m) for m in history]
+        total = sum(sizes)
+        if total <= limit:
+            return history
+
+        compacted = list(history)
+        starts = self._turn_starts(compacted)
+        if self.keep_recent_turns > 0:
+            protected_from = starts[max(0, len(starts) - self.keep_recent_turns)]
+        else:
+            protected_from = len(compacted)
+
+        # 1. shorten stale tool results, oldest first
+        shortened = 0
+        for i in range(protected_from):
+            if total <= limit:
+                break
+            message = compacted[i]
+            if message.get("role") != "tool" or sizes[i] <= self.tool_result_tokens + MESSAGE_OVERHEAD_TOKENS + 16:
+                continue
+            compacted[i] = self._compact_tool_result(message)
+            new_size = self.counter.count_message(compacted[i])
+            total -= sizes[i] - new_size
+            sizes[i] = new_size
+            shortened += 1
+
+        # 2. drop whole turns, oldest first, always keeping the latest one
+        dropped = 0
+        while total > limit and len(starts) > 1:
+            end = starts[1]
+            total -= sum(sizes[:end])
+            del compacted[:end], sizes[:end]
+            starts = [s - end for s in starts[1:]]
+            dropped += end
+
+        debug_print(
+            debug,
+            f"Compacted history: {shortened} tool results shortened, {dropped} messages dropped, "
+            f"~{total + reserved_tokens} of {budget} tokens.",
+        )
+        return compacted
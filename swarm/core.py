@@ -1,47 +1,133 @@
 # Standard library imports
-import copy
+import asyncio
+import inspect
 import json
 from collections import defaultdict
-from typing import List, Callable, Union
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, List, Callable, Union
 import os
-
-# Package/library imports
-from openai import AzureOpenAI
+import threading
+import time
 
 # Local imports
-from .util import function_to_json, debug_print, merge_chunk
+from .compaction import HistoryCompactor
+from .tool_cache import MISS, ToolResultCache
+from .tracing import Tracer
+from .util import StreamAccumulator, cached_function_to_json, debug_print
 from .types import (
     Agent,
     AgentFunction,
-    ChatCompletionMessage,
-    ChatCompletionMessageToolCall,
-    Function,
     Response,
     Result,
 )
 
+if TYPE_CHECKING:
+    from .types import ChatCompletionMessage, ChatCompletionMessageToolCall
+
 __CTX_VARS_NAME__ = "context_variables"
 
-from dotenv import load_dotenv
-load_dotenv()
 
-AOAI_ENDPOINT=os.getenv("AOAI_ENDPOINT")
-AOAI_KEY=os.getenv("AOAI_KEY")
+class _SameAs:
+    def __init__(self, index: int):
+        self.index = index
 
 
+class _ToolTimeout:
+    def __init__(self, name: str, timeout: float):
+        self.message = f"Tool {name} timed out after {timeout} seconds."
 
-class Swarm:
-    def __init__(self, client=None):
-        if not client:
-            client = AzureOpenAI(
-                azure_endpoint=AOAI_ENDPOINT,
-                azure_deployment="gpt-4o",
-                api_key=AOAI_KEY,
-                api_version="2024-10-01-preview",
-            )
-        self.client = client
 
-    def get_chat_completion(
+class _PendingCall:
+    """State of one tool call run on a worker thread by _execute_tool_calls."""
+
+    __slots__ = ("tool_call", "func", "args", "timeout", "started", "done", "timed_out",
+                 "released", "result", "error")
+
+    def __init__(self, tool_call, func, args, timeout):
+        self.tool_call = tool_call
+        self.func = func
+        self.args = args
+        self.timeout = timeout
+        self.started = None
+        self.done = self.timed_out = self.released = False
+        self.result = self.error = None
+
+
+def _default_client(asynchronous: bool = False):
+    """
+    Azure OpenAI client configured from the AOAI_ENDPOINT and AOAI_KEY environment
+    variables. The openai package is imported here rather than at module level because
+    importing it takes longer than everything else in swarm put together.
+    """
+    from openai import AsyncAzureOpenAI, AzureOpenAI
+
+    client_class = AsyncAzureOpenAI if asynchronous else AzureOpenAI
+    return client_class(
+        azure_endpoint=os.getenv("AOAI_ENDPOINT"),
+        azure_deployment="gpt-4o",
+        api_key=os.getenv("AOAI_KEY"),
+        api_version="2024-10-01-preview",
+    )
+
+
+class Swarm:
+    def __init__(
+        self,
+        client=None,
+        async_client=None,
+        max_parallel_tool_calls: int = 1,
+        tool_timeout: float = None,
+        tool_timeouts: dict = None,
+        compactor: HistoryCompactor = None,
+        tool_cache: ToolResultCache = None,
+        tracer: Tracer = None,
+    ):
+        """
+        Args:
+            client: OpenAI-compatible client. Defaults to an AzureOpenAI client
+                configured from AOAI_ENDPOINT / AOAI_KEY, created on first use.
+            async_client: Async OpenAI-compatible client used by arun. Defaults to an
+                AsyncAzureOpenAI client, created on first use.
+            max_parallel_tool_calls: Maximum number of tool calls from one completion
+                executed concurrently. The default of 1 runs them one after another, in
+                order; raise it only if the agent functions are thread-safe and don't
+                depend on running in order.
+            tool_timeout: Default timeout in seconds for a single tool call.
+            tool_timeouts: Per-function timeouts in seconds, keyed by function name.
+            compactor: HistoryCompactor that keeps prompts within Agent.context_budget
+                (or its own max_tokens). Defaults to one that truncates stale tool
+                results.
+            tool_cache: Optional ToolResultCache memoizing the results of functions
+                declared pure in it. Share one instance to share results across runs.
+            tracer: Tracer receiving spans for runs, completions (with token usage and
+                time to first token), tool calls and handoffs. Tracing is off by default.
+        """
+        self.max_parallel_tool_calls = max_parallel_tool_calls
+        self.tool_timeout = tool_timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self.compactor = compactor or HistoryCompactor()
+        self.tool_cache = tool_cache
+        self.tracer = tracer or Tracer()
+        self._client = client or None
+        self._async_client = async_client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = _default_client()
+        return self._client
+
+    @client.setter
+    def client(self, client):
+        self._client = client
+
+    @property
+    def async_client(self):
+        if self._async_client is None:
+            self._async_client = _default_client(asynchronous=True)
+        return self._async_client
+
+    def _completion_params(
         self,
         agent: Agent,
         history: List,
@@ -49,24 +135,31 @@ class Swarm:
         model_override: str,
         stream: bool,
         debug: bool,
-    ) -> ChatCompletionMessage:
+    ) -> dict:
         context_variables = defaultdict(str, context_variables)
         instructions = (
             agent.instructions(context_variables)
             if callable(agent.instructions)
             else agent.instructions
         )
-        messages = [{"role": "system", "content": instructions}] + history
+        system_message = {"role": "system", "content": instructions}
+
+        # schemas are built once per function; context_variables is hidden from model
+        tools = [
+            cached_function_to_json(f, hidden_params=(__CTX_VARS_NAME__,))
+            for f in agent.functions
+        ]
+
+        budget = agent.context_budget or self.compactor.max_tokens
+        if budget:
+            counter = self.compactor.counter
+            reserved = counter.count_message(system_message) + (
+                counter.count_text(json.dumps(tools)) if tools else 0)
+            history = self.compactor.compact(history, budget, reserved, debug)
+
+        messages = [system_message] + history
         debug_print(debug, "Getting chat completion for...:", messages)
 
-        tools = [function_to_json(f) for f in agent.functions]
-        # hide context_variables from model
-        for tool in tools:
-            params = tool["function"]["parameters"]
-            params["properties"].pop(__CTX_VARS_NAME__, None)
-            if __CTX_VARS_NAME__ in params["required"]:
-                params["required"].remove(__CTX_VARS_NAME__)
-
         create_params = {
             #"deployment_id": model_override or agent.model,
             "model": model_override or agent.model,
@@ -78,9 +171,38 @@ class Swarm:
 
         if tools:
             create_params["parallel_tool_calls"] = agent.parallel_tool_calls
+        if stream:
+            # without this, streamed responses carry no token usage
+            create_params["stream_options"] = {"include_usage": True}
+
+        return create_params
 
+    def get_chat_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+    ) -> "ChatCompletionMessage":
+        create_params = self._completion_params(
+            agent, history, context_variables, model_override, stream, debug)
         return self.client.chat.completions.create(**create_params)
 
+    async def aget_chat_completion(
+        self,
+        agent: Agent,
+        history: List,
+        context_variables: dict,
+        model_override: str,
+        stream: bool,
+        debug: bool,
+    ) -> "ChatCompletionMessage":
+        create_params = self._completion_params(
+            agent, history, context_variables, model_override, stream, debug)
+        return await self.async_client.chat.completions.create(**create_params)
+
     def handle_function_result(self, result, debug) -> Result:
         match result:
             case Result() as result:
@@ -99,22 +221,265 @@ class Swarm:
                     debug_print(debug, error_message)
                     raise TypeError(error_message)
 
+    def _timeout_for(self, name: str):
+        return self.tool_timeouts.get(name, self.tool_timeout)
+
+    def _call_function(self, func: AgentFunction, args: dict):
+        raw_result = func(**args)
+        # async agent functions get their own event loop when run from the sync path
+        if inspect.isawaitable(raw_result):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(raw_result)
+            if inspect.iscoroutine(raw_result):
+                raw_result.close()
+            raise RuntimeError(
+                f"Async agent function {getattr(func, '__name__', func)!r} can't be run by "
+                "Swarm.run inside a running event loop; use Swarm.arun instead.")
+        return raw_result
+
+    def _traced_call(self, tool_call, func: AgentFunction, args: dict, parent=None):
+        with self.tracer.span(
+            "tool.call", parent,
+            **{"tool.name": tool_call.function.name, "tool.call_id": tool_call.id},
+        ):
+            return self._call_function(func, args)
+
+    def _prepare_tool_call(self, tool_call, function_map, context_variables, debug):
+        name = tool_call.function.name
+        if name not in function_map:
+            debug_print(debug, "Tool", name, "not found in function map.")
+            return None, None
+        args = json.loads(tool_call.function.arguments)
+        debug_print(debug, "Processing tool call:", name, "with arguments", args)
+
+        func = function_map[name]
+        # pass context_variables to agent functions
+        if __CTX_VARS_NAME__ in func.__code__.co_varnames:
+            args[__CTX_VARS_NAME__] = context_variables
+        return func, args
+
+    def _execute_tool_calls(self, prepared, debug) -> List:
+        """
+        Run prepared (tool_call, func, args) triples and return their raw results in
+        tool-call order. Calls run on worker threads, at most max_parallel_tool_calls at
+        a time, when there are several of them and max_parallel_tool_calls allows it, or
+        when a timeout applies. A call's timeout counts from when it starts running; a
+        call that times out gives up its place to the next one.
+        """
+        runnable = [(tc, f, a) for tc, f, a in prepared if f is not None]
+        needs_timeout = any(
+            self._timeout_for(tc.function.name) is not None for tc, _, _ in runnable)
+        parallel = self.max_parallel_tool_calls > 1 and len(runnable) > 1
+        if not parallel and not needs_timeout:
+            return [
+                self._traced_call(tool_call, func, args) if func is not None else None
+                for tool_call, func, args in prepared
+            ]
+
+        slots = threading.Semaphore(max(1, min(self.max_parallel_tool_calls, len(runnable))))
+        changed = threading.Condition()
+        parent = self.tracer.current_span()
+        calls = [
+            _PendingCall(tool_call, func, args, self._timeout_for(tool_call.function.name))
+            if func is not None else None
+            for tool_call, func, args in prepared
+        ]
+
+        def release(call):
+            # caller holds changed
+            if not call.released:
+                call.released = True
+                slots.release()
+
+        def run(call):
+            slots.acquire()
+            with changed:
+                call.started = time.monotonic()
+                changed.notify_all()
+            try:
+                call.result = self._traced_call(call.tool_call, call.func, call.args, parent)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with changed:
+                    call.done = True
+                    release(call)
+                    changed.notify_all()
+
+        # one thread per call, so a call that hangs past its timeout doesn't hold up the
+        # ones behind it; the semaphore bounds how many run at once
+        pool = ThreadPoolExecutor(max_workers=len(runnable), thread_name_prefix="swarm-tool")
+        try:
+            for call in calls:
+                if call is not None:
+                    pool.submit(run, call)
+            with changed:
+                while True:
+                    now = time.monotonic()
+                    pending = False
+                    next_deadline = None
+                    for call in calls:
+                        if call is None or call.done or call.timed_out:
+                            continue
+                        if call.started is not None and call.timeout is not None:
+                            deadline = call.started + call.timeout
+                            if deadline <= now:
+                                call.timed_out = True
+                                release(call)
+                                debug_print(debug, "Tool", call.tool_call.function.name,
+                                            "timed out after", call.timeout, "s.")
+                                continue
+                            if next_deadline is None or deadline < next_deadline:
+                                next_deadline = deadline
+                        pending = True
+                    if not pending:
+                        break
+                    changed.wait(None if next_deadline is None else next_deadline - now)
+        finally:
+            # don't block the turn on tools that timed out
+            pool.shutdown(wait=False)
+
+        results = []
+        for call in calls:
+            if call is None:
+                results.append(None)
+            elif call.timed_out:
+                results.append(_ToolTimeout(call.tool_call.function.name, call.timeout))
+            elif call.error is not None:
+                raise call.error
+            else:
+                results.append(call.result)
+        return results
+
+    async def _acall_function(self, tool_call, func: AgentFunction, args: dict):
+        with self.tracer.span(
+            "tool.call", **{"tool.name": tool_call.function.name, "tool.call_id": tool_call.id}
+        ):
+            # async agent functions run on the caller's loop; sync ones on a worker thread
+            if inspect.iscoroutinefunction(func):
+                return await func(**args)
+            raw_result = await asyncio.to_thread(func, **args)
+            if inspect.isawaitable(raw_result):
+                raw_result = await raw_result
+            return raw_result
+
+    async def _aexecute_tool_calls(self, prepared, debug) -> List:
+        """
+        Async counterpart of _execute_tool_calls: runs the prepared calls concurrently
+        (at most max_parallel_tool_calls at a time) and returns their raw results in
+        tool-call order.
+        """
+        slots = asyncio.Semaphore(max(1, self.max_parallel_tool_calls))
+
+        async def run_one(tool_call, func, args):
+            if func is None:
+                return None
+            name = tool_call.function.name
+            timeout = self._timeout_for(name)
+            async with slots:
+                if timeout is None:
+                    return await self._acall_function(tool_call, func, args)
+                # asyncio.wait (unlike wait_for) lets a TimeoutError raised by the
+                # tool itself propagate instead of being mistaken for our deadline
+                task = asyncio.ensure_future(self._acall_function(tool_call, func, args))
+                done, _ = await asyncio.wait({task}, timeout=timeout)
+                if not done:
+                    task.cancel()
+                    debug_print(debug, "Tool", name, "timed out after", timeout, "s.")
+                    return _ToolTimeout(name, timeout)
+                return task.result()
+
+        return await asyncio.gather(*(run_one(*p) for p in prepared))
+
     def handle_tool_calls(
         self,
-        tool_calls: List[ChatCompletionMessageToolCall],
+        tool_calls: List["ChatCompletionMessageToolCall"],
         functions: List[AgentFunction],
         context_variables: dict,
         debug: bool,
     ) -> Response:
+        prepared = self._prepare_tool_calls(
+            tool_calls, functions, context_variables, debug)
+        raw_results, misses = self._memoized_results(prepared, debug)
+        executed = self._execute_tool_calls([prepared[i] for i in misses], debug)
+        self._fill_results(prepared, raw_results, misses, executed)
+        return self._merge_tool_results(prepared, raw_results, debug)
+
+    async def ahandle_tool_calls(
+        self,
+        tool_calls: List["ChatCompletionMessageToolCall"],
+        functions: List[AgentFunction],
+        context_variables: dict,
+        debug: bool,
+    ) -> Response:
+        prepared = self._prepare_tool_calls(
+            tool_calls, functions, context_variables, debug)
+        raw_results, misses = self._memoized_results(prepared, debug)
+        executed = await self._aexecute_tool_calls([prepared[i] for i in misses], debug)
+        self._fill_results(prepared, raw_results, misses, executed)
+        return self._merge_tool_results(prepared, raw_results, debug)
+
+    def _prepare_tool_calls(self, tool_calls, functions, context_variables, debug) -> List:
         function_map = {f.__name__: f for f in functions}
+        return [
+            (tool_call, *self._prepare_tool_call(
+                tool_call, function_map, context_variables, debug))
+            for tool_call in tool_calls
+        ]
+
+    def _memoized_results(self, prepared, debug):
+        """
+        Look prepared calls up in the tool cache. Returns the results list (MISS where a
+        call still has to run) and the indices of those calls.
+        """
+        if self.tool_cache is None:
+            return [MISS] * len(prepared), list(range(len(prepared)))
+        raw_results, misses, first_call = [], [], {}
+        for i, (tool_call, func, _) in enumerate(prepared):
+            name = tool_call.function.name
+            raw_result = MISS
+            if func is not None and self.tool_cache.is_memoized(name):
+                key = self.tool_cache.key(name, tool_call.function.arguments)
+                if key in first_call:
+                    # identical call earlier in the same completion: run it once
+                    raw_results.append(first_call[key])
+                    continue
+                raw_result = self.tool_cache.get(name, tool_call.function.arguments)
+                if raw_result is MISS:
+                    first_call[key] = _SameAs(i)
+                else:
+                    debug_print(debug, "Using memoized result of", name)
+                    self.tracer.record(
+                        "tool.call", time.time(), time.time(),
+                        **{"tool.name": name, "tool.call_id": tool_call.id, "tool.cached": True})
+            raw_results.append(raw_result)
+            if raw_result is MISS:
+                misses.append(i)
+        return raw_results, misses
+
+    def _fill_results(self, prepared, raw_results, misses, executed):
+        for i, raw_result in zip(misses, executed):
+            raw_results[i] = raw_result
+            tool_call, func, _ = prepared[i]
+            if self.tool_cache is not None and func is not None:
+                self.tool_cache.set(
+                    tool_call.function.name, tool_call.function.arguments, raw_result)
+        for i, raw_result in enumerate(raw_results):
+            if isinstance(raw_result, _SameAs):
+                raw_results[i] = raw_results[raw_result.index]
+
+    def _merge_tool_results(self, prepared, raw_results, debug) -> Response:
         partial_response = Response(
             messages=[], agent=None, context_variables={})
 
-        for tool_call in tool_calls:
+        # merge in tool-call order so messages, context updates and handoffs are
+        # deterministic regardless of which call finished first
+        for (tool_call, func, _), raw_result in zip(prepared, raw_results):
             name = tool_call.function.name
             # handle missing tool case, skip to next tool
-            if name not in function_map:
-                debug_print(debug, f"Tool {name} not found in function map.")
+            if func is None:
                 partial_response.messages.append(
                     {
                         "role": "tool",
@@ -124,15 +489,16 @@ class Swarm:
                     }
                 )
                 continue
-            args = json.loads(tool_call.function.arguments)
-            debug_print(
-                debug, f"Processing tool call: {name} with arguments {args}")
-
-            func = function_map[name]
-            # pass context_variables to agent functions
-            if __CTX_VARS_NAME__ in func.__code__.co_varnames:
-                args[__CTX_VARS_NAME__] = context_variables
-            raw_result = function_map[name](**args)
+            if isinstance(raw_result, _ToolTimeout):
+                partial_response.messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": tool_call.id,
+                        "tool_name": name,
+                        "content": f"Error: {raw_result.message}",
+                    }
+                )
+                continue
 
             result: Result = self.handle_function_result(raw_result, debug)
             partial_response.messages.append(
@@ -149,6 +515,94 @@ class Swarm:
 
         return partial_response
 
+    def _own_inputs(self, messages: List, context_variables: dict):
+        """
+        Take ownership of a run's inputs without copying the conversation.
+
+        A run never mutates the caller's messages list, the message dicts in it or the
+        caller's context_variables dict: it appends to a shallow copy of the list and
+        updates a shallow copy of the dict, so the cost is independent of message
+        sizes. Values inside context_variables are shared with the caller, so agent
+        functions that mutate them in place change the caller's objects; return
+        Result(context_variables=...) to update them instead.
+        """
+        return list(messages), dict(context_variables)
+
+    def _finish_stream_message(self, accumulator: StreamAccumulator, debug: bool):
+        """Assemble a streamed message; returns it and its tool calls as objects."""
+        from .types import ChatCompletionMessageToolCall, Function
+
+        message = accumulator.message()
+        debug_print(debug, "Received completion:", message)
+
+        # convert tool_calls to objects
+        tool_calls = []
+        for tool_call in message["tool_calls"] or []:
+            function = Function(
+                arguments=tool_call["function"]["arguments"],
+                name=tool_call["function"]["name"],
+            )
+            tool_call_object = ChatCompletionMessageToolCall(
+                id=tool_call["id"], function=function, type=tool_call["type"] or "function"
+            )
+            tool_calls.append(tool_call_object)
+        return message, tool_calls
+
+    def _record_completion(self, completion, agent: Agent, history: List, debug: bool):
+        message = completion.choices[0].message
+        debug_print(debug, "Received completion:", message)
+        message.sender = agent.name
+        history.append(
+            json.loads(message.model_dump_json())
+        )  # to avoid OpenAI types (?)
+        return message
+
+    def _apply_partial_response(
+        self, partial_response: Response, history: List, context_variables: dict, active_agent: Agent,
+        run_span=None,
+    ) -> Agent:
+        """Fold the results of a round of tool calls into the turn; returns the active agent."""
+        history.extend(partial_response.messages)
+        context_variables.update(partial_response.context_variables)
+        if partial_response.agent and partial_response.agent is not active_agent:
+            now = time.time()
+            self.tracer.record(
+                "agent.handoff", now, now, parent=run_span,
+                **{"swarm.from_agent": active_agent.name, "swarm.to_agent": partial_response.agent.name})
+        return partial_response.agent or active_agent
+
+    def _start_run_span(self, agent: Agent, messages: List, stream: bool):
+        return self.tracer.span(
+            "swarm.run", **{"swarm.agent": agent.name, "swarm.stream": stream, "swarm.messages": len(messages)})
+
+    def _end_run_span(self, span, history: List, init_len: int, active_agent: Agent):
+        span.set("swarm.new_messages", len(history) - init_len)
+        span.set("swarm.final_agent", active_agent.name if active_agent else None)
+        span.end()
+
+    def _start_completion_span(self, agent: Agent, history: List, model_override: str, stream: bool, parent=None):
+        return self.tracer.span(
+            "chat.completion", parent,
+            **{
+                "gen_ai.request.model": model_override or agent.model,
+                "swarm.agent": agent.name,
+                "swarm.stream": stream,
+                "swarm.messages": len(history) + 1,
+                "swarm.tools": len(agent.functions),
+            },
+        )
+
+    def _end_completion_span(self, span, usage, tool_calls: int, first_token_ns: int = None):
+        if not self.tracer.enabled:
+            return
+        if first_token_ns is not None:
+            span.set("swarm.ttft_ms", round((first_token_ns - span.start_ns) / 1e6, 3))
+        if usage is not None:
+            span.set("gen_ai.usage.input_tokens", usage.prompt_tokens)
+            span.set("gen_ai.usage.output_tokens", usage.completion_tokens)
+        span.set("swarm.tool_calls", tool_calls)
+        span.end()
+
     def run_and_stream(
         self,
         agent: Agent,
@@ -160,78 +614,63 @@ class Swarm:
         execute_tools: bool = True,
     ):
         active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
+        history, context_variables = self._own_inputs(messages, context_variables)
         init_len = len(messages)
-
-        while len(history) - init_len < max_turns:
-
-            message = {
-                "content": "",
-                "sender": agent.name,
-                "role": "assistant",
-                "function_call": None,
-                "tool_calls": defaultdict(
-                    lambda: {
-                        "function": {"arguments": "", "name": ""},
-                        "id": "",
-                        "type": "",
-                    }
-                ),
-            }
-
-            # get completion with current history, agent
-            completion = self.get_chat_completion(
-                agent=active_agent,
-                history=history,
-                context_variables=context_variables,
-                model_override=model_override,
-                stream=True,
-                debug=debug,
-            )
-
-            yield {"delim": "start"}
-            for chunk in completion:
-                delta = json.loads(chunk.choices[0].delta.json())
-                if delta["role"] == "assistant":
-                    delta["sender"] = active_agent.name
-                yield delta
-                delta.pop("role", None)
-                delta.pop("sender", None)
-                merge_chunk(message, delta)
-            yield {"delim": "end"}
-
-            message["tool_calls"] = list(
-                message.get("tool_calls", {}).values())
-            if not message["tool_calls"]:
-                message["tool_calls"] = None
-            debug_print(debug, "Received completion:", message)
-            history.append(message)
-
-            if not message["tool_calls"] or not execute_tools:
-                debug_print(debug, "Ending turn.")
-                break
-
-            # convert tool_calls to objects
-            tool_calls = []
-            for tool_call in message["tool_calls"]:
-                function = Function(
-                    arguments=tool_call["function"]["arguments"],
-                    name=tool_call["function"]["name"],
+        run_span = self._start_run_span(agent, messages, stream=True)
+        completion_span = None
+
+        try:
+            while len(history) - init_len < max_turns:
+
+                accumulator = StreamAccumulator(active_agent.name)
+                completion_span = self._start_completion_span(
+                    active_agent, history, model_override, True, parent=run_span)
+                first_token_ns = None
+
+                # get completion with current history, agent
+                completion = self.get_chat_completion(
+                    agent=active_agent,
+                    history=history,
+                    context_variables=context_variables,
+                    model_override=model_override,
+                    stream=True,
+                    debug=debug,
                 )
-                tool_call_object = ChatCompletionMessageToolCall(
-                    id=tool_call["id"], function=function, type=tool_call["type"]
-                )
-                tool_calls.append(tool_call_object)
 
-            # handle function calls, updating context_variables, and switching agents
-            partial_response = self.handle_tool_calls(
-                tool_calls, active_agent.functions, context_variables, debug
-            )
-            history.extend(partial_response.messages)
-            context_variables.update(partial_response.context_variables)
-            if partial_response.agent:
-                active_agent = partial_response.agent
+                yield {"delim": "start"}
+                for chunk in completion:
+                    delta = accumulator.add(chunk)
+                    if delta is not None:
+                        if first_token_ns is None and (delta["content"] or delta["tool_calls"]):
+                            first_token_ns = time.time_ns()
+                        yield delta
+                yield {"delim": "end"}
+
+                message, tool_calls = self._finish_stream_message(accumulator, debug)
+                self._end_completion_span(
+                    completion_span, accumulator.usage, len(tool_calls), first_token_ns)
+                history.append(message)
+
+                if not tool_calls or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                with self.tracer.use_span(run_span):
+                    partial_response = self.handle_tool_calls(
+                        tool_calls, active_agent.functions, context_variables, debug
+                    )
+                active_agent = self._apply_partial_response(
+                    partial_response, history, context_variables, active_agent, run_span)
+        except Exception as e:
+            run_span.record_error(e)
+            if completion_span is not None:
+                completion_span.record_error(e)
+            raise
+        finally:
+            if completion_span is not None:
+                completion_span.end()
+            self._end_run_span(run_span, history, init_len, active_agent)
 
         yield {
             "response": Response(
@@ -263,40 +702,202 @@ class Swarm:
                 execute_tools=execute_tools,
             )
         active_agent = agent
-        context_variables = copy.deepcopy(context_variables)
-        history = copy.deepcopy(messages)
+        history, context_variables = self._own_inputs(messages, context_variables)
         init_len = len(messages)
+        run_span = self._start_run_span(agent, messages, stream=False)
+
+        try:
+            while len(history) - init_len < max_turns and active_agent:
+
+                # get completion with current history, agent
+                completion_span = self._start_completion_span(
+                    active_agent, history, model_override, False, parent=run_span)
+                with completion_span:
+                    completion = self.get_chat_completion(
+                        agent=active_agent,
+                        history=history,
+                        context_variables=context_variables,
+                        model_override=model_override,
+                        stream=stream,
+                        debug=debug,
+                    )
+                    message = self._record_completion(completion, active_agent, history, debug)
+                    self._end_completion_span(
+                        completion_span, getattr(completion, "usage", None), len(message.tool_calls or []))
+
+                if not message.tool_calls or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                with self.tracer.use_span(run_span):
+                    partial_response = self.handle_tool_calls(
+                        message.tool_calls, active_agent.functions, context_variables, debug
+                    )
+                active_agent = self._apply_partial_response(
+                    partial_response, history, context_variables, active_agent, run_span)
+        except Exception as e:
+            run_span.record_error(e)
+            raise
+        finally:
+            self._end_run_span(run_span, history, init_len, active_agent)
 
-        while len(history) - init_len < max_turns and active_agent:
+        return Response(
+            messages=history[init_len:],
+            agent=active_agent,
+            context_variables=context_variables,
+        )
 
-            # get completion with current history, agent
-            completion = self.get_chat_completion(
+    async def arun_and_stream(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict = {},
+        model_override: str = None,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+    ):
+        """
+        Async generator counterpart of run_and_stream, yielding the same deltas,
+        delimiters and final {"response": Response}.
+        """
+        active_agent = agent
+        history, context_variables = self._own_inputs(messages, context_variables)
+        init_len = len(messages)
+        run_span = self._start_run_span(agent, messages, stream=True)
+        completion_span = None
+
+        try:
+            while len(history) - init_len < max_turns:
+
+                accumulator = StreamAccumulator(active_agent.name)
+                completion_span = self._start_completion_span(
+                    active_agent, history, model_override, True, parent=run_span)
+                first_token_ns = None
+
+                # get completion with current history, agent
+                completion = await self.aget_chat_completion(
+                    agent=active_agent,
+                    history=history,
+                    context_variables=context_variables,
+                    model_override=model_override,
+                    stream=True,
+                    debug=debug,
+                )
+
+                yield {"delim": "start"}
+                async for chunk in completion:
+                    delta = accumulator.add(chunk)
+                    if delta is not None:
+                        if first_token_ns is None and (delta["content"] or delta["tool_calls"]):
+                            first_token_ns = time.time_ns()
+                        yield delta
+                yield {"delim": "end"}
+
+                message, tool_calls = self._finish_stream_message(accumulator, debug)
+                self._end_completion_span(
+                    completion_span, accumulator.usage, len(tool_calls), first_token_ns)
+                history.append(message)
+
+                if not tool_calls or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                with self.tracer.use_span(run_span):
+                    partial_response = await self.ahandle_tool_calls(
+                        tool_calls, active_agent.functions, context_variables, debug
+                    )
+                active_agent = self._apply_partial_response(
+                    partial_response, history, context_variables, active_agent, run_span)
+        except Exception as e:
+            run_span.record_error(e)
+            if completion_span is not None:
+                completion_span.record_error(e)
+            raise
+        finally:
+            if completion_span is not None:
+                completion_span.end()
+            self._end_run_span(run_span, history, init_len, active_agent)
+
+        yield {
+            "response": Response(
+                messages=history[init_len:],
                 agent=active_agent,
-                history=history,
+                context_variables=context_variables,
+            )
+        }
+
+    async def arun(
+        self,
+        agent: Agent,
+        messages: List,
+        context_variables: dict = {},
+        model_override: str = None,
+        stream: bool = False,
+        debug: bool = False,
+        max_turns: int = float("inf"),
+        execute_tools: bool = True,
+    ) -> Response:
+        """
+        Run the agent loop on the caller's event loop with the async client.
+
+        Same arguments and result as run. Async agent functions are awaited directly
+        and sync ones run on worker threads, so tool calls never block the loop. With
+        stream=True, returns the arun_and_stream async generator (use
+        `async for chunk in await swarm.arun(..., stream=True)`).
+        """
+        if stream:
+            return self.arun_and_stream(
+                agent=agent,
+                messages=messages,
                 context_variables=context_variables,
                 model_override=model_override,
-                stream=stream,
                 debug=debug,
+                max_turns=max_turns,
+                execute_tools=execute_tools,
             )
-            message = completion.choices[0].message
-            debug_print(debug, "Received completion:", message)
-            message.sender = active_agent.name
-            history.append(
-                json.loads(message.model_dump_json())
-            )  # to avoid OpenAI types (?)
-
-            if not message.tool_calls or not execute_tools:
-                debug_print(debug, "Ending turn.")
-                break
-
-            # handle function calls, updating context_variables, and switching agents
-            partial_response = self.handle_tool_calls(
-                message.tool_calls, active_agent.functions, context_variables, debug
-            )
-            history.extend(partial_response.messages)
-            context_variables.update(partial_response.context_variables)
-            if partial_response.agent:
-                active_agent = partial_response.agent
+        active_agent = agent
+        history, context_variables = self._own_inputs(messages, context_variables)
+        init_len = len(messages)
+        run_span = self._start_run_span(agent, messages, stream=False)
+
+        try:
+            while len(history) - init_len < max_turns and active_agent:
+
+                # get completion with current history, agent
+                completion_span = self._start_completion_span(
+                    active_agent, history, model_override, False, parent=run_span)
+                with completion_span:
+                    completion = await self.aget_chat_completion(
+                        agent=active_agent,
+                        history=history,
+                        context_variables=context_variables,
+                        model_override=model_override,
+                        stream=stream,
+                        debug=debug,
+                    )
+                    message = self._record_completion(completion, active_agent, history, debug)
+                    self._end_completion_span(
+                        completion_span, getattr(completion, "usage", None), len(message.tool_calls or []))
+
+                if not message.tool_calls or not execute_tools:
+                    debug_print(debug, "Ending turn.")
+                    break
+
+                # handle function calls, updating context_variables, and switching agents
+                with self.tracer.use_span(run_span):
+                    partial_response = await self.ahandle_tool_calls(
+                        message.tool_calls, active_agent.functions, context_variables, debug
+                    )
+                active_agent = self._apply_partial_response(
+                    partial_response, history, context_variables, active_agent, run_span)
+        except Exception as e:
+            run_span.record_error(e)
+            raise
+        finally:
+            self._end_run_span(run_span, history, init_len, active_agent)
 
         return Response(
             messages=history[init_len:],
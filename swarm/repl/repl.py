@@ -1,4 +1,5 @@
 import json
+import uuid
 
 from swarm import Swarm
 
@@ -58,22 +59,39 @@ def pretty_print_messages(messages) -> None:
 
 
 def run_demo_loop(
-    starting_agent, context_variables=None, stream=False, debug=False
+    starting_agent, context_variables=None, stream=False, debug=False, client=None, store=None, session_id=None,
+    agents=None
 ) -> None:
-    client = Swarm()
+    client = client or Swarm()
     print("Starting Swarm CLI 🐝")
 
     messages = []
     agent = starting_agent
+    context_variables = dict(context_variables or {})
+
+    # with a SessionStore, every turn is saved and an existing session is resumed with
+    # its active agent (looked up by name among agents) and context variables
+    if store is not None:
+        session_id = session_id or uuid.uuid4().hex
+        info = store.info(session_id)
+        if info is not None:
+            by_name = {a.name: a for a in [*(agents or []), starting_agent]}
+            agent = by_name.get(info["agent"], starting_agent)
+            context_variables = {**context_variables, **info["context_variables"]}
+            messages = store.load(session_id)
+            print(f"Resumed session {session_id} ({len(messages)} messages)")
+        else:
+            print(f"Session {session_id}")
 
     while True:
         user_input = input("\033[90mUser\033[0m: ")
-        messages.append({"role": "user", "content": user_input})
+        user_message = {"role": "user", "content": user_input}
+        messages.append(user_message)
 
         response = client.run(
             agent=agent,
             messages=messages,
-            context_variables=context_variables or {},
+            context_variables=context_variables,
             stream=stream,
             debug=debug,
         )
@@ -85,3 +103,6 @@ def run_demo_loop(
 
         messages.extend(response.messages)
         agent = response.agent
+        context_variables = response.context_variables
+        if store is not None:
+            store.append(session_id, [user_message, *response.messages], agent.name, context_variables)
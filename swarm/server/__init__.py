@@ -0,0 +1 @@
+from .server import ChatServer, Session, SessionManager, run_chat_server
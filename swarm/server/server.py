@@ -0,0 +1,646 @@
+# Standard library imports
+import json
+import re
+import socket
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+# Local imports
+from ..core import Swarm
+from ..session_store import SessionStore
+from ..types import Agent
+
+
+def _message_bytes(message: dict) -> int:
+    return len(json.dumps(message, default=str))
+
+
+class SessionLimitError(Exception):
+    """Raised when a session can't be created because every slot is in use."""
+
+
+class Session:
+    """
+    One conversation: its history, active agent and context variables.
+
+    A session runs one turn at a time; lock is held for the duration of a turn. With a
+    SessionStore, new messages are appended to it as they are added, and a resumed
+    session reads its history from the store only when it is first needed. Once a
+    session is deleted, a turn still in flight finishes without persisting anything.
+    """
+
+    def __init__(self, session_id: str, agent: Agent, context_variables: dict = None,
+                 store: SessionStore = None, stored_messages: int = 0):
+        self.id = session_id
+        self.agent = agent
+        self.context_variables = dict(context_variables or {})
+        self.store = store
+        self._messages = None if stored_messages else []
+        self.message_count = stored_messages
+        self.size_bytes = 0
+        self.created = self.last_active = time.monotonic()
+        self.lock = threading.Lock()
+        self.deleted = False
+        self._state_lock = threading.Lock()
+
+    @property
+    def messages(self) -> List[dict]:
+        if self._messages is None:
+            self._messages = self.store.load(self.id)
+            self.size_bytes = sum(_message_bytes(m) for m in self._messages)
+        return self._messages
+
+    @property
+    def busy(self) -> bool:
+        return self.lock.locked()
+
+    def touch(self):
+        self.last_active = time.monotonic()
+
+    def append(self, messages: List[dict]):
+        """
+        Add messages, persisting them with the current agent and context variables.
+        Returns False, without adding anything, if the session has been deleted.
+        """
+        with self._state_lock:
+            if self.deleted:
+                return False
+            # load the history before persisting, and persist before adding to it, so a
+            # failed write leaves memory and store in agreement
+            history = self.messages
+            if self.store is not None:
+                self.store.append(self.id, messages, self.agent.name, self.context_variables)
+            history.extend(messages)
+            self.message_count += len(messages)
+            self.size_bytes += sum(_message_bytes(m) for m in messages)
+            return True
+
+    def mark_deleted(self):
+        """Stop persisting this session; waits for an append in progress to finish."""
+        with self._state_lock:
+            self.deleted = True
+
+    def info(self) -> dict:
+        return {
+            "session_id": self.id,
+            "agent": self.agent.name,
+            "messages": self.message_count,
+            "bytes": self.size_bytes,
+            "idle_seconds": round(time.monotonic() - self.last_active, 1),
+            "busy": self.busy,
+        }
+
+
+class SessionManager:
+    """
+    Holds the sessions of a server and evicts them by idle time and memory.
+
+    Sessions that are running a turn are never evicted. With a SessionStore, evicted
+    sessions are only dropped from memory and are resumed from the store on their
+    next request.
+    """
+
+    def __init__(
+        self,
+        starting_agent: Agent,
+        context_variables: dict = None,
+        max_sessions: int = 1000,
+        idle_timeout: float = 3600.0,
+        max_total_bytes: int = 256 * 1024 * 1024,
+        store: SessionStore = None,
+        agents: List[Agent] = None,
+    ):
+        """
+        Args:
+            starting_agent: Agent new sessions start with.
+            context_variables: Initial context variables of new sessions (copied).
+            max_sessions: Maximum number of sessions in memory; creating or resuming
+                one more evicts the least recently active idle session.
+            idle_timeout: Seconds without activity after which a session is evicted.
+            max_total_bytes: Approximate budget for the histories of all sessions;
+                least recently active sessions are evicted beyond it.
+            store: Optional SessionStore persisting every session.
+            agents: Agents a stored session may have been handed off to, used to
+                resume it with its active agent (looked up by name). Sessions whose
+                agent is unknown resume with starting_agent.
+        """
+        self.starting_agent = starting_agent
+        self.context_variables = context_variables or {}
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_total_bytes = max_total_bytes
+        self.store = store
+        self.agents = {a.name: a for a in [*(agents or []), starting_agent]}
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self.evicted = 0
+        self.resumed = 0
+        self._deletions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return sum(s.size_bytes for s in self._sessions.values())
+
+    def _add(self, session: Session):
+        if len(self._sessions) >= self.max_sessions and not self._evict_lru(1):
+            raise SessionLimitError(f"All {self.max_sessions} sessions are in use.")
+        self._sessions[session.id] = session
+
+    def create(self) -> Session:
+        """
+        Start a new session.
+
+        Raises:
+            SessionLimitError: max_sessions are in memory and all of them are busy.
+        """
+        session = Session(uuid.uuid4().hex, self.starting_agent, self.context_variables, self.store)
+        with self._lock:
+            self._add(session)
+        return session
+
+    def get(self, session_id: str) -> Session:
+        """
+        Return the session with session_id, resuming it from the store if it isn't in
+        memory, or None.
+
+        Raises:
+            SessionLimitError: The session must be resumed but max_sessions are in
+                memory and all of them are busy.
+        """
+        while True:
+            with self._lock:
+                session = self._sessions.get(session_id)
+                deletions = self._deletions
+            if session is not None or self.store is None:
+                break
+            # read the store outside the lock so a slow read doesn't hold up other sessions
+            info = self.store.info(session_id)
+            if info is None:
+                return None
+            with self._lock:
+                if self._deletions != deletions:
+                    continue  # a session was deleted meanwhile; it may have been this one
+                session = self._sessions.get(session_id)
+                if session is None:
+                    session = Session(session_id, self.agents.get(info["agent"], self.starting_agent),
+                                      info["context_variables"], self.store, info["message_count"])
+                    self._add(session)
+                    self.resumed += 1
+            break
+        if session is not None:
+            session.touch()
+        return session
+
+    def delete(self, session_id: str) -> bool:
+        """
+        Delete a session from memory and the store. A turn the session is running
+        keeps going, but its messages are discarded instead of recreating the session.
+        """
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                session.mark_deleted()
+            deleted = session is not None
+            self._deletions += 1
+            if self.store is not None:
+                deleted = self.store.delete(session_id) or deleted
+        return deleted
+
+    def evict(self) -> int:
+        """
+        Evict idle sessions, then the least recently active ones while the histories
+        exceed max_total_bytes. Returns the number of sessions evicted.
+        """
+        now = time.monotonic()
+        with self._lock:
+            expired = [s.id for s in self._sessions.values()
+                       if not s.busy and now - s.last_active > self.idle_timeout]
+            for session_id in expired:
+                del self._sessions[session_id]
+            self.evicted += len(expired)
+            evicted = len(expired)
+            total = sum(s.size_bytes for s in self._sessions.values())
+            while total > self.max_total_bytes:
+                freed = self._evict_lru(1)
+                if not freed:
+                    break
+                total -= freed
+                evicted += 1
+            return evicted
+
+    def _evict_lru(self, count: int) -> int:
+        """Evict up to count idle sessions, least recently active first; returns bytes freed."""
+        candidates = sorted((s for s in self._sessions.values() if not s.busy), key=lambda s: s.last_active)
+        freed = 0
+        for session in candidates[:count]:
+            del self._sessions[session.id]
+            # an empty session frees no bytes but still counts as evicted
+            freed += session.size_bytes or 1
+            self.evicted += 1
+        return freed
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return {
+            "sessions": len(sessions),
+            "busy": sum(s.busy for s in sessions),
+            "bytes": sum(s.size_bytes for s in sessions),
+            "evicted": self.evicted,
+            "resumed": self.resumed,
+        }
+
+
+class ChatServer:
+    """
+    Serves many concurrent chat sessions over HTTP from one process.
+
+    All sessions share one Swarm (and so its OpenAI client, tool result cache and
+    tracer) and whatever the agent functions share, such as a pooled API client. Each
+    session keeps its own history, active agent and context variables; agent functions
+    see the session's id as context_variables["session_id"], e.g. to keep per-session
+    state.
+
+    Endpoints (JSON bodies):
+
+        POST   /sessions                 -> {"session_id": ...}
+        GET    /sessions/{id}            -> session info
+        GET    /sessions/{id}/messages   -> {"messages": [...]}
+        POST   /sessions/{id}/messages   {"content": ..., "stream": bool}
+        DELETE /sessions/{id}
+        GET    /health                   -> server and session stats
+
+    Posting a message runs one turn. Without streaming the reply is
+    {"agent": ..., "messages": [...new messages]}; with "stream": true it is a
+    Server-Sent Events stream of "agent", "delta", "tool_call" and finally "done" (or
+    "error") events.
+
+    Backpressure: at most max_concurrent_turns turns run at once and further requests
+    wait up to queue_timeout seconds before getting 503. Streamed content is coalesced
+    into at most one event per flush_interval, and a client that stops reading for
+    write_timeout seconds has its turn aborted, leaving its history unchanged.
+    """
+
+    def __init__(
+        self,
+        starting_agent: Agent,
+        client: Swarm = None,
+        context_variables: dict = None,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        max_sessions: int = 1000,
+        idle_timeout: float = 3600.0,
+        max_total_bytes: int = 256 * 1024 * 1024,
+        max_concurrent_turns: int = 32,
+        queue_timeout: float = 5.0,
+        write_timeout: float = 30.0,
+        flush_interval: float = 0.05,
+        sweep_interval: float = 60.0,
+        max_request_bytes: int = 1024 * 1024,
+        store: SessionStore = None,
+        agents: List[Agent] = None,
+        debug: bool = False,
+    ):
+        """
+        Args:
+            starting_agent: Agent new sessions start with.
+            client: Swarm shared by all sessions. Defaults to a new Swarm().
+            context_variables: Initial context variables of new sessions.
+            host: Interface to listen on.
+            port: Port to listen on (0 picks a free one).
+            max_sessions, idle_timeout, max_total_bytes: See SessionManager.
+            max_concurrent_turns: Maximum number of turns running at once.
+            queue_timeout: Seconds a turn waits for a free slot before 503.
+            write_timeout: Seconds a streaming write may block before the turn is
+                aborted.
+            flush_interval: Minimum seconds between streamed content events.
+            sweep_interval: Seconds between idle-session sweeps.
+            max_request_bytes: Largest accepted request body.
+            store: Optional SessionStore persisting sessions, so that they survive
+                eviction and restarts.
+            agents: Agents sessions may be handed off to; see SessionManager.
+            debug: Passed to Swarm.run.
+        """
+        self.client = client or Swarm()
+        self.sessions = SessionManager(starting_agent, context_variables, max_sessions, idle_timeout,
+                                       max_total_bytes, store, agents)
+        self.address = (host, port)
+        self.queue_timeout = queue_timeout
+        self.write_timeout = write_timeout
+        self.flush_interval = flush_interval
+        self.sweep_interval = sweep_interval
+        self.max_request_bytes = max_request_bytes
+        self.debug = debug
+        self._turn_slots = threading.BoundedSemaphore(max_concurrent_turns)
+        self._active_turns = 0
+        self._counter_lock = threading.Lock()
+        self.turns = 0
+        self.rejected = 0
+        self._server = None
+        self._stopped = threading.Event()
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _bind(self):
+        if self._server is None:
+            handler = type("Handler", (_Handler,), {"chat": self})
+            self._server = ThreadingHTTPServer(self.address, handler)
+            self._server.daemon_threads = True
+            self._stopped.clear()
+            threading.Thread(target=self._sweep, daemon=True, name="swarm-session-sweeper").start()
+
+    def start(self):
+        """Serve in a background thread."""
+        self._bind()
+        threading.Thread(target=self._server.serve_forever, daemon=True, name="swarm-chat-server").start()
+        return self
+
+    def serve_forever(self):
+        self._bind()
+        self._server.serve_forever()
+
+    def stop(self):
+        self._stopped.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _sweep(self):
+        while not self._stopped.wait(self.sweep_interval):
+            self.sessions.evict()
+
+    def stats(self) -> dict:
+        stats = {
+            "active_turns": self._active_turns,
+            "turns": self.turns,
+            "rejected": self.rejected,
+            **self.sessions.stats(),
+        }
+        if self.client.tool_cache is not None:
+            stats["tool_cache"] = self.client.tool_cache.stats()
+        return stats
+
+    def _acquire_turn_slot(self) -> bool:
+        if not self._turn_slots.acquire(timeout=self.queue_timeout):
+            with self._counter_lock:
+                self.rejected += 1
+            return False
+        with self._counter_lock:
+            self._active_turns += 1
+        return True
+
+    def _release_turn_slot(self):
+        with self._counter_lock:
+            self._active_turns -= 1
+            self.turns += 1
+        self._turn_slots.release()
+
+    def _run(self, session: Session, content: str, stream: bool):
+        user_message = {"role": "user", "content": content}
+        return user_message, self.client.run(
+            agent=session.agent,
+            messages=session.messages + [user_message],
+            context_variables={**session.context_variables, "session_id": session.id},
+            stream=stream,
+            debug=self.debug,
+        )
+
+    def _finish_turn(self, session: Session, user_message: dict, response):
+        if session.deleted:
+            return
+        session.agent = response.agent
+        session.context_variables = response.context_variables
+        if not session.append([user_message] + response.messages):
+            return
+        session.touch()
+        # a grown history may push the server over its memory budget
+        if self.sessions.total_bytes > self.sessions.max_total_bytes:
+            self.sessions.evict()
+
+
+def _stream_events(chunks, flush_interval: float):
+    """
+    Turn run_and_stream chunks into (event, data) pairs, coalescing content deltas so
+    that at most one content event is produced per flush_interval.
+    """
+    pending = []
+    last_flush = time.monotonic()
+    for chunk in chunks:
+        if "response" in chunk:
+            if pending:
+                yield "delta", {"content": "".join(pending)}
+            yield "response", chunk["response"]
+            return
+        if "sender" in chunk or chunk.get("delim") == "end" or chunk.get("tool_calls"):
+            if pending:
+                yield "delta", {"content": "".join(pending)}
+                pending = []
+                last_flush = time.monotonic()
+        if "sender" in chunk:
+            yield "agent", {"name": chunk["sender"]}
+        if chunk.get("content"):
+            pending.append(chunk["content"])
+            now = time.monotonic()
+            if now - last_flush >= flush_interval:
+                yield "delta", {"content": "".join(pending)}
+                pending = []
+                last_flush = now
+        for tool_call in chunk.get("tool_calls") or []:
+            name = (tool_call.get("function") or {}).get("name")
+            if name:
+                yield "tool_call", {"name": name}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    chat: ChatServer = None
+
+    _SESSION = re.compile(r"^/sessions/([0-9a-f]+)$")
+    _MESSAGES = re.compile(r"^/sessions/([0-9a-f]+)/messages$")
+
+    def log_message(self, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: dict = None):
+        payload = json.dumps(body, default=str).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str, headers: dict = None):
+        self._send_json(status, {"error": message}, headers)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > self.chat.max_request_bytes:
+            self._error(413, "Request body too large.")
+            self.close_connection = True
+            return None
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._error(400, "Request body is not valid JSON.")
+            return None
+        if not isinstance(body, dict):
+            self._error(400, "Request body must be a JSON object.")
+            return None
+        return body
+
+    def _session(self, pattern) -> Session:
+        match = pattern.match(self.path)
+        try:
+            session = self.chat.sessions.get(match.group(1)) if match else None
+        except SessionLimitError as e:
+            self._error(503, str(e), {"Retry-After": 5})
+            return None
+        if match and session is None:
+            self._error(404, "Unknown or expired session.")
+        return session
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, self.chat.stats())
+        elif self._SESSION.match(self.path):
+            session = self._session(self._SESSION)
+            if session is not None:
+                self._send_json(200, session.info())
+        elif self._MESSAGES.match(self.path):
+            session = self._session(self._MESSAGES)
+            if session is not None:
+                self._send_json(200, {"messages": session.messages})
+        else:
+            self._error(404, "Not found.")
+
+    def do_DELETE(self):
+        match = self._SESSION.match(self.path)
+        if match and self.chat.sessions.delete(match.group(1)):
+            self._send_json(200, {"deleted": match.group(1)})
+        else:
+            self._error(404, "Unknown or expired session.")
+
+    def do_POST(self):
+        if self.path == "/sessions":
+            if self._read_json() is None:
+                return
+            try:
+                session = self.chat.sessions.create()
+            except SessionLimitError as e:
+                self._error(503, str(e), {"Retry-After": 5})
+                return
+            self._send_json(201, {"session_id": session.id})
+        elif self._MESSAGES.match(self.path):
+            body = self._read_json()
+            if body is None:
+                return
+            session = self._session(self._MESSAGES)
+            if session is None:
+                return
+            if not isinstance(body.get("content"), str):
+                self._error(400, 'Expected {"content": "..."}.')
+                return
+            self._post_message(session, body["content"], bool(body.get("stream")))
+        else:
+            self._error(404, "Not found.")
+
+    def _post_message(self, session: Session, content: str, stream: bool):
+        chat = self.chat
+        if not session.lock.acquire(blocking=False):
+            self._error(409, "This session is already running a turn.")
+            return
+        try:
+            if session.deleted:
+                self._error(404, "Unknown or expired session.")
+                return
+            if not chat._acquire_turn_slot():
+                self._error(503, "Server busy.", {"Retry-After": 1})
+                return
+            try:
+                if stream:
+                    self._stream_turn(session, content)
+                else:
+                    self._turn(session, content)
+            finally:
+                chat._release_turn_slot()
+        finally:
+            session.lock.release()
+
+    def _turn(self, session: Session, content: str):
+        try:
+            user_message, response = self.chat._run(session, content, stream=False)
+            self.chat._finish_turn(session, user_message, response)
+        except Exception as e:
+            self._error(500, f"{type(e).__name__}: {e}")
+            return
+        self._send_json(200, {"agent": response.agent.name, "messages": response.messages})
+
+    def _send_event(self, event: str, data: dict):
+        self.wfile.write(f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode())
+        self.wfile.flush()
+
+    def _stream_turn(self, session: Session, content: str):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        # a client that stops reading blocks our writes; give up on it after write_timeout
+        self.connection.settimeout(self.chat.write_timeout)
+
+        chunks = None
+        try:
+            user_message, chunks = self.chat._run(session, content, stream=True)
+            for event, data in _stream_events(chunks, self.chat.flush_interval):
+                if event == "response":
+                    self.chat._finish_turn(session, user_message, data)
+                    self._send_event("done", {"agent": data.agent.name, "messages": data.messages})
+                else:
+                    self._send_event(event, data)
+        except (socket.timeout, ConnectionError):
+            # the client is gone or too slow; the turn is dropped
+            pass
+        except Exception as e:
+            try:
+                self._send_event("error", {"error": f"{type(e).__name__}: {e}"})
+            except (socket.timeout, ConnectionError):
+                pass
+        finally:
+            if chunks is not None:
+                chunks.close()
+
+
+def run_chat_server(
+    starting_agent, context_variables=None, client=None, host="127.0.0.1", port=8080, debug=False, **kwargs
+) -> None:
+    """Serve starting_agent to many users over HTTP until interrupted (see ChatServer)."""
+    server = ChatServer(starting_agent, client=client, context_variables=context_variables, host=host,
+                        port=port, debug=debug, **kwargs)
+    server._bind()
+    print(f"Serving Swarm chat on {server.url} 🐝")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
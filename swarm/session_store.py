@@ -0,0 +1,250 @@
+# Standard library imports
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import List
+
+# Key that replaces the content of a message whose content is stored as a blob.
+_BLOB_REF = "__content_ref__"
+
+
+def _content_hash(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SessionStore:
+    """
+    Persists conversations as an append-only message log in SQLite.
+
+    Each turn appends only its new messages, so saving costs the same however long the
+    conversation is. Resuming reads the session's metadata first and its messages only
+    when asked, optionally just the most recent ones. Message contents of at least
+    blob_min_chars characters (typically tool outputs, which repeat whenever the model
+    runs the same search again) are stored once per distinct content, keyed by hash.
+
+    A store can be shared by every session and thread of a process.
+    """
+
+    def __init__(self, path: str = "swarm_sessions.sqlite3", blob_min_chars: int = 1024):
+        """
+        Args:
+            path: Path of the SQLite database file (":memory:" for a private store).
+            blob_min_chars: Contents at least this long are deduplicated by hash.
+        """
+        self.blob_min_chars = blob_min_chars
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " id TEXT PRIMARY KEY,"
+            " agent TEXT,"
+            " context_variables TEXT NOT NULL DEFAULT '{}',"
+            " message_count INTEGER NOT NULL DEFAULT 0,"
+            " created_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " body TEXT NOT NULL,"
+            " blob TEXT,"
+            " PRIMARY KEY (session_id, seq)) WITHOUT ROWID")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS messages_blob ON messages (blob) WHERE blob IS NOT NULL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            " hash TEXT PRIMARY KEY,"
+            " content TEXT NOT NULL)")
+        self._conn.commit()
+        self.deduplicated = 0
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _encode(self, message: dict):
+        """Returns the stored body of message and the hash of its blob, if any."""
+        content = message.get("content")
+        if isinstance(content, str) and len(content) >= self.blob_min_chars:
+            digest = _content_hash(content)
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, content) VALUES (?, ?)", (digest, content)).rowcount
+            if not inserted:
+                self.deduplicated += 1
+            message = {**message, "content": None, _BLOB_REF: digest}
+            return json.dumps(message, default=str), digest
+        return json.dumps(message, default=str), None
+
+    def append(self, session_id: str, messages: List[dict], agent: str = None,
+               context_variables: dict = None) -> int:
+        """
+        Append messages to a session's log, creating the session if needed.
+
+        Args:
+            session_id: Session to append to.
+            messages: New messages, in order.
+            agent: Name of the session's active agent after these messages.
+            context_variables: The session's context variables after these messages
+                (stored as JSON; values that aren't JSON serializable are stored as
+                strings).
+
+        Returns:
+            The session's message count.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT message_count FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO sessions (id, created_at, updated_at) VALUES (?, ?, ?)",
+                    (session_id, now, now))
+                start = 0
+            else:
+                start = row[0]
+            rows = []
+            for seq, message in enumerate(messages, start):
+                body, blob = self._encode(message)
+                rows.append((session_id, seq, body, blob))
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, seq, body, blob) VALUES (?, ?, ?, ?)", rows)
+            count = start + len(rows)
+            self._conn.execute(
+                "UPDATE sessions SET message_count = ?, updated_at = ?,"
+                " agent = COALESCE(?, agent), context_variables = COALESCE(?, context_variables)"
+                " WHERE id = ?",
+                (count, now, agent,
+                 json.dumps(context_variables, default=str) if context_variables is not None else None,
+                 session_id))
+        return count
+
+    def info(self, session_id: str) -> dict:
+        """
+        Returns:
+            The session's metadata (agent, context_variables, message_count,
+            created_at, updated_at) without its messages, or None if it doesn't exist.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT agent, context_variables, message_count, created_at, updated_at"
+                " FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        return {
+            "session_id": session_id,
+            "agent": row[0],
+            "context_variables": json.loads(row[1]),
+            "message_count": row[2],
+            "created_at": row[3],
+            "updated_at": row[4],
+        }
+
+    def load(self, session_id: str, start: int = 0, last: int = None) -> List[dict]:
+        """
+        Read a session's messages.
+
+        Args:
+            session_id: Session to read.
+            start: Index of the first message to return.
+            last: Return at most this many of the most recent messages.
+        """
+        with self._lock:
+            if last is not None:
+                count = self._conn.execute(
+                    "SELECT message_count FROM sessions WHERE id = ?", (session_id,)).fetchone()
+                start = max(start, (count[0] if count else 0) - last)
+            rows = self._conn.execute(
+                "SELECT messages.body, blobs.content FROM messages"
+                " LEFT JOIN blobs ON blobs.hash = messages.blob"
+                " WHERE messages.session_id = ? AND messages.seq >= ? ORDER BY messages.seq",
+                (session_id, start)).fetchall()
+        messages = []
+        for body, content in rows:
+            message = json.loads(body)
+            if _BLOB_REF in message:
+                del message[_BLOB_REF]
+                message["content"] = content
+            messages.append(message)
+        return messages
+
+    def rewrite(self, session_id: str, messages: List[dict]):
+        """Replace a session's whole log, e.g. with a compacted history."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            rows = []
+            for seq, message in enumerate(messages):
+                body, blob = self._encode(message)
+                rows.append((session_id, seq, body, blob))
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, seq, body, blob) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "UPDATE sessions SET message_count = ?, updated_at = ? WHERE id = ?",
+                (len(rows), time.time(), session_id))
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+            return self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,)).rowcount > 0
+
+    def session_ids(self) -> List[str]:
+        """Ids of all stored sessions, most recently updated first."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT id FROM sessions ORDER BY updated_at DESC")]
+
+    def compact(self, compactor=None, budget: int = None, max_idle: float = None) -> dict:
+        """
+        Shrink the store.
+
+        Args:
+            compactor: Optional HistoryCompactor; every session's log is rewritten to
+                its compacted form, so that e.g. stale tool outputs are stored
+                truncated.
+            budget: Token budget passed to compactor.compact.
+            max_idle: Delete sessions not updated for this many seconds.
+
+        Returns:
+            dict with the numbers of sessions deleted and rewritten and blobs removed.
+        """
+        deleted = rewritten = 0
+        if max_idle is not None:
+            with self._lock:
+                idle = [row[0] for row in self._conn.execute(
+                    "SELECT id FROM sessions WHERE updated_at < ?", (time.time() - max_idle,))]
+            for session_id in idle:
+                deleted += self.delete(session_id)
+        if compactor is not None:
+            for session_id in self.session_ids():
+                messages = self.load(session_id)
+                compacted = compactor.compact(messages, budget)
+                if compacted is not messages:
+                    self.rewrite(session_id, compacted)
+                    rewritten += 1
+        with self._lock, self._conn:
+            removed = self._conn.execute(
+                "DELETE FROM blobs WHERE hash NOT IN (SELECT blob FROM messages WHERE blob IS NOT NULL)").rowcount
+        with self._lock:
+            self._conn.execute("PRAGMA incremental_vacuum").fetchall()
+        return {"sessions_deleted": deleted, "sessions_rewritten": rewritten, "blobs_removed": removed}
+
+    def stats(self) -> dict:
+        with self._lock:
+            sessions, messages = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(message_count), 0) FROM sessions").fetchone()
+            blobs, blob_chars = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0) FROM blobs").fetchone()
+        return {
+            "sessions": sessions,
+            "messages": messages,
+            "blobs": blobs,
+            "blob_chars": blob_chars,
+            "deduplicated": self.deduplicated,
+        }
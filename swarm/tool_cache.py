@@ -0,0 +1,120 @@
+# Standard library imports
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Callable
+
+# Returned by ToolResultCache.get when there is no usable entry.
+MISS = object()
+
+
+class ToolResultCache:
+    """
+    Memoizes agent function results keyed on function name + canonical JSON arguments.
+
+    Memoization is opt-in per function: only functions declared pure (their result
+    depends only on their arguments and calling them has no side effects) are cached,
+    each with its own TTL. Anything not declared, such as a function that posts a
+    comment, always runs. Only plain string results are stored; handoffs and Result
+    objects carrying context updates are never replayed.
+
+    One instance can be shared by every Swarm run (and session) in a process; it is
+    thread-safe.
+    """
+
+    def __init__(self, pure: dict = None, default_ttl: float = 300.0, max_entries: int = 1024,
+                 is_valid: Callable[[str], bool] = None):
+        """
+        Args:
+            pure: Names of functions that may be memoized, mapped to their TTL in
+                seconds (None for default_ttl).
+            default_ttl: TTL of functions declared without one.
+            max_entries: Maximum number of stored results; least recently used go first.
+            is_valid: Optional check run on a stored result before it is reused; results
+                it rejects are dropped and the function runs again. E.g.
+                ResultHandles.is_live, for results referring to state that can expire.
+        """
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.is_valid = is_valid
+        self._ttls = {}
+        for name, ttl in (pure or {}).items():
+            self.declare(name, ttl)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = defaultdict(int)
+        self.misses = defaultdict(int)
+
+    def declare(self, name: str, ttl: float = None):
+        """Declare the function called name pure, memoizing it for ttl seconds."""
+        self._ttls[name] = self.default_ttl if ttl is None else ttl
+
+    def is_memoized(self, name: str) -> bool:
+        return name in self._ttls
+
+    @staticmethod
+    def key(name: str, arguments) -> str:
+        """
+        Cache key of a call. arguments may be the JSON string from the tool call or the
+        parsed dict; key order and whitespace don't matter.
+        """
+        if isinstance(arguments, str):
+            arguments = json.loads(arguments or "{}")
+        return name + ":" + json.dumps(arguments, sort_keys=True, separators=(",", ":"))
+
+    def get(self, name: str, arguments):
+        """Return the memoized result of a call, or MISS."""
+        if name not in self._ttls:
+            return MISS
+        key = self.key(name, arguments)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now and (self.is_valid is None or self.is_valid(entry[0])):
+                self._entries.move_to_end(key)
+                self.hits[name] += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[key]
+            self.misses[name] += 1
+            return MISS
+
+    def set(self, name: str, arguments, result):
+        """Store the result of a call, if the function is declared pure and it's a string."""
+        if name not in self._ttls or not isinstance(result, str):
+            return
+        key = self.key(name, arguments)
+        with self._lock:
+            self._entries[key] = (result, time.monotonic() + self._ttls[name])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, name: str = None):
+        """Forget memoized results, of one function or of all of them."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k.startswith(name + ":")]:
+                del self._entries[key]
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict with total hits, misses, entries, hit_rate and per-function
+            {"hits", "misses"} under "functions".
+        """
+        with self._lock:
+            hits, misses = sum(self.hits.values()), sum(self.misses.values())
+            return {
+                "hits": hits,
+                "misses": misses,
+                "entries": len(self._entries),
+                "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+                "functions": {
+                    name: {"hits": self.hits[name], "misses": self.misses[name]}
+                    for name in sorted(set(self.hits) | set(self.misses))
+                },
+            }
@@ -0,0 +1,277 @@
+# Standard library imports
+import contextlib
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from typing import List
+
+# The span active in the current thread / task, used as the parent of new spans.
+_current_span = contextvars.ContextVar("swarm_current_span", default=None)
+
+
+def _new_id(nbytes: int) -> str:
+    return os.urandom(nbytes).hex()
+
+
+class Span:
+    """
+    A timed operation with attributes, in the shape of an OpenTelemetry span: 32 hex
+    digit trace ids, 16 hex digit span ids and nanosecond timestamps.
+    """
+
+    __slots__ = ("tracer", "name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "events", "status", "_token")
+
+    def __init__(self, tracer, name: str, parent=None, attributes: dict = None, start_ns: int = None):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = parent.trace_id if parent else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent else None
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns = None
+        self.attributes = dict(attributes or {})
+        self.events = []
+        self.status = "ok"
+        self._token = None
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set(self, key: str, value):
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes):
+        self.events.append({"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes})
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(error).__name__
+        self.attributes["error.message"] = str(error)
+
+    def end(self, end_ns: int = None):
+        if self.end_ns is None:
+            self.end_ns = end_ns if end_ns is not None else time.time_ns()
+            self.tracer._emit_end(self)
+
+    def __enter__(self):
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_value is not None:
+            self.record_error(exc_value)
+        _current_span.reset(self._token)
+        self.end()
+
+    def to_dict(self) -> dict:
+        """OTLP-style JSON representation."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.end_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class _NoopSpan:
+    """Stand-in returned when tracing is off; every operation does nothing."""
+
+    __slots__ = ()
+    trace_id = span_id = parent_id = None
+    attributes = {}
+
+    def set(self, key, value):
+        pass
+
+    def add_event(self, name, **attributes):
+        pass
+
+    def record_error(self, error):
+        pass
+
+    def end(self, end_ns=None):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Creates spans and hands them to sinks.
+
+    Spans opened with `with tracer.span(...)` become the parent of spans opened inside
+    them in the same thread or asyncio task; pass parent= explicitly across threads.
+    A Tracer without sinks is disabled and returns a shared no-op span, so tracing
+    costs next to nothing when unused.
+    """
+
+    def __init__(self, sinks: List = None):
+        """
+        Args:
+            sinks: Objects with on_end(span) and optionally on_start(span), e.g.
+                LoggingSink, JSONLinesSink or OpenTelemetrySink.
+        """
+        self.sinks = list(sinks or [])
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.sinks)
+
+    def current_span(self):
+        return _current_span.get()
+
+    def span(self, name: str, parent=None, **attributes):
+        """
+        Start a span. Use as a context manager, or call end() on it.
+
+        Args:
+            name: Operation name, e.g. "chat.completion".
+            parent: Parent span. Defaults to the current span.
+            attributes: Initial attributes.
+        """
+        if not self.sinks:
+            return NOOP_SPAN
+        span = Span(self, name, parent if parent is not None else _current_span.get(), attributes)
+        for sink in self.sinks:
+            on_start = getattr(sink, "on_start", None)
+            if on_start is not None:
+                on_start(span)
+        return span
+
+    @contextlib.contextmanager
+    def use_span(self, span):
+        """Make span the current span inside the block without ending it."""
+        if span is NOOP_SPAN:
+            yield span
+            return
+        token = _current_span.set(span)
+        try:
+            yield span
+        finally:
+            _current_span.reset(token)
+
+    def record(self, name: str, start: float, end: float, parent=None, **attributes):
+        """
+        Record an operation timed elsewhere (e.g. an HTTP request).
+
+        Args:
+            start: Start time in seconds since the epoch.
+            end: End time in seconds since the epoch.
+            parent: Parent span. Defaults to the current span.
+        """
+        if not self.sinks:
+            return
+        span = Span(self, name, parent if parent is not None else _current_span.get(),
+                    attributes, start_ns=int(start * 1e9))
+        for sink in self.sinks:
+            on_start = getattr(sink, "on_start", None)
+            if on_start is not None:
+                on_start(span)
+        span.end(int(end * 1e9))
+
+    def http_hook(self, info: dict):
+        """
+        Record a RegulationsGovAPI request_hook report as an "http.request" span.
+        """
+        attributes = {f"http.{k}": v for k, v in info.items() if k not in ("start", "end") and v is not None}
+        self.record("http.request", info["start"], info["end"], **attributes)
+
+    def _emit_end(self, span: Span):
+        for sink in self.sinks:
+            sink.on_end(span)
+
+
+class LoggingSink:
+    """Logs one line per finished span."""
+
+    def __init__(self, logger: logging.Logger = None, level: int = logging.INFO):
+        self.logger = logger or logging.getLogger("swarm.trace")
+        self.level = level
+
+    def on_end(self, span: Span):
+        if self.logger.isEnabledFor(self.level):
+            attributes = " ".join(f"{k}={v}" for k, v in span.attributes.items())
+            self.logger.log(self.level, "%s %.1fms %s %s", span.name, span.duration_ms, span.status, attributes)
+
+
+class JSONLinesSink:
+    """Appends every finished span as one JSON object per line."""
+
+    def __init__(self, path_or_file):
+        """
+        Args:
+            path_or_file: File path (opened for appending) or a writable text file.
+        """
+        self._owns_file = isinstance(path_or_file, (str, os.PathLike))
+        self._file = open(path_or_file, "a", encoding="utf-8") if self._owns_file else path_or_file
+        self._lock = threading.Lock()
+
+    def on_end(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
+
+
+class OpenTelemetrySink:
+    """
+    Forwards spans to OpenTelemetry (requires the opentelemetry-api package and a
+    configured tracer provider to export them).
+    """
+
+    def __init__(self, tracer=None):
+        """
+        Args:
+            tracer: opentelemetry.trace.Tracer. Defaults to the global provider's
+                tracer for "swarm".
+        """
+        from opentelemetry import trace
+
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("swarm")
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, span: Span):
+        with self._lock:
+            parent = self._spans.get(span.parent_id)
+        context = self._trace.set_span_in_context(parent) if parent is not None else None
+        otel_span = self.tracer.start_span(span.name, context=context, start_time=span.start_ns)
+        with self._lock:
+            self._spans[span.span_id] = otel_span
+
+    def on_end(self, span: Span):
+        with self._lock:
+            otel_span = self._spans.pop(span.span_id, None)
+        if otel_span is None:
+            return
+        for key, value in span.attributes.items():
+            otel_span.set_attribute(key, value if isinstance(value, (str, bool, int, float)) else str(value))
+        for event in span.events:
+            otel_span.add_event(event["name"], event["attributes"], timestamp=event["time_unix_nano"])
+        if span.status == "error":
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        otel_span.end(end_time=span.end_ns)
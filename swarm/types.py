@@ -1,15 +1,35 @@
-from openai.types.chat import ChatCompletionMessage
-from openai.types.chat.chat_completion_message_tool_call import (
-    ChatCompletionMessageToolCall,
-    Function,
-)
-from typing import List, Callable, Union, Optional
+import importlib
+from typing import TYPE_CHECKING, List, Callable, Union, Optional
 
 # Third-party imports
 from pydantic import BaseModel
 
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletionMessage
+    from openai.types.chat.chat_completion_message_tool_call import (
+        ChatCompletionMessageToolCall,
+        Function,
+    )
+
 AgentFunction = Callable[[], Union[str, "Agent", dict]]
 
+# OpenAI types re-exported from this module, imported on first access because importing
+# the openai package is slow.
+_OPENAI_TYPES = {
+    "ChatCompletionMessage": "openai.types.chat",
+    "ChatCompletionMessageToolCall": "openai.types.chat.chat_completion_message_tool_call",
+    "Function": "openai.types.chat.chat_completion_message_tool_call",
+}
+
+
+def __getattr__(name):
+    module = _OPENAI_TYPES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
 
 class Agent(BaseModel):
     name: str = "Agent"
@@ -18,6 +38,8 @@ class Agent(BaseModel):
     functions: List[AgentFunction] = []
     tool_choice: str = None
     parallel_tool_calls: bool = True
+    # token budget of the prompt; older history is compacted to fit (see HistoryCompactor)
+    context_budget: Optional[int] = None
 
 
 class Response(BaseModel):
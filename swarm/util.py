@@ -1,5 +1,11 @@
 import inspect
+import re
+import threading
+import weakref
 from datetime import datetime
+from enum import Enum
+from types import UnionType
+from typing import Any, Literal, Union, get_args, get_origin, get_type_hints
 
 
 def debug_print(debug: bool, *args: str) -> None:
@@ -10,74 +16,270 @@ def debug_print(debug: bool, *args: str) -> None:
     print(f"\033[97m[\033[90m{timestamp}\033[97m]\033[90m {message}\033[0m")
 
 
-def merge_fields(target, source):
-    for key, value in source.items():
-        if isinstance(value, str):
-            target[key] += value
-        elif value is not None and isinstance(value, dict):
-            merge_fields(target[key], value)
+class _ToolCallBuffer:
+    __slots__ = ("id", "type", "name", "arguments")
 
+    def __init__(self):
+        self.id = ""
+        self.type = ""
+        self.name = []
+        self.arguments = []
 
-def merge_chunk(final_response: dict, delta: dict) -> None:
-    delta.pop("role", None)
-    merge_fields(final_response, delta)
 
-    tool_calls = delta.get("tool_calls")
-    if tool_calls and len(tool_calls) > 0:
-        index = tool_calls[0].pop("index")
-        merge_fields(final_response["tool_calls"][index], tool_calls[0])
+class StreamAccumulator:
+    """
+    Assembles a streamed assistant message from chat completion chunks.
+
+    Delta attributes are read directly from the chunk objects, and text is collected in
+    list buffers that are joined once in message(), so each chunk costs a few appends.
+    Every tool call in a chunk is merged by its own index, so parallel tool calls stream
+    correctly even when one chunk carries fragments of several of them.
+    """
+
+    def __init__(self, sender: str):
+        self.sender = sender
+        self._content = []
+        self._tool_calls = {}
+        self.usage = None
+
+    def add(self, chunk) -> dict:
+        """
+        Merge one chunk into the message.
+
+        Returns:
+            The chunk's delta as a dict for streaming to callers (with "sender" on the
+            assistant's first delta), or None for chunks without choices.
+        """
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            # sent in a final chunk when the request asks for stream usage
+            self.usage = usage
+        if not chunk.choices:
+            # e.g. Azure content filter results or a trailing usage chunk
+            return None
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            self._content.append(delta.content)
+        tool_call_deltas = None
+        if delta.tool_calls:
+            tool_call_deltas = []
+            for tool_call in delta.tool_calls:
+                buffer = self._tool_calls.get(tool_call.index)
+                if buffer is None:
+                    buffer = self._tool_calls[tool_call.index] = _ToolCallBuffer()
+                function = tool_call.function
+                name = function.name if function else None
+                arguments = function.arguments if function else None
+                if tool_call.id:
+                    buffer.id += tool_call.id
+                if tool_call.type:
+                    buffer.type += tool_call.type
+                if name:
+                    buffer.name.append(name)
+                if arguments:
+                    buffer.arguments.append(arguments)
+                tool_call_deltas.append({
+                    "index": tool_call.index,
+                    "id": tool_call.id,
+                    "function": {"arguments": arguments, "name": name},
+                    "type": tool_call.type,
+                })
+
+        out = {
+            "content": delta.content,
+            "function_call": None,
+            "refusal": getattr(delta, "refusal", None),
+            "role": delta.role,
+            "tool_calls": tool_call_deltas,
+        }
+        if delta.role == "assistant":
+            out["sender"] = self.sender
+        return out
+
+    def message(self) -> dict:
+        """The assembled message, in the same shape as a history entry from run()."""
+        tool_calls = [
+            {
+                "function": {"arguments": "".join(b.arguments), "name": "".join(b.name)},
+                "id": b.id,
+                "type": b.type,
+            }
+            for _, b in sorted(self._tool_calls.items())
+        ]
+        return {
+            "content": "".join(self._content),
+            "sender": self.sender,
+            "role": "assistant",
+            "function_call": None,
+            "tool_calls": tool_calls or None,
+        }
+
+
+_TYPE_MAP = {
+    str: "string",
+    int: "integer",
+    float: "number",
+    bool: "boolean",
+    list: "array",
+    tuple: "array",
+    set: "array",
+    dict: "object",
+    type(None): "null",
+}
+
+# Matches the start of an argument section in Google style docstrings.
+_ARGS_HEADER = re.compile(r"^\s*(Args|Arguments|Parameters):\s*$")
+_DOC_SECTION = re.compile(r"^\s*[A-Z][A-Za-z ]*:\s*$")
+_GOOGLE_ARG = re.compile(r"^\s*(\*{0,2}\w+)\s*(?:\([^)]*\))?\s*:\s*(.*)$")
+_SPHINX_ARG = re.compile(r"^\s*:param\s+(?:[^:]+\s)?(\w+)\s*:\s*(.*)$")
+
+_schema_cache = weakref.WeakKeyDictionary()
+_schema_cache_lock = threading.Lock()
+
+
+def _type_schema(annotation) -> dict:
+    """
+    Translate a type annotation into a JSON schema fragment. Unknown annotations fall
+    back to "string".
+    """
+    if annotation is inspect.Parameter.empty or annotation is Any:
+        return {"type": "string"}
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        values = [member.value for member in annotation]
+        return {"type": _TYPE_MAP.get(type(values[0]), "string"), "enum": values} if values else {"type": "string"}
+    if annotation in _TYPE_MAP:
+        return {"type": _TYPE_MAP[annotation]}
 
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+    if origin is Literal:
+        types = {_TYPE_MAP.get(type(value), "string") for value in args}
+        schema = {"enum": list(args)}
+        if len(types) == 1:
+            schema["type"] = types.pop()
+        return schema
+    if origin is Union or origin is UnionType:
+        members = [a for a in args if a is not type(None)]
+        if len(members) == 1:
+            # Optional[X]: whether it may be omitted is decided by its default
+            return _type_schema(members[0])
+        return {"anyOf": [_type_schema(a) for a in members]}
+    if origin in (list, tuple, set, frozenset):
+        schema = {"type": "array"}
+        if args and args[0] is not Ellipsis:
+            schema["items"] = _type_schema(args[0])
+        return schema
+    if origin is dict:
+        return {"type": "object"}
+    return {"type": "string"}
 
-def function_to_json(func) -> dict:
+
+def _parse_docstring(doc: str):
+    """
+    Split a docstring into its description and per-argument descriptions, understanding
+    Google style "Args:" sections and Sphinx style ":param name:" lines.
+
+    Returns:
+        (description, {argument name: description})
+    """
+    lines = inspect.cleandoc(doc or "").splitlines()
+    description, arg_docs = [], {}
+    current, in_args, args_indent = None, False, None
+    for line in lines:
+        sphinx = _SPHINX_ARG.match(line)
+        if sphinx:
+            current = sphinx.group(1)
+            arg_docs[current] = sphinx.group(2).strip()
+            in_args = False
+            continue
+        if _ARGS_HEADER.match(line):
+            in_args, current, args_indent = True, None, None
+            continue
+        if in_args:
+            if not line.strip():
+                continue
+            indent = len(line) - len(line.lstrip())
+            if indent == 0 and _DOC_SECTION.match(line):
+                # next section (Returns:, Raises:, ...) stays in the description
+                in_args, current = False, None
+                description.append(line)
+                continue
+            google = _GOOGLE_ARG.match(line)
+            if google and (args_indent is None or indent <= args_indent):
+                args_indent = indent
+                current = google.group(1).lstrip("*")
+                arg_docs[current] = google.group(2).strip()
+            elif current:
+                arg_docs[current] = f"{arg_docs[current]} {line.strip()}".strip()
+            continue
+        if current and line.startswith(" "):
+            # continuation of a :param: line
+            arg_docs[current] = f"{arg_docs[current]} {line.strip()}".strip()
+            continue
+        current = None
+        if line.lstrip().startswith(":"):
+            # other Sphinx fields (:return:, :raises ...:) aren't useful to the model
+            continue
+        description.append(line)
+    return "\n".join(description).strip(), arg_docs
+
+
+def function_to_json(func, hidden_params=()) -> dict:
     """
     Converts a Python function into a JSON-serializable dictionary
     that describes the function's signature, including its name,
     description, and parameters.
 
+    Parameter types come from the type hints (including Optional, Union, Literal,
+    Enum and list[...] item types), primitive defaults are included, and argument
+    descriptions are taken from the docstring's Args section.
+
     Args:
         func: The function to be converted.
+        hidden_params: Names of parameters to leave out of the schema (e.g. ones
+            filled in by the framework rather than the model).
 
     Returns:
         A dictionary representing the function's signature in JSON format.
     """
-    type_map = {
-        str: "string",
-        int: "integer",
-        float: "number",
-        bool: "boolean",
-        list: "array",
-        dict: "object",
-        type(None): "null",
-    }
-
     try:
         signature = inspect.signature(func)
     except ValueError as e:
         raise ValueError(
             f"Failed to get signature for function {func.__name__}: {str(e)}"
         )
+    try:
+        hints = get_type_hints(func)
+    except Exception:
+        # unresolvable forward references: use the raw annotations
+        hints = {}
 
+    description, arg_docs = _parse_docstring(func.__doc__)
     parameters = {}
+    required = []
     for param in signature.parameters.values():
-        try:
-            param_type = type_map.get(param.annotation, "string")
-        except KeyError as e:
-            raise KeyError(
-                f"Unknown type annotation {param.annotation} for parameter {param.name}: {str(e)}"
-            )
-        parameters[param.name] = {"type": param_type}
-
-    required = [
-        param.name
-        for param in signature.parameters.values()
-        if param.default == inspect._empty
-    ]
+        if param.name in hidden_params or param.kind in (
+            inspect.Parameter.VAR_POSITIONAL,
+            inspect.Parameter.VAR_KEYWORD,
+        ):
+            continue
+        schema = _type_schema(hints.get(param.name, param.annotation))
+        if param.name in arg_docs and arg_docs[param.name]:
+            schema["description"] = arg_docs[param.name]
+        if param.default is inspect.Parameter.empty:
+            required.append(param.name)
+        elif isinstance(param.default, (str, int, float, bool)):
+            schema["default"] = param.default
+        elif isinstance(param.default, Enum):
+            schema["default"] = param.default.value
+        parameters[param.name] = schema
 
     return {
         "type": "function",
         "function": {
             "name": func.__name__,
-            "description": func.__doc__ or "",
+            "description": description,
             "parameters": {
                 "type": "object",
                 "properties": parameters,
@@ -85,3 +287,25 @@ def function_to_json(func) -> dict:
             },
         },
     }
+
+
+def cached_function_to_json(func, hidden_params=()) -> dict:
+    """
+    Memoized function_to_json, keyed on the function object.
+
+    Schemas are built once per function (and set of hidden parameters) and shared, so
+    callers must treat the returned dict as read-only. Entries go away with the
+    function; objects that can't be weakly referenced are converted on every call.
+    """
+    hidden_params = tuple(hidden_params)
+    try:
+        with _schema_cache_lock:
+            cached = _schema_cache.get(func)
+    except TypeError:
+        return function_to_json(func, hidden_params)
+    if cached is not None and cached[0] == hidden_params:
+        return cached[1]
+    schema = function_to_json(func, hidden_params)
+    with _schema_cache_lock:
+        _schema_cache[func] = (hidden_params, schema)
+    return schema